@@ -0,0 +1,52 @@
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.core.config import settings
+from app.infrastructure.database.db import SessionLocal
+from app.infrastructure.database.routing import ReadSessionLocal
+from app.infrastructure.database.query_stats import query_stats
+
+# Dependencias compartidas por los routers: una sesión por petición. Las
+# sentencias que ejecutan se cuentan en QueryStatsMiddleware
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db():
+    # Solo lecturas: con DB_REPLICA_URLS se consulta una réplica
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def query_budget(limit: int):
+    """
+    Dependencia que fija el máximo de sentencias SQL de una ruta (en lugar de
+    QUERY_BUDGET), p. ej. `dependencies=[Depends(query_budget(4))]`
+    """
+    async def set_budget():
+        stats = query_stats.get()
+        if stats is not None:
+            stats.budget = limit
+    return set_budget
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """
+    Dependencia de los endpoints de operación (/internal): exige la cabecera
+    `X-Internal-Token` con INTERNAL_TOKEN. Sin INTERNAL_TOKEN quedan cerrados.
+    """
+    if not settings.INTERNAL_TOKEN:
+        raise HTTPException(status_code=403, detail="Endpoints internos desactivados: falta INTERNAL_TOKEN")
+    if x_internal_token is None or not hmac.compare_digest(
+        x_internal_token.encode(), settings.INTERNAL_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=401, detail="Token interno inválido")
@@ -0,0 +1,254 @@
+import hmac
+import logging
+import math
+import random
+import re
+import sys
+import time
+from anyio import to_thread
+from http.cookies import SimpleCookie
+from app.core.config import settings
+from app.infrastructure.metrics import (
+    http_request_duration_seconds, http_requests_in_flight, http_requests_total
+)
+from app.infrastructure.profiler import StackSampler, current_sampler, profile_store
+from app.infrastructure.database.query_stats import QueryBudgetExceeded, QueryStats, query_stats
+from app.infrastructure.database.routing import RoutingState, routing_state
+
+logger = logging.getLogger(__name__)
+
+# Cookie con el instante (epoch) hasta el que el cliente lee del primario
+PRIMARY_COOKIE = "eg_primary_until"
+
+
+class ReadYourWritesMiddleware:
+    """
+    Lectura de las propias escrituras con réplicas.
+
+    Abre un RoutingState por petición con la cookie del cliente. Si la
+    petición escribió en la base, la respuesta renueva la cookie para
+    DB_READ_YOUR_WRITES_SECONDS: durante ese tiempo sus lecturas van al
+    primario y no a una réplica que quizá aún no tiene el cambio. Un valor
+    manipulado no fija al cliente más allá de esa ventana.
+
+    La cookie es SameSite=Lax: un fetch cross-site (front en otro dominio)
+    no la envía y esas lecturas pueden ir a una réplica atrasada.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = RoutingState(self._pinned_until(scope))
+        token = routing_state.set(state)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and state.wrote:
+                window = settings.DB_READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{PRIMARY_COOKIE}={time.time() + window:.3f}; Max-Age={int(window) or 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            routing_state.reset(token)
+
+    @staticmethod
+    def _pinned_until(scope) -> float:
+        # La cookie la controla el cliente: nunca más allá de la ventana desde ahora
+        for name, value in scope.get("headers", []):
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(PRIMARY_COOKIE)
+                if morsel:
+                    try:
+                        pinned = float(morsel.value)
+                    except ValueError:
+                        return 0.0
+                    if not math.isfinite(pinned):
+                        return 0.0
+                    return min(pinned, time.time() + settings.DB_READ_YOUR_WRITES_SECONDS)
+        return 0.0
+
+
+class QueryStatsMiddleware:
+    """
+    Sentencias SQL y tiempo de base de datos por petición.
+
+    Abre un QueryStats por petición (lo alimentan los eventos de
+    track_queries) y lo publica en la cabecera `Server-Timing`, visible en
+    las herramientas de desarrollo del navegador. Si la ruta supera su
+    presupuesto de sentencias (QUERY_BUDGET o query_budget) se registra un
+    aviso; con QUERY_BUDGET_STRICT la petición falla con QueryBudgetExceeded,
+    así un N+1 rompe los tests en lugar de pasar desapercibido.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(settings.QUERY_BUDGET)
+        token = query_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                self._check_budget(scope, stats)
+                if settings.SERVER_TIMING_ENABLED:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    timing = (
+                        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} consultas", '
+                        f"app;dur={total_ms:.1f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+
+    @staticmethod
+    def _check_budget(scope, stats: QueryStats):
+        if not stats.over_budget:
+            return
+        detail = (
+            f"{scope['method']} {scope['path']} ejecutó {stats.count} sentencias SQL "
+            f"(presupuesto: {stats.budget})"
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(detail)
+        logger.warning(detail)
+
+
+# Etiqueta de ruta de las peticiones que no coinciden con ninguna (404):
+# la URL tal cual dispararía la cardinalidad de las métricas
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope) -> str:
+    """Plantilla completa de la ruta atendida (/api/v1/sensors/device/{device_id}/latest)"""
+    route = scope["route"]
+    # route.path no incluye el prefijo de include_router: se toma de la URL
+    match = re.search(route.path_regex.pattern.lstrip("^"), scope["path"])
+    prefix = scope["path"][:match.start()] if match else ""
+    return prefix + route.path
+
+
+class MetricsMiddleware:
+    """
+    Métricas HTTP para GET /metrics: peticiones en curso, latencia por
+    plantilla de ruta y peticiones por código de estado.
+
+    La plantilla y el hijo del histograma de cada (ruta, método) se resuelven
+    en la primera petición y se reutilizan en las siguientes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            template, latency = self._route_metrics(scope)
+            latency.observe(elapsed)
+            http_requests_total.labels(scope["method"], template, status).inc()
+
+    def _route_metrics(self, scope):
+        # APIRoute no es hashable; las rutas viven lo mismo que la app, así que basta su id
+        route = scope.get("route")
+        key = (id(route), scope["method"])
+        entry = self._routes.get(key)
+        if entry is None:
+            template = route_template(scope) if route is not None else UNMATCHED_ROUTE
+            entry = self._routes[key] = (template, http_request_duration_seconds.labels(scope["method"], template))
+        return entry
+
+
+# Cabecera con la que un administrador pide el perfil de su petición
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+
+
+class ProfilerMiddleware:
+    """
+    Perfil estadístico de peticiones sueltas (PROFILER_ENABLED).
+
+    Se perfila la petición que trae `X-Profile-Token` con PROFILER_TOKEN, o
+    una fracción PROFILER_SAMPLE_RATE de todas. Las pilas muestreadas cada
+    PROFILER_INTERVAL_MS se guardan en PROFILER_DIR en formato colapsado
+    (flamegraphs) y la respuesta indica el nombre en `X-Profile`. Solo se
+    perfila una petición a la vez; con PROFILER_ENABLED desactivado el
+    middleware ni se instala. Los endpoints síncronos solo se muestrean en
+    rutas con ProfiledRoute, y el log indica las muestras reales tomadas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        name = profile_store.profile_name(scope["method"], scope["path"])
+        sampler = StackSampler(settings.PROFILER_INTERVAL_MS / 1000, sys._getframe())
+        token = current_sampler.set(sampler)
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile", name.encode("latin-1"))]
+            await send(message)
+
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            sampler.stop()
+            current_sampler.reset(token)
+            self._busy = False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(
+                "Perfil %s: %s muestras en %.0f ms (una cada %.1f ms)",
+                name, sampler.samples, elapsed_ms, elapsed_ms / max(sampler.samples, 1)
+            )
+            await to_thread.run_sync(profile_store.save, name, sampler.collapsed())
+
+    @staticmethod
+    def _wanted(scope) -> bool:
+        if settings.PROFILER_TOKEN:
+            for header, value in scope.get("headers", []):
+                if header == PROFILE_TOKEN_HEADER:
+                    return hmac.compare_digest(value, settings.PROFILER_TOKEN.encode())
+        return random.random() < settings.PROFILER_SAMPLE_RATE
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.domain.entities.alert import (
+    AlertListResponse, AlertMarkReadRequest, AlertMarkReadResponse, UnreadCountResponse
+)
+from app.api.deps import get_db
+from app.services.alert_service import (
+    get_user_alerts_service, get_plant_alerts_service, mark_alerts_read_service,
+    get_user_unread_count_service, get_plant_unread_count_service
+)
+from app.infrastructure.profiler import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.get("/user/{user_id}", response_model=AlertListResponse)
+def get_user_alerts(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Límite de alertas por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    unread_only: bool = Query(False, description="Solo alertas no leídas"),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener las alertas de todas las plantas de un usuario, de la más reciente a la más antigua
+
+    - **user_id**: ID del usuario
+    - **limit**: Límite de alertas por página (máximo 200)
+    - **cursor**: Cursor de la página siguiente (campo next_cursor de la respuesta anterior)
+    - **unread_only**: Solo mostrar alertas no leídas
+    """
+    try:
+        return get_user_alerts_service(db, user_id, limit, cursor, unread_only)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas: {str(e)}")
+
+@router.get("/plant/{plant_id}", response_model=AlertListResponse)
+def get_plant_alerts(
+    plant_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Límite de alertas por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    unread_only: bool = Query(False, description="Solo alertas no leídas"),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener las alertas de una planta, de la más reciente a la más antigua
+
+    - **plant_id**: ID de la planta
+    - **limit**: Límite de alertas por página (máximo 200)
+    - **cursor**: Cursor de la página siguiente
+    - **unread_only**: Solo mostrar alertas no leídas
+    """
+    try:
+        return get_plant_alerts_service(db, plant_id, limit, cursor, unread_only)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas: {str(e)}")
+
+@router.post("/read", response_model=AlertMarkReadResponse)
+def mark_alerts_read(
+    request: AlertMarkReadRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Marcar alertas como leídas
+
+    Body JSON:
+    {
+        "user_id": 1,
+        "alert_ids": [10, 11, 12],
+        "plant_id": null
+    }
+
+    - **user_id**: ID del usuario propietario
+    - **alert_ids**: IDs a marcar (si se omite, todas las no leídas)
+    - **plant_id**: Limitar a las alertas de una planta
+    """
+    try:
+        return mark_alerts_read_service(db, request)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al marcar alertas: {str(e)}")
+
+@router.get("/user/{user_id}/unread-count", response_model=UnreadCountResponse)
+def get_user_unread_count(
+    user_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Número de alertas no leídas del usuario (para el badge de la app)
+
+    - **user_id**: ID del usuario
+    """
+    try:
+        return get_user_unread_count_service(db, user_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas no leídas: {str(e)}")
+
+@router.get("/plant/{plant_id}/unread-count", response_model=UnreadCountResponse)
+def get_plant_unread_count(
+    plant_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Número de alertas no leídas de una planta
+
+    - **plant_id**: ID de la planta
+    """
+    try:
+        return get_plant_unread_count_service(db, plant_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas no leídas: {str(e)}")
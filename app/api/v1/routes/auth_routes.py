@@ -1,23 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.domain.entities.user import UserCreate, UserLogin, LoginResponse
-from app.infrastructure.database.db import SessionLocal
+from app.api.deps import get_db
 from app.services.auth_service import register_user, login_user
+from app.core.password_pool import password_pool, PasswordPoolSaturatedError
+from starlette.concurrency import run_in_threadpool
+from app.infrastructure.profiler import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Segundos sugeridos al cliente cuando el pool de bcrypt está lleno
+RETRY_AFTER_SECONDS = 1
+
+def _saturated():
+    return HTTPException(
+        status_code=503,
+        detail="Servicio de autenticación saturado, reintenta en unos segundos",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
 
 @router.post("/register")
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     try:
-        new_user = register_user(db, user)
+        hashed = await password_pool.hash(user.contrasena)
+        new_user = await run_in_threadpool(register_user, db, user, hashed)
         return {"msg": "Usuario registrado exitosamente", "usuario": new_user.usuario}
+    except PasswordPoolSaturatedError:
+        raise _saturated()
     except HTTPException as e:
         # Re-lanzar excepción para manejo de error en FastAPI
         raise e
@@ -26,8 +35,11 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 @router.post("/login", response_model=LoginResponse)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    login_response = login_user(db, credentials)
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+    try:
+        login_response = await login_user(db, credentials)
+    except PasswordPoolSaturatedError:
+        raise _saturated()
     if not login_response:
         raise HTTPException(status_code=401, detail="Credenciales incorrectas")
     return login_response
\ No newline at end of file
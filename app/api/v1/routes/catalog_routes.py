@@ -1,17 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.domain.entities.catalog import CatalogListResponse, CatalogPlantDetailResponse
-from app.infrastructure.database.db import SessionLocal
-from app.services.catalog_service import get_all_catalog_plants_service, get_catalog_plant_by_id_service
+from app.domain.entities.rule import CareRuleCreate, CareRuleResponse, CareRuleListResponse
+from app.api.deps import get_db, get_read_db
+from app.core.config import settings
+from app.core.jwt_auth import require_user
+from app.services.catalog_service import (
+    get_all_catalog_plants_service, get_catalog_plant_by_id_service, get_catalog_image_service
+)
+from app.services.rule_service import (
+    get_catalog_rules_service, create_catalog_rule_service, delete_catalog_rule_service
+)
+from app.infrastructure.profiler import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Las reglas de una especie afectan a las alertas de todos sus usuarios: solo con token
+user_auth = [Depends(require_user)]
 
 @router.get("/", response_model=CatalogListResponse)
 def get_catalog_plants(
@@ -19,7 +25,7 @@ def get_catalog_plants(
     limit: int = Query(50, ge=1, le=100, description="Límite de plantas por página"),
     search: str = Query(None, description="Buscar por nombre común o científico"),
     active_only: bool = Query(True, description="Solo plantas activas"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener todas las plantas del catálogo con paginación y filtros
@@ -37,10 +43,37 @@ def get_catalog_plants(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+IMAGE_CACHE_CONTROL = f"public, max-age={settings.CATALOG_IMAGE_CACHE_MAX_AGE}"
+
+@router.get("/{catalog_id}/image")
+def get_catalog_image(
+    catalog_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Imagen de referencia de una planta del catálogo (bytes, cacheable)
+
+    Responde con ETag y Cache-Control; si el cliente envía If-None-Match con
+    el mismo ETag se devuelve 304 sin cuerpo.
+
+    - **catalog_id**: ID de la planta en el catálogo
+    """
+    try:
+        content, media_type, etag = get_catalog_image_service(db, catalog_id, if_none_match)
+        headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+        if content is None:
+            return Response(status_code=304, headers=headers)
+        return Response(content=content, media_type=media_type, headers=headers)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
 @router.get("/{catalog_id}", response_model=CatalogPlantDetailResponse)
 def get_catalog_plant_detail(
     catalog_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener detalles específicos de una planta del catálogo
@@ -52,5 +85,71 @@ def get_catalog_plant_detail(
         return result
     except HTTPException as e:
         raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.get("/{catalog_id}/rules", response_model=CareRuleListResponse)
+def get_catalog_rules(
+    catalog_id: int,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Obtener las reglas de cuidado (rangos por tipo de sensor) de una planta del catálogo
+    
+    - **catalog_id**: ID de la planta en el catálogo
+    """
+    try:
+        return get_catalog_rules_service(db, catalog_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.post("/{catalog_id}/rules", response_model=CareRuleResponse, dependencies=user_auth)
+def create_catalog_rule(
+    catalog_id: int,
+    rule_request: CareRuleCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Crear una regla de cuidado para una planta del catálogo
+    
+    Body JSON:
+    {
+        "tipo_sensor": "YL-69",
+        "valor_minimo": 30,
+        "valor_maximo": 70,
+        "histeresis": 3,
+        "nivel": "advertencia"
+    }
+    
+    - **tipo_sensor**: YL-69, DHT22_TEMP, DHT22_HUM, BH1750, HC-SR04, YL-83 o SW-420
+    - **valor_minimo** / **valor_maximo**: Rango de cuidado (al menos uno)
+    - **histeresis**: Margen que debe recuperar el valor para cerrar la violación
+    - **nivel**: info, advertencia o critico
+    """
+    try:
+        return create_catalog_rule_service(db, catalog_id, rule_request)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.delete("/{catalog_id}/rules/{rule_id}", dependencies=user_auth)
+def delete_catalog_rule(
+    catalog_id: int,
+    rule_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Desactivar una regla de cuidado
+    
+    - **catalog_id**: ID de la planta en el catálogo
+    - **rule_id**: ID de la regla
+    """
+    try:
+        return delete_catalog_rule_service(db, catalog_id, rule_id)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
\ No newline at end of file
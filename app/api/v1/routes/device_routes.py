@@ -1,17 +1,13 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.domain.entities.device import DeviceAssignRequest, DeviceAssignResponse, DeviceResponse
-from app.infrastructure.database.db import SessionLocal
+from app.domain.entities.device import DeviceAssignRequest, DeviceAssignResponse, DeviceResponse, DeviceKeyResponse
+from app.api.deps import get_db
+from app.core.jwt_auth import require_user
 from app.services.device_service import assign_device_to_user
+from app.infrastructure.profiler import ProfiledRoute
 
-router = APIRouter()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(route_class=ProfiledRoute)
 
 @router.post("/assign", response_model=DeviceAssignResponse)
 def assign_device(
@@ -51,9 +47,10 @@ def get_user_devices(user_id: int, db: Session = Depends(get_db)):
     
     try:
         devices = get_devices(db, user_id)
+        # Modelo de respuesta explícito: no exponer columnas internas (clave_api_hash)
         return {
             "user_id": user_id,
-            "devices": devices,
+            "devices": [DeviceResponse.model_validate(device) for device in devices],
             "total_devices": len(devices)
         }
     except Exception as e:
@@ -95,3 +92,25 @@ def update_device_name(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al actualizar dispositivo: {str(e)}")
 
+@router.post("/{device_id}/key", response_model=DeviceKeyResponse)
+def rotate_device_key(
+    device_id: int,
+    claims: Optional[dict] = Depends(require_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Generar (o rotar) la clave API de un dispositivo
+    
+    - **device_id**: ID del dispositivo; debe pertenecer al usuario del token
+    
+    Requiere JWT_AUTH_ENABLED: el propietario se toma del token Bearer. La clave se devuelve una sola vez. El dispositivo la envía en
+    `X-Device-Key`, junto con `X-Device-Id`, al publicar lecturas cuando
+    DEVICE_AUTH_ENABLED está activo. La clave anterior deja de valer.
+    """
+    try:
+        from app.services.device_service import rotate_device_key_service
+        return rotate_device_key_service(db, device_id, claims)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar la clave del dispositivo: {str(e)}")
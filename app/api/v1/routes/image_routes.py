@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Query, Header, Response
+from fastapi.responses import FileResponse
+from typing import Optional
+from app.core.config import settings
+from app.services.image_service import get_image_service
+from app.infrastructure.profiler import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+# El contenido de un hash nunca cambia: se puede cachear indefinidamente
+IMAGE_CACHE_CONTROL = f"public, max-age={settings.IMAGE_CACHE_MAX_AGE}, immutable"
+
+@router.get("/{image_hash}")
+def get_image(
+    image_hash: str,
+    size: Optional[int] = Query(None, ge=1, le=4096, description="Lado máximo de la miniatura en px"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Servir una imagen del almacén por su hash (sha256)
+
+    - **image_hash**: sha256 de la imagen original
+    - **size**: Tamaño de miniatura deseado; se sirve la miniatura más pequeña que lo cubra
+    """
+    try:
+        path, media_type, etag = get_image_service(image_hash, size)
+        headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return FileResponse(path, media_type=media_type, headers=headers)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
@@ -0,0 +1,78 @@
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from app.api.deps import get_db, require_internal_token
+from app.infrastructure.database.db import engine
+from app.infrastructure.database.pool import pool_stats
+from app.infrastructure.database.routing import replicas
+from app.infrastructure.email.outbox import outbox_stats
+from app.infrastructure.profiler import ProfiledRoute, profile_store
+
+# Endpoints de operación: exigen X-Internal-Token y no deben exponerse fuera de la red interna
+router = APIRouter(route_class=ProfiledRoute, dependencies=[Depends(require_internal_token)])
+
+@router.get("/email/outbox")
+def get_email_outbox(db: Session = Depends(get_db)):
+    """
+    Estado de la bandeja de salida de correos
+
+    - **pendientes**: correos por enviar (profundidad de la cola)
+    - **antiguedad_pendiente_segundos**: edad del pendiente más viejo
+    - **fallidos**: correos descartados tras agotar los reintentos
+    """
+    try:
+        return outbox_stats(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al consultar la bandeja de salida: {str(e)}")
+
+@router.get("/db/pool")
+async def get_db_pool():
+    """
+    Estado del pool de conexiones frente al threadpool de la API
+
+    - **en_uso** / **libres** / **overflow**: conexiones en este momento
+    - **timeouts**: checkouts que agotaron DB_POOL_TIMEOUT
+    - **espera_ms_histograma**: checkouts acumulados por espera (ms)
+    - **threadpool**: hilos para endpoints síncronos; cada uno puede retener
+      una conexión, así que `capacidad` por debajo de `threadpool.total`
+      significa esperas en el pool bajo carga
+    """
+    # async: el límite del threadpool solo se puede leer desde el event loop
+    limiter = to_thread.current_default_thread_limiter()
+    stats = pool_stats(engine)
+    stats["threadpool"] = {"total": limiter.total_tokens, "en_uso": limiter.borrowed_tokens}
+    return stats
+
+@router.get("/db/replicas")
+def get_db_replicas():
+    """
+    Réplicas de lectura configuradas (DB_REPLICA_URLS)
+
+    - **sana**: si se le envían lecturas; una réplica que falla queda fuera
+      DB_REPLICA_RETRY_SECONDS
+    - **lecturas**: sesiones de lectura asignadas a cada réplica
+    - **lecturas_en_primario_por_fallo**: sesiones que fueron al primario
+      porque no había ninguna réplica sana
+    """
+    return replicas.stats()
+
+@router.get("/profiles")
+def get_profiles():
+    """
+    Perfiles de peticiones guardados por ProfilerMiddleware (PROFILER_ENABLED),
+    del más reciente al más antiguo
+    """
+    return {"perfiles": profile_store.list()}
+
+@router.get("/profiles/{name}")
+def get_profile(name: str):
+    """
+    Un perfil en formato de pilas colapsadas, para `flamegraph.pl` o speedscope
+
+    - **name**: nombre del perfil (cabecera `X-Profile` de la respuesta perfilada)
+    """
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
@@ -0,0 +1,82 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
+from app.core.device_keys import device_keys
+from app.core.jwt_auth import claims_cache
+from app.infrastructure.database.db import engine, replica_engines
+from app.infrastructure.database.pool import pool_metrics
+from app.infrastructure.metrics import CONTENT_TYPE, MetricFamily, histogram_samples, metrics_registry
+from app.services.catalog_index import catalog_index
+from app.services.plant_cache import device_plants
+from app.services.user_cache import user_count
+from app.infrastructure.profiler import ProfiledRoute
+
+# Se monta sin prefijo (GET /metrics) para el scraper de Prometheus
+router = APIRouter(route_class=ProfiledRoute)
+
+# Cachés en memoria con contadores hits/misses
+CACHES = {
+    "catalog_index": catalog_index,
+    "user_count": user_count,
+    "device_plants": device_plants,
+    "jwt_claims": claims_cache,
+    "device_keys": device_keys,
+}
+
+
+@metrics_registry.register_collector
+def collect_db_pool():
+    """Estado de los pools (primario y réplicas) y esperas al pedir conexión"""
+    engines = [("primary", engine)] + [(f"replica{i}", replica) for i, replica in enumerate(replica_engines)]
+    gauges = {
+        "size": ("Conexiones fijas del pool (pool_size)", QueuePool.size),
+        "checked_out": ("Conexiones en uso", QueuePool.checkedout),
+        "checked_in": ("Conexiones libres en el pool", QueuePool.checkedin),
+        "overflow": ("Conexiones por encima de pool_size (negativo si aún no se abrieron todas)", QueuePool.overflow),
+    }
+    families = [
+        MetricFamily(
+            f"easygrow_db_pool_{name}", "gauge", documentation,
+            [(f"easygrow_db_pool_{name}", (("pool", label),), read(db.pool))
+             for label, db in engines if isinstance(db.pool, QueuePool)]
+        )
+        for name, (documentation, read) in gauges.items()
+    ]
+
+    # PoolMetrics acumula en ms; Prometheus espera segundos
+    counts, wait_sum_ms, checkouts, timeouts = pool_metrics.snapshot()
+    families.append(MetricFamily(
+        "easygrow_db_pool_wait_seconds", "histogram", "Espera al sacar una conexión del pool",
+        histogram_samples(
+            "easygrow_db_pool_wait_seconds", (), [bound / 1000 for bound in pool_metrics.buckets],
+            counts, wait_sum_ms / 1000, checkouts
+        )
+    ))
+    families.append(MetricFamily(
+        "easygrow_db_pool_timeouts_total", "counter", "Checkouts que agotaron DB_POOL_TIMEOUT",
+        [("easygrow_db_pool_timeouts_total", (), timeouts)]
+    ))
+    return families
+
+
+@metrics_registry.register_collector
+def collect_caches():
+    """Aciertos, fallos y tasa de aciertos de las cachés en memoria"""
+    hits, misses, ratios = [], [], []
+    for name, cache in CACHES.items():
+        labels = (("cache", name),)
+        hits.append(("easygrow_cache_hits_total", labels, cache.hits))
+        misses.append(("easygrow_cache_misses_total", labels, cache.misses))
+        lookups = cache.hits + cache.misses
+        ratios.append(("easygrow_cache_hit_ratio", labels, cache.hits / lookups if lookups else float("nan")))
+    return [
+        MetricFamily("easygrow_cache_hits_total", "counter", "Aciertos de caché", hits),
+        MetricFamily("easygrow_cache_misses_total", "counter", "Fallos de caché", misses),
+        MetricFamily("easygrow_cache_hit_ratio", "gauge", "Aciertos sobre consultas a la caché desde el arranque", ratios),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Métricas en el formato de texto de Prometheus"""
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
@@ -1,17 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.domain.entities.plant import PlantCreateRequest, PlantCreateResponse
-from app.infrastructure.database.db import SessionLocal
+from typing import Optional
+from app.domain.entities.plant import PlantCreateRequest, PlantCreateResponse, PlantListResponse, PlantPurgeStatus
+from app.api.deps import get_db, get_read_db
 from app.services.plant_service import create_plant_service
+from app.infrastructure.profiler import ProfiledRoute
 
-router = APIRouter()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(route_class=ProfiledRoute)
 
 @router.post("/", response_model=PlantCreateResponse)
 def create_plant(
@@ -47,21 +42,68 @@ def create_plant(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+@router.get("/", response_model=PlantListResponse)
+def list_plants(
+    user_id: Optional[int] = Query(None, description="Filtrar por usuario"),
+    device_id: Optional[int] = Query(None, description="Filtrar por dispositivo"),
+    catalog_id: Optional[int] = Query(None, description="Filtrar por especie del catálogo"),
+    activa: Optional[bool] = Query(True, description="true: activas, false: eliminadas; omitir el filtro con active_any"),
+    active_any: bool = Query(False, description="Incluir plantas activas y eliminadas"),
+    ubicacion: Optional[str] = Query(None, description="Texto contenido en la ubicación"),
+    sort: str = Query("fecha_registro", pattern="^(fecha_registro|nombre|id)$", description="Campo de orden"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Dirección del orden"),
+    limit: int = Query(50, ge=1, le=200, description="Límite de plantas por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    include_image: bool = Query(False, description="Incluir la imagen del catálogo en base64"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Listar plantas con filtros combinables, orden y paginación por cursor
+
+    Los totales (total_plantas, plantas_activas, plantas_con_dispositivo) se
+    calculan en SQL sobre todos los filtros, no solo sobre la página.
+
+    - **user_id**, **device_id**, **catalog_id**: Filtros opcionales
+    - **activa**: Solo activas (por defecto) o solo eliminadas
+    - **active_any**: Ignorar el filtro de activa
+    - **ubicacion**: Texto contenido en la ubicación
+    - **sort** / **order**: fecha_registro, nombre o id; asc o desc
+    - **limit**: Límite de plantas por página (máximo 200)
+    - **cursor**: Cursor de la página siguiente
+    """
+    try:
+        from app.services.plant_service import list_plants_service
+        result = list_plants_service(
+            db, user_id, device_id, catalog_id, None if active_any else activa, ubicacion,
+            sort, order == "desc", limit, cursor, include_image
+        )
+        return result
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al listar plantas: {str(e)}")
+
 @router.get("/user/{user_id}")
 def get_user_plants(
     user_id: int,
     active_only: bool = Query(True, description="Solo plantas activas"),
-    db: Session = Depends(get_db)
+    include_image: bool = Query(False, description="Incluir la imagen del catálogo en base64"),
+    limit: int = Query(50, ge=1, le=200, description="Límite de plantas por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener todas las plantas de un usuario específico
     
     - **user_id**: ID del usuario
     - **active_only**: Solo mostrar plantas activas (por defecto True)
+    - **include_image**: Incluir `imagen_referencia` en línea (por defecto solo `imagen_url`)
+    - **limit**: Límite de plantas por página (máximo 200)
+    - **cursor**: Cursor de la página siguiente (campo next_cursor de la respuesta anterior)
     """
     try:
         from app.services.plant_service import get_user_plants_service
-        result = get_user_plants_service(db, user_id, active_only)
+        result = get_user_plants_service(db, user_id, active_only, include_image, limit, cursor)
         return result
     except HTTPException as e:
         raise e
@@ -72,17 +114,23 @@ def get_user_plants(
 def get_device_plants(
     device_id: int,
     active_only: bool = Query(True, description="Solo plantas activas"),
-    db: Session = Depends(get_db)
+    include_image: bool = Query(False, description="Incluir la imagen del catálogo en base64"),
+    limit: int = Query(50, ge=1, le=200, description="Límite de plantas por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener todas las plantas monitoreadas por un dispositivo específico
     
     - **device_id**: ID del dispositivo
     - **active_only**: Solo mostrar plants activas (por defecto True)
+    - **include_image**: Incluir `imagen_referencia` en línea (por defecto solo `imagen_url`)
+    - **limit**: Límite de plantas por página (máximo 200)
+    - **cursor**: Cursor de la página siguiente (campo next_cursor de la respuesta anterior)
     """
     try:
         from app.services.plant_service import get_device_plants_service
-        result = get_device_plants_service(db, device_id, active_only)
+        result = get_device_plants_service(db, device_id, active_only, include_image, limit, cursor)
         return result
     except HTTPException as e:
         raise e
@@ -94,7 +142,10 @@ def get_user_device_plants(
     user_id: int,
     device_id: int,
     active_only: bool = Query(True, description="Solo plantas activas"),
-    db: Session = Depends(get_db)
+    include_image: bool = Query(False, description="Incluir la imagen del catálogo en base64"),
+    limit: int = Query(50, ge=1, le=200, description="Límite de plantas por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener plantas de un usuario específico monitoreadas por un dispositivo específico
@@ -102,10 +153,13 @@ def get_user_device_plants(
     - **user_id**: ID del usuario
     - **device_id**: ID del dispositivo
     - **active_only**: Solo mostrar plantas activas (por defecto True)
+    - **include_image**: Incluir `imagen_referencia` en línea (por defecto solo `imagen_url`)
+    - **limit**: Límite de plantas por página (máximo 200)
+    - **cursor**: Cursor de la página siguiente (campo next_cursor de la respuesta anterior)
     """
     try:
         from app.services.plant_service import get_user_device_plants_service
-        result = get_user_device_plants_service(db, user_id, device_id, active_only)
+        result = get_user_device_plants_service(db, user_id, device_id, active_only, include_image, limit, cursor)
         return result
     except HTTPException as e:
         raise e
@@ -115,7 +169,7 @@ def get_user_device_plants(
 @router.get("/{plant_id}/detail")
 def get_plant_detail(
     plant_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener detalles completos de una planta específica
@@ -154,7 +208,30 @@ def delete_plant(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al eliminar la planta: {str(e)}")
 
-@router.delete("/{plant_id}/permanent")
+@router.post("/{plant_id}/restore")
+def restore_plant(
+    plant_id: int,
+    user_id: int = Query(..., description="ID del usuario propietario"),
+    db: Session = Depends(get_db)
+):
+    """
+    Reactivar una planta dada de baja (soft delete)
+    
+    - **plant_id**: ID de la planta a reactivar
+    - **user_id**: ID del usuario propietario (para validar permisos)
+    
+    Si sus lecturas se movieron al archivo en frío, se restauran a la tabla
+    de lecturas antes de responder.
+    """
+    try:
+        from app.services.plant_service import restore_plant_service
+        return restore_plant_service(db, plant_id, user_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al reactivar la planta: {str(e)}")
+
+@router.delete("/{plant_id}/permanent", status_code=202)
 def delete_plant_permanent(
     plant_id: int,
     user_id: int = Query(..., description="ID del usuario propietario"),
@@ -166,6 +243,9 @@ def delete_plant_permanent(
     - **plant_id**: ID de la planta a eliminar permanentemente
     - **user_id**: ID del usuario propietario (para validar permisos)
     
+    La planta deja de mostrarse al momento; sus alertas y lecturas se borran
+    en segundo plano. El progreso se consulta en `GET /{plant_id}/purge`.
+    
     ADVERTENCIA: Esta operación elimina completamente la planta de la base de datos
     y no se puede deshacer.
     """
@@ -177,3 +257,26 @@ def delete_plant_permanent(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al eliminar permanentemente la planta: {str(e)}")
+
+@router.get("/{plant_id}/purge", response_model=PlantPurgeStatus)
+def get_plant_purge_status(
+    plant_id: int,
+    user_id: int = Query(..., description="ID del usuario propietario"),
+    db: Session = Depends(get_db)
+):
+    """
+    Progreso del borrado permanente de una planta
+    
+    - **plant_id**: ID de la planta
+    - **user_id**: ID del usuario propietario (para validar permisos)
+    
+    Estados: `pendiente`, `en_curso` y `completada`. Si un lote falla, `error`
+    indica el motivo y la purga se reintenta en la siguiente pasada del worker.
+    """
+    try:
+        from app.services.purge_service import get_purge_status_service
+        return get_purge_status_service(db, plant_id, user_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener el estado del borrado: {str(e)}")
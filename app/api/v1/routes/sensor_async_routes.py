@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from app.domain.entities.sensor import ReadingListResponse, ReadingCreateRequest
+from app.infrastructure.database.async_db import get_async_db
+from app.api.deps import query_budget
+from app.core.device_keys import require_device
+from app.core.jwt_auth import require_user
+from app.services.sensor_async_service import (
+    get_sensor_readings_async, get_device_readings_async,
+    get_latest_readings_async, create_reading_async
+)
+from app.infrastructure.profiler import ProfiledRoute
+
+# Con ASYNC_DB_ENABLED, main.py incluye este router antes que sensor_routes:
+# estas rutas atienden las mismas URLs sin pasar por el threadpool
+router = APIRouter(route_class=ProfiledRoute)
+
+user_auth = [Depends(require_user)]
+
+# Sentencias SQL esperadas por ruta, más una de margen por el refresco de la
+# lista de particiones (ver QUERY_BUDGET_STRICT)
+def _budget(limit: int):
+    return user_auth + [Depends(query_budget(limit))]
+
+@router.get("/{sensor_id}/readings", response_model=ReadingListResponse, dependencies=_budget(4))
+async def get_sensor_readings(
+    sensor_id: int,
+    skip: int = Query(0, ge=0, description="Número de lecturas a omitir"),
+    limit: int = Query(100, ge=1, le=1000, description="Límite de lecturas por página"),
+    date_from: Optional[datetime] = Query(None, description="Fecha inicio (YYYY-MM-DD HH:MM:SS)"),
+    date_to: Optional[datetime] = Query(None, description="Fecha fin (YYYY-MM-DD HH:MM:SS)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtener lecturas de un sensor específico con filtros de fecha
+
+    - **sensor_id**: ID del sensor
+    - **skip**: Número de lecturas a omitir (paginación)
+    - **limit**: Límite de lecturas por página (máximo 1000)
+    - **date_from**: Fecha de inicio para filtrar lecturas
+    - **date_to**: Fecha de fin para filtrar lecturas
+    """
+    try:
+        return await get_sensor_readings_async(db, sensor_id, skip, limit, date_from, date_to)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener lecturas: {str(e)}")
+
+@router.get("/device/{device_id}/readings", dependencies=_budget(5))
+async def get_device_all_readings(
+    device_id: int,
+    skip: int = Query(0, ge=0, description="Número de lecturas a omitir"),
+    limit: int = Query(100, ge=1, le=1000, description="Límite de lecturas por página"),
+    date_from: Optional[datetime] = Query(None, description="Fecha inicio"),
+    date_to: Optional[datetime] = Query(None, description="Fecha fin"),
+    sensor_type: Optional[str] = Query(None, description="Filtrar por tipo de sensor"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtener todas las lecturas de todos los sensores de un dispositivo
+
+    - **device_id**: ID del dispositivo
+    - **skip**: Número de lecturas a omitir
+    - **limit**: Límite de lecturas por página
+    - **date_from**: Fecha de inicio para filtrar
+    - **date_to**: Fecha de fin para filtrar
+    - **sensor_type**: Filtrar por tipo específico de sensor (YL-69, DHT22, BH1750, etc.)
+    """
+    try:
+        return await get_device_readings_async(db, device_id, skip, limit, date_from, date_to, sensor_type)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener lecturas del dispositivo: {str(e)}")
+
+@router.get("/device/{device_id}/latest", dependencies=_budget(4))
+async def get_device_latest_readings(
+    device_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Obtener las últimas lecturas de cada sensor del dispositivo
+
+    - **device_id**: ID del dispositivo
+    """
+    try:
+        return await get_latest_readings_async(db, device_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener últimas lecturas: {str(e)}")
+
+@router.post("/readings")
+async def create_sensor_reading(
+    reading: ReadingCreateRequest,
+    device_id: Optional[int] = Depends(require_device),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Crear una nueva lectura de sensor (generalmente usado por los dispositivos IoT)
+
+    - **id_sensor**: ID del sensor que envía la lectura
+    - **valor**: Valor medido por el sensor
+
+    Con DEVICE_AUTH_ENABLED el dispositivo se autentica con las cabeceras
+    `X-Device-Id` y `X-Device-Key`, y el sensor debe pertenecerle.
+    """
+    try:
+        return await create_reading_async(db, reading, device_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al crear lectura: {str(e)}")
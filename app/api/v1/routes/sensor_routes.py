@@ -6,26 +6,30 @@ from app.domain.entities.sensor import (
     SensorListResponse, SensorDetailResponse, 
     ReadingListResponse, ReadingCreateRequest
 )
-from app.infrastructure.database.db import SessionLocal
+from app.api.deps import get_db, get_read_db, query_budget
+from app.core.device_keys import require_device
+from app.core.jwt_auth import require_user
 from app.services.sensor_service import (
     get_device_sensors_service, get_sensor_detail_service,
     get_sensor_readings_service, get_device_readings_service,
     create_reading_service, get_latest_readings_service
 )
+from app.infrastructure.profiler import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Las consultas son de usuario (JWT); la ingesta la autentica cada dispositivo
+user_auth = [Depends(require_user)]
+
+# Sentencias SQL esperadas por ruta, más una de margen por el refresco de la
+# lista de particiones (ver QUERY_BUDGET_STRICT)
+def _budget(limit: int):
+    return user_auth + [Depends(query_budget(limit))]
 
-@router.get("/device/{device_id}", response_model=SensorListResponse)
+@router.get("/device/{device_id}", response_model=SensorListResponse, dependencies=user_auth)
 def get_device_sensors(
     device_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener todos los sensores de un dispositivo específico
@@ -40,10 +44,10 @@ def get_device_sensors(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener sensores: {str(e)}")
 
-@router.get("/{sensor_id}/detail", response_model=SensorDetailResponse)
+@router.get("/{sensor_id}/detail", response_model=SensorDetailResponse, dependencies=user_auth)
 def get_sensor_detail(
     sensor_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener detalles de un sensor específico
@@ -58,14 +62,14 @@ def get_sensor_detail(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener sensor: {str(e)}")
 
-@router.get("/{sensor_id}/readings", response_model=ReadingListResponse)
+@router.get("/{sensor_id}/readings", response_model=ReadingListResponse, dependencies=_budget(4))
 def get_sensor_readings(
     sensor_id: int,
     skip: int = Query(0, ge=0, description="Número de lecturas a omitir"),
     limit: int = Query(100, ge=1, le=1000, description="Límite de lecturas por página"),
     date_from: Optional[datetime] = Query(None, description="Fecha inicio (YYYY-MM-DD HH:MM:SS)"),
     date_to: Optional[datetime] = Query(None, description="Fecha fin (YYYY-MM-DD HH:MM:SS)"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener lecturas de un sensor específico con filtros de fecha
@@ -84,7 +88,7 @@ def get_sensor_readings(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener lecturas: {str(e)}")
 
-@router.get("/device/{device_id}/readings")
+@router.get("/device/{device_id}/readings", dependencies=_budget(5))
 def get_device_all_readings(
     device_id: int,
     skip: int = Query(0, ge=0, description="Número de lecturas a omitir"),
@@ -92,7 +96,7 @@ def get_device_all_readings(
     date_from: Optional[datetime] = Query(None, description="Fecha inicio"),
     date_to: Optional[datetime] = Query(None, description="Fecha fin"),
     sensor_type: Optional[str] = Query(None, description="Filtrar por tipo de sensor"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener todas las lecturas de todos los sensores de un dispositivo
@@ -112,10 +116,10 @@ def get_device_all_readings(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener lecturas del dispositivo: {str(e)}")
 
-@router.get("/device/{device_id}/latest")
+@router.get("/device/{device_id}/latest", dependencies=_budget(4))
 def get_device_latest_readings(
     device_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener las últimas lecturas de cada sensor del dispositivo
@@ -133,6 +137,7 @@ def get_device_latest_readings(
 @router.post("/readings")
 def create_sensor_reading(
     reading: ReadingCreateRequest,
+    device_id: Optional[int] = Depends(require_device),
     db: Session = Depends(get_db)
 ):
     """
@@ -146,9 +151,12 @@ def create_sensor_reading(
     
     - **id_sensor**: ID del sensor que envía la lectura
     - **valor**: Valor medido por el sensor
+    
+    Con DEVICE_AUTH_ENABLED el dispositivo se autentica con las cabeceras
+    `X-Device-Id` y `X-Device-Key`, y el sensor debe pertenecerle.
     """
     try:
-        result = create_reading_service(db, reading)
+        result = create_reading_service(db, reading, device_id)
         return result
     except HTTPException as e:
         raise e
@@ -156,13 +164,13 @@ def create_sensor_reading(
         raise HTTPException(status_code=500, detail=f"Error al crear lectura: {str(e)}")
 
 # Endpoints específicos por tipo de sensor
-@router.get("/device/{device_id}/humidity")
+@router.get("/device/{device_id}/humidity", dependencies=user_auth)
 def get_device_humidity_readings(
     device_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
     hours: int = Query(24, ge=1, le=168, description="Últimas X horas (máximo 7 días)"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener lecturas de humedad del sustrato (YL-69) de las últimas X horas
@@ -179,13 +187,13 @@ def get_device_humidity_readings(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener lecturas de humedad: {str(e)}")
 
-@router.get("/device/{device_id}/environment")
+@router.get("/device/{device_id}/environment", dependencies=user_auth)
 def get_device_environmental_readings(
     device_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
     hours: int = Query(24, ge=1, le=168),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener lecturas ambientales (DHT22: temperatura y humedad ambiental)
@@ -202,13 +210,13 @@ def get_device_environmental_readings(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener lecturas ambientales: {str(e)}")
 
-@router.get("/device/{device_id}/light")
+@router.get("/device/{device_id}/light", dependencies=user_auth)
 def get_device_light_readings(
     device_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
     hours: int = Query(24, ge=1, le=168),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener lecturas de luz (BH1750) en lux
@@ -225,13 +233,13 @@ def get_device_light_readings(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener lecturas de luz: {str(e)}")
 
-@router.get("/device/{device_id}/water-level")
+@router.get("/device/{device_id}/water-level", dependencies=user_auth)
 def get_device_water_level_readings(
     device_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
     hours: int = Query(24, ge=1, le=168),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Obtener lecturas del nivel de agua (HC-SR04)
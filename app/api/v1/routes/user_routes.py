@@ -1,32 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.domain.entities.user import UsersListResponse, UserResponse
-from app.infrastructure.database.db import SessionLocal
+from app.api.deps import get_db
 from app.services.user_service import get_all_users_service, get_user_by_id_service
+from app.infrastructure.profiler import ProfiledRoute
 
-router = APIRouter()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(route_class=ProfiledRoute)
 
 @router.get("/", response_model=UsersListResponse)
 def get_all_users(
-    skip: int = Query(0, ge=0, description="Número de usuarios a omitir"),
+    skip: int = Query(0, ge=0, description="Número de usuarios a omitir (solo sin cursor)"),
     limit: int = Query(10, ge=1, le=100, description="Límite de usuarios por página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (next_cursor)"),
+    search: Optional[str] = Query(None, min_length=1, description="Prefijo de usuario o correo"),
     db: Session = Depends(get_db)
 ):
     """
     Obtener todos los usuarios con paginación
     
-    - **skip**: Número de usuarios a omitir (para paginación)
+    - **skip**: Número de usuarios a omitir (compatibilidad; preferir cursor)
     - **limit**: Límite de usuarios por página (máximo 100)
+    - **cursor**: `next_cursor` de la respuesta anterior
+    - **search**: Prefijo del nombre de usuario o del correo
+    
+    `total` es el número de usuarios registrados (cacheado unos segundos).
     """
     try:
-        result = get_all_users_service(db, skip, limit)
+        result = get_all_users_service(db, skip, limit, cursor, search)
         return result
     except HTTPException as e:
         raise e
@@ -6,12 +6,116 @@ load_dotenv(dotenv_path)
 
 class Settings:
     DB_URL = os.getenv("DB_URL")
+    # Pool de conexiones: pool_size + max_overflow debería cubrir el threadpool
+    # de la API (40 hilos por defecto), ver GET /internal/db/pool
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 30))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Réplicas de lectura separadas por comas (solo para los GET de listados)
+    DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+    # Tras escribir, el cliente lee del primario durante estos segundos
+    DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 5))
+    # Una réplica caída no se usa durante este tiempo; el monitor las comprueba cada DB_REPLICA_CHECK_SECONDS
+    DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", 30))
+    DB_REPLICA_CHECK_SECONDS = int(os.getenv("DB_REPLICA_CHECK_SECONDS", 15))
+    # Rutas calientes de sensores con AsyncSession (aiomysql / aiosqlite)
+    ASYNC_DB_ENABLED = os.getenv("ASYNC_DB_ENABLED", "false").lower() == "true"
+    # Por defecto DB_URL con el driver asíncrono equivalente
+    ASYNC_DB_URL = os.getenv("ASYNC_DB_URL")
+    # Consultas que tardan al menos estos ms se registran en el log (0 = desactivado)
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+    # Cabecera Server-Timing con sentencias y tiempo de base de datos de cada petición
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    # Máximo de sentencias por petición (0 = sin límite; las rutas pueden fijar el suyo con
+    # query_budget). Con QUERY_BUDGET_STRICT superarlo es un error en vez de un aviso
+    QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", 0))
+    QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+    # Cabecera X-Internal-Token de los endpoints /internal (sin definir quedan cerrados)
+    INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN")
+    # GET /metrics en formato Prometheus y métricas HTTP por ruta
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Perfilado de peticiones bajo demanda (sin el middleware si está desactivado): se
+    # perfila la petición con la cabecera X-Profile-Token o una fracción al azar
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+    PROFILER_TOKEN = os.getenv("PROFILER_TOKEN")
+    PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", 0))
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", 5))
+    PROFILER_DIR = os.getenv("PROFILER_DIR", "media/profiles")
+    PROFILER_MAX_FILES = int(os.getenv("PROFILER_MAX_FILES", 100))
     JWT_SECRET = os.getenv("JWT_SECRET")
     JWT_ALGORITHM = "HS256"
     EMAIL_HOST = os.getenv("EMAIL_HOST")
     EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
     EMAIL_USER = os.getenv("EMAIL_USER")
     EMAIL_PASS = os.getenv("EMAIL_PASS")
+    # STARTTLS tras conectar (desactivar solo con un SMTP local de pruebas)
+    EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "true").lower() == "true"
+    # Particionado de lectura_datos: "none", "native" (MySQL) o "tables" (SQLite)
+    READINGS_PARTITIONING = os.getenv("READINGS_PARTITIONING", "none")
+    READINGS_PARTITIONS_AHEAD = int(os.getenv("READINGS_PARTITIONS_AHEAD", 3))
+    # Lecturas por transacción al mover meses cerrados a su tabla ("tables")
+    READINGS_ROLL_CHUNK_SIZE = int(os.getenv("READINGS_ROLL_CHUNK_SIZE", 5000))
+    # Retención de lecturas crudas (se compactan a agregados por hora)
+    RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", 90))
+    RETENTION_CHUNK_SIZE = int(os.getenv("RETENTION_CHUNK_SIZE", 1000))
+    RETENTION_PAUSE_SECONDS = float(os.getenv("RETENTION_PAUSE_SECONDS", 0.2))
+    # Detección de anomalías en la ingesta
+    ANOMALY_DETECTION_ENABLED = os.getenv("ANOMALY_DETECTION_ENABLED", "true").lower() == "true"
+    ANOMALY_EWMA_ALPHA = float(os.getenv("ANOMALY_EWMA_ALPHA", 0.1))
+    ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", 4.0))
+    ANOMALY_WARMUP_READINGS = int(os.getenv("ANOMALY_WARMUP_READINGS", 20))
+    ANOMALY_STUCK_READINGS = int(os.getenv("ANOMALY_STUCK_READINGS", 30))
+    ANOMALY_COOLDOWN_SECONDS = int(os.getenv("ANOMALY_COOLDOWN_SECONDS", 900))
+    # Escritura de alertas en lotes
+    ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", 100))
+    ALERT_FLUSH_SECONDS = float(os.getenv("ALERT_FLUSH_SECONDS", 2.0))
+    ALERT_MAX_PENDING = int(os.getenv("ALERT_MAX_PENDING", 10000))
+    # Almacén de imágenes direccionado por contenido
+    IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "media/images")
+    IMAGE_THUMBNAIL_SIZES = [int(size) for size in os.getenv("IMAGE_THUMBNAIL_SIZES", "128,512").split(",") if size]
+    IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", 31536000))
+    # La imagen en /catalog/{id}/image puede cambiar: caché corta con revalidación por ETag
+    CATALOG_IMAGE_CACHE_MAX_AGE = int(os.getenv("CATALOG_IMAGE_CACHE_MAX_AGE", 86400))
+    # Índice de búsqueda del catálogo en memoria
+    CATALOG_INDEX_ENABLED = os.getenv("CATALOG_INDEX_ENABLED", "true").lower() == "true"
+    CATALOG_INDEX_TTL_SECONDS = int(os.getenv("CATALOG_INDEX_TTL_SECONDS", 300))
+    CATALOG_INDEX_CHECK_SECONDS = float(os.getenv("CATALOG_INDEX_CHECK_SECONDS", 5))
+    # Reconciliación periódica de contadores desnormalizados (0 = desactivada)
+    COUNTER_RECONCILE_SECONDS = int(os.getenv("COUNTER_RECONCILE_SECONDS", 3600))
+    # Borrado permanente de plantas en segundo plano (0 = worker desactivado)
+    PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", 30))
+    PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", 1000))
+    PURGE_PAUSE_SECONDS = float(os.getenv("PURGE_PAUSE_SECONDS", 0.05))
+    PURGE_MAX_CHUNKS_PER_RUN = int(os.getenv("PURGE_MAX_CHUNKS_PER_RUN", 200))
+    # Archivo en frío de lecturas de plantas dadas de baja
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "media/archive")
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+    ARCHIVE_CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", 5000))
+    ARCHIVE_PAUSE_SECONDS = float(os.getenv("ARCHIVE_PAUSE_SECONDS", 0.1))
+    # Segundos que se reutiliza el total de usuarios del listado
+    USER_COUNT_TTL_SECONDS = int(os.getenv("USER_COUNT_TTL_SECONDS", 60))
+    # bcrypt: coste de los hashes nuevos (los de otro coste se rehacen al iniciar sesión)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+    # Procesos dedicados a bcrypt (0 = threadpool) y operaciones en cola antes de responder 503
+    PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", 2))
+    PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", 32))
+    # Autenticación (desactivada por defecto para no romper clientes existentes)
+    DEVICE_AUTH_ENABLED = os.getenv("DEVICE_AUTH_ENABLED", "false").lower() == "true"
+    DEVICE_KEY_SECRET = os.getenv("DEVICE_KEY_SECRET")
+    # Ventana tras rotar una clave en la que otros procesos aún aceptan la anterior
+    DEVICE_KEY_CACHE_TTL_SECONDS = int(os.getenv("DEVICE_KEY_CACHE_TTL_SECONDS", 30))
+    DEVICE_KEY_NEGATIVE_TTL_SECONDS = int(os.getenv("DEVICE_KEY_NEGATIVE_TTL_SECONDS", 5))
+    JWT_AUTH_ENABLED = os.getenv("JWT_AUTH_ENABLED", "false").lower() == "true"
+    JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 10000))
+    # Bandeja de salida de correos (0 = worker desactivado, ver app/jobs/send_emails.py)
+    EMAIL_OUTBOX_INTERVAL_SECONDS = int(os.getenv("EMAIL_OUTBOX_INTERVAL_SECONDS", 15))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 8))
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+    EMAIL_RETRY_MAX_SECONDS = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", 3600))
+    EMAIL_CLAIM_SECONDS = int(os.getenv("EMAIL_CLAIM_SECONDS", 300))
 
 settings = Settings()
 
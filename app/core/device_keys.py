@@ -0,0 +1,117 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.core.config import settings
+from app.infrastructure.database.db import SessionLocal
+from app.infrastructure.database.models import Dispositivo
+
+
+def generate_device_key() -> str:
+    """Clave nueva para un dispositivo (se muestra una sola vez)"""
+    return secrets.token_urlsafe(32)
+
+
+def key_digest(key: str) -> str:
+    """
+    HMAC-SHA256 de la clave con el secreto del servidor.
+
+    En la base solo se guarda este digest: una copia de la tabla no sirve
+    para firmar lecturas sin DEVICE_KEY_SECRET. A diferencia de bcrypt,
+    cuesta microsegundos, lo que permite validarlo en cada lectura.
+    """
+    secret = device_key_secret().encode("utf-8")
+    return hmac.new(secret, key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def device_key_secret() -> str:
+    """Secreto del HMAC: DEVICE_KEY_SECRET o, en su defecto, JWT_SECRET"""
+    secret = settings.DEVICE_KEY_SECRET or settings.JWT_SECRET
+    if not secret:
+        # Con un secreto vacío cualquiera con una copia de la tabla podría fabricar claves
+        raise RuntimeError("Las claves de dispositivo requieren DEVICE_KEY_SECRET (o JWT_SECRET)")
+    return secret
+
+
+def check_device_auth_config():
+    """Fallar al arrancar si DEVICE_AUTH_ENABLED está activo sin secreto"""
+    if settings.DEVICE_AUTH_ENABLED:
+        device_key_secret()
+
+
+class DeviceKeyCache:
+    """
+    Digest de la clave de cada dispositivo, cacheado en memoria.
+
+    `invalidate` solo afecta a este proceso: tras rotar una clave, los demás
+    workers aceptan la anterior hasta `ttl` segundos. Los dispositivos sin
+    clave se recuerdan solo `negative_ttl` segundos, así una clave recién
+    generada funciona enseguida en todos los procesos.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, device_id: int) -> Optional[str]:
+        entry = self._entries.get(device_id)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        # Sesión propia y corta: la ruta no tiene que abrir una para autenticar
+        db = SessionLocal()
+        try:
+            digest = db.query(Dispositivo.clave_api_hash).filter(
+                Dispositivo.id_dispositivo == device_id
+            ).scalar()
+        finally:
+            db.close()
+        with self._lock:
+            ttl = self.ttl if digest is not None else self.negative_ttl
+            self._entries[device_id] = (time.monotonic() + ttl, digest)
+        return digest
+
+    def invalidate(self, device_id=None):
+        """Olvidar un dispositivo (o todos si no se indica)"""
+        with self._lock:
+            if device_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(device_id, None)
+
+
+device_keys = DeviceKeyCache(settings.DEVICE_KEY_CACHE_TTL_SECONDS, settings.DEVICE_KEY_NEGATIVE_TTL_SECONDS)
+
+
+def verify_device_key(device_id: int, key: str) -> bool:
+    """Comparar la clave en tiempo constante con el digest cacheado"""
+    expected = device_keys.get(device_id)
+    # Se calcula el HMAC aunque el dispositivo no tenga clave para no delatarlo por tiempo
+    candidate = key_digest(key or "")
+    return expected is not None and hmac.compare_digest(candidate, expected)
+
+
+def require_device(
+    x_device_id: Optional[int] = Header(None, description="ID del dispositivo"),
+    x_device_key: Optional[str] = Header(None, description="Clave API del dispositivo")
+) -> Optional[int]:
+    """
+    Dependencia de las rutas de ingesta: devuelve el id del dispositivo
+    autenticado, o None si DEVICE_AUTH_ENABLED está desactivado.
+    """
+    if not settings.DEVICE_AUTH_ENABLED:
+        return None
+    if x_device_id is None or not x_device_key:
+        raise HTTPException(status_code=401, detail="Faltan las cabeceras X-Device-Id y X-Device-Key")
+    if not verify_device_key(x_device_id, x_device_key):
+        raise HTTPException(status_code=401, detail="Clave de dispositivo inválida")
+    return x_device_id
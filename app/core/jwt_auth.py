@@ -0,0 +1,96 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+import jwt
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.core.config import settings
+
+
+class ClaimsCache:
+    """
+    LRU de claims de JWT ya verificados, por sha256 del token.
+
+    Cada entrada vale hasta el `exp` del token, así una petición con un
+    token ya visto no vuelve a verificar la firma ni a decodificarlo.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, key: bytes, claims: dict):
+        expires_at = claims.get("exp")
+        if expires_at is None:
+            # Sin exp no se sabe hasta cuándo vale: no se cachea
+            return
+        with self._lock:
+            self._entries[key] = (float(expires_at), claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+claims_cache = ClaimsCache(settings.JWT_CACHE_SIZE)
+
+
+def decode_jwt(token: str) -> dict:
+    """Claims de un token válido (desde la caché si ya se verificó); lanza jwt.InvalidTokenError"""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = claims_cache.get(key)
+    if claims is None:
+        claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        claims_cache.put(key, claims)
+    return claims
+
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def require_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)
+) -> Optional[dict]:
+    """
+    Dependencia de las rutas de usuario: claims del token Bearer, o None si
+    JWT_AUTH_ENABLED está desactivado.
+    """
+    if not settings.JWT_AUTH_ENABLED:
+        return None
+    if credentials is None:
+        raise HTTPException(
+            status_code=401, detail="Falta el token de acceso", headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return decode_jwt(credentials.credentials)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=401, detail="Token expirado", headers={"WWW-Authenticate": "Bearer"}
+        )
+    except jwt.InvalidTokenError:
+        raise HTTPException(
+            status_code=401, detail="Token inválido", headers={"WWW-Authenticate": "Bearer"}
+        )
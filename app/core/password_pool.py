@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core import security
+
+
+class PasswordPoolSaturatedError(RuntimeError):
+    """Hay demasiadas operaciones bcrypt en cola; el cliente debe reintentar"""
+
+
+class PasswordPool:
+    """
+    Pool de procesos acotado para bcrypt (hash y verificación).
+
+    bcrypt es CPU puro y tarda decenas o cientos de ms: ejecutarlo en el
+    threadpool de la API ocupa los hilos que usan el resto de endpoints
+    síncronos. Aquí corre en `workers` procesos propios y, como máximo,
+    `max_pending` operaciones esperan a la vez; las que superan ese límite se
+    rechazan al momento (503) en lugar de acumular latencia.
+
+    Con `workers=0` se ejecuta en el threadpool, como antes.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: los procesos no heredan hilos ni conexiones de la API
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def check_admission(self):
+        """Lanzar PasswordPoolSaturatedError si la cola ya está llena"""
+        # El event loop es un solo hilo: no hace falta lock para el contador
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordPoolSaturatedError("Demasiados inicios de sesión en curso")
+
+    async def _run(self, fn, *args):
+        self.check_admission()
+        self.pending += 1
+        try:
+            if self.workers > 0:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._get_executor(), fn, *args)
+            else:
+                result = await run_in_threadpool(fn, *args)
+            self.completed += 1
+            return result
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.hash_password, password, self.rounds)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(válida, hash nuevo si el coste configurado cambió)"""
+        return await self._run(security.verify_and_update, plain, hashed, self.rounds)
+
+    def start(self):
+        """Arrancar los procesos ya, para que el primer login no pague el arranque"""
+        if self.workers > 0:
+            executor = self._get_executor()
+            for _ in range(self.workers):
+                executor.submit(security.hash_rounds, "")
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_pool = PasswordPool(
+    settings.PASSWORD_POOL_WORKERS, settings.PASSWORD_POOL_MAX_PENDING, settings.BCRYPT_ROUNDS
+)
@@ -1,18 +1,51 @@
-from passlib.context import CryptContext
+import bcrypt
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 import jwt
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt solo usa los primeros 72 bytes; se truncan como hacía passlib
+BCRYPT_MAX_BYTES = 72
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def _secret(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    salt = bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_secret(password), salt).decode("ascii")
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    if not hashed:
+        return False
+    try:
+        return bcrypt.checkpw(_secret(plain), hashed.encode("ascii"))
+    except ValueError:
+        # Hash con formato inválido
+        return False
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Coste de un hash bcrypt ($2b$12$...) o None si no es bcrypt"""
+    parts = (hashed or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def password_needs_rehash(hashed: str, rounds: Optional[int] = None) -> bool:
+    return hash_rounds(hashed) != (rounds or settings.BCRYPT_ROUNDS)
+
+def verify_and_update(plain: str, hashed: str, rounds: Optional[int] = None) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar la contraseña y, si el hash usa otro coste que el configurado,
+    devolver también el hash nuevo para guardarlo (None si no hace falta).
+    """
+    if not verify_password(plain, hashed):
+        return False, None
+    if password_needs_rehash(hashed, rounds):
+        return True, hash_password(plain, rounds)
+    return True, None
 
 def create_jwt(data: dict, expires_delta: int = 60) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_delta)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
\ No newline at end of file
+    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, validator
+from datetime import datetime
+from typing import Optional, List
+
+class AlertResponse(BaseModel):
+    id_alerta: int
+    id_planta: int
+    tipo_alerta: str
+    nivel: str
+    mensaje: str
+    fecha_creacion: datetime
+    leida: bool
+    activa: bool
+
+    class Config:
+        from_attributes = True
+
+class AlertListResponse(BaseModel):
+    alertas: List[AlertResponse]
+    limit: int
+    next_cursor: Optional[str] = None
+    no_leidas: int
+
+class AlertMarkReadRequest(BaseModel):
+    user_id: int
+    alert_ids: Optional[List[int]] = None  # None = todas las no leídas del alcance
+    plant_id: Optional[int] = None
+
+    @validator('alert_ids')
+    def validate_alert_ids(cls, v):
+        if v is not None and not 1 <= len(v) <= 1000:
+            raise ValueError('alert_ids debe tener entre 1 y 1000 elementos')
+        return v
+
+class AlertMarkReadResponse(BaseModel):
+    msg: str
+    marcadas: int
+    no_leidas: int
+
+class UnreadCountResponse(BaseModel):
+    no_leidas: int
+    user_id: Optional[int] = None
+    plant_id: Optional[int] = None
@@ -10,6 +10,8 @@ class CatalogPlantBasic(BaseModel):
     descripcion: Optional[str] = None
     altura_maxima_cm: Optional[int] = None
     imagen_referencia: Optional[str] = None
+    imagen_url: Optional[str] = None
+    imagen_miniatura_url: Optional[str] = None
     activo: bool
     
     class Config:
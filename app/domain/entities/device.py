@@ -45,4 +45,9 @@ class DeviceResponse(BaseModel):
 
 class DeviceAssignResponse(BaseModel):
     msg: str
-    dispositivo: DeviceResponse
\ No newline at end of file
+    dispositivo: DeviceResponse
+
+class DeviceKeyResponse(BaseModel):
+    msg: str
+    id_dispositivo: int
+    clave_api: str
@@ -45,6 +45,8 @@ class CatalogPlantInfo(BaseModel):
     altura_maxima_cm: Optional[int] = None
     cuidados_especiales: Optional[str] = None
     imagen_referencia: Optional[str] = None  # ✅ AGREGADO
+    imagen_url: Optional[str] = None  # Imagen servida aparte (cacheable)
+    imagen_miniatura_url: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -76,6 +78,8 @@ class UserPlantsResponse(BaseModel):
     total_plantas: int
     plantas_activas: int
     plantas_con_dispositivo: int
+    limit: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class DevicePlantsResponse(BaseModel):
     device_id: int
@@ -83,12 +87,24 @@ class DevicePlantsResponse(BaseModel):
     nombre_dispositivo: Optional[str] = None
     plantas: List[PlantResponse]
     total_plantas: int
+    limit: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class UserDevicePlantsResponse(BaseModel):
     user_id: int
     device_id: int
     plantas: List[PlantResponse]
     total_plantas: int
+    limit: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class PlantListResponse(BaseModel):
+    plantas: List[PlantResponse]
+    total_plantas: int
+    plantas_activas: int
+    plantas_con_dispositivo: int
+    limit: int
+    next_cursor: Optional[str] = None
 
 class PlantDetailResponse(PlantResponse):
     # Información extendida
@@ -100,4 +116,24 @@ class PlantDetailResponse(PlantResponse):
 class PlantDeleteResponse(BaseModel):
     msg: str
     plant_id: int
-    deleted_permanently: bool = False
\ No newline at end of file
+    deleted_permanently: bool = False
+
+class PlantPurgeStatus(BaseModel):
+    plant_id: int
+    estado: str
+    alertas_eliminadas: int = 0
+    lecturas_eliminadas: int = 0
+    error: Optional[str] = None
+    fecha_solicitud: Optional[datetime] = None
+    fecha_actualizacion: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    status_url: str
+
+class PlantPurgeResponse(PlantDeleteResponse):
+    purga: PlantPurgeStatus
+
+class PlantRestoreResponse(BaseModel):
+    msg: str
+    plant_id: int
+    activa: bool
+    lecturas_restauradas: int = 0
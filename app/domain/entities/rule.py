@@ -0,0 +1,62 @@
+from pydantic import BaseModel, validator, root_validator
+from datetime import datetime
+from typing import Optional, List
+from app.domain.entities.sensor import SENSOR_RANGES
+
+ALERT_LEVELS = ("info", "advertencia", "critico")
+
+class CareRuleCreate(BaseModel):
+    tipo_sensor: str
+    valor_minimo: Optional[float] = None
+    valor_maximo: Optional[float] = None
+    histeresis: float = 0
+    nivel: str = "advertencia"
+
+    @validator('tipo_sensor')
+    def validate_sensor_type(cls, v):
+        if v not in SENSOR_RANGES:
+            raise ValueError(f"Tipo de sensor inválido. Use uno de: {', '.join(SENSOR_RANGES)}")
+        return v
+
+    @validator('histeresis')
+    def validate_hysteresis(cls, v):
+        if v < 0:
+            raise ValueError('La histéresis no puede ser negativa')
+        return v
+
+    @validator('nivel')
+    def validate_level(cls, v):
+        if v not in ALERT_LEVELS:
+            raise ValueError(f"Nivel inválido. Use uno de: {', '.join(ALERT_LEVELS)}")
+        return v
+
+    @root_validator(skip_on_failure=True)
+    def validate_range(cls, values):
+        minimo, maximo = values.get('valor_minimo'), values.get('valor_maximo')
+        if minimo is None and maximo is None:
+            raise ValueError('Indique al menos valor_minimo o valor_maximo')
+        if minimo is not None and maximo is not None:
+            if minimo > maximo:
+                raise ValueError('valor_minimo no puede ser mayor que valor_maximo')
+            if 2 * values.get('histeresis', 0) > maximo - minimo:
+                raise ValueError('La histéresis es demasiado grande para el rango')
+        return values
+
+class CareRuleResponse(BaseModel):
+    id_regla: int
+    id_catalogo: int
+    tipo_sensor: str
+    valor_minimo: Optional[float] = None
+    valor_maximo: Optional[float] = None
+    histeresis: float
+    nivel: str
+    activa: bool
+    fecha_creacion: datetime
+
+    class Config:
+        from_attributes = True
+
+class CareRuleListResponse(BaseModel):
+    id_catalogo: int
+    reglas: List[CareRuleResponse]
+    total: int
@@ -22,6 +22,26 @@ SENSOR_UNITS = {
     "SW-420": "boolean"
 }
 
+# Rangos físicos de medición de cada sensor (fuera de ellos la lectura es un fallo)
+SENSOR_RANGES = {
+    "YL-69": (0.0, 100.0),
+    "DHT22_TEMP": (-40.0, 80.0),
+    "DHT22_HUM": (0.0, 100.0),
+    "BH1750": (0.0, 65535.0),
+    "HC-SR04": (2.0, 400.0),
+    "YL-83": (0.0, 1.0),
+    "SW-420": (0.0, 1.0)
+}
+
+# Sensores de salida binaria (0/1)
+BINARY_SENSORS = {"YL-83", "SW-420"}
+
+def sensor_kind(tipo_sensor: str, unidad_medida: str) -> str:
+    """Clave de SENSOR_UNITS/SENSOR_RANGES (el DHT22 mide temperatura y humedad)"""
+    if tipo_sensor == "DHT22":
+        return "DHT22_TEMP" if unidad_medida == "°C" else "DHT22_HUM"
+    return tipo_sensor
+
 class SensorResponse(BaseModel):
     id_sensor: int
     tipo_sensor: str
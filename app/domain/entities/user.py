@@ -43,4 +43,6 @@ class UsersListResponse(BaseModel):
     usuarios: List[UserResponse]
     total: int
     skip: int
-    limit: int
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = None
+    search_term: Optional[str] = None
\ No newline at end of file
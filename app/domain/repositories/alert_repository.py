@@ -0,0 +1,179 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, func, case, or_, and_
+from sqlalchemy.orm import Session
+from app.infrastructure.database.models import (
+    Alerta, Planta, ContadorAlertasPlanta, ContadorAlertasUsuario
+)
+from app.infrastructure.database.upsert import upsert
+
+PLANT_COUNTERS = ContadorAlertasPlanta.__table__
+USER_COUNTERS = ContadorAlertasUsuario.__table__
+
+def _unread_filter():
+    return and_(Alerta.leida == False, Alerta.activa == True)
+
+def list_alerts(
+    db: Session,
+    user_id: Optional[int] = None,
+    plant_id: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 50,
+    unread_only: bool = False
+):
+    """Obtener alertas ordenadas por (fecha_creacion, id_alerta) descendente a partir de un cursor"""
+    query = db.query(Alerta)
+
+    if plant_id is not None:
+        query = query.filter(Alerta.id_planta == plant_id)
+    if user_id is not None:
+        query = query.filter(Alerta.id_planta.in_(
+            select(Planta.id_planta).where(Planta.id_usuario == user_id, Planta.pendiente_purga == False)
+        ))
+    if unread_only:
+        query = query.filter(_unread_filter())
+    if after:
+        fecha, id_alerta = after
+        query = query.filter(or_(
+            Alerta.fecha_creacion < fecha,
+            and_(Alerta.fecha_creacion == fecha, Alerta.id_alerta < id_alerta)
+        ))
+
+    # Se pide una fila extra para saber si hay más páginas
+    rows = query.order_by(
+        Alerta.fecha_creacion.desc(), Alerta.id_alerta.desc()
+    ).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+def get_user_unread_count(db: Session, user_id: int) -> int:
+    """Alertas no leídas del usuario desde su contador"""
+    return db.execute(
+        select(USER_COUNTERS.c.no_leidas).where(USER_COUNTERS.c.id_usuario == user_id)
+    ).scalar() or 0
+
+def get_plant_unread_count(db: Session, plant_id: int) -> int:
+    """Alertas no leídas de la planta desde su contador"""
+    return db.execute(
+        select(PLANT_COUNTERS.c.no_leidas).where(PLANT_COUNTERS.c.id_planta == plant_id)
+    ).scalar() or 0
+
+def _bump(db, table, where, delta: int, key_values: dict):
+    """Sumar `delta` a un contador (nunca por debajo de 0) y crearlo si no existe"""
+    new_value = table.c.no_leidas + delta
+    clamped = case((new_value < 0, 0), else_=new_value)
+    if delta > 0:
+        upsert(db, table, {"no_leidas": delta, **key_values}, {"no_leidas": clamped})
+    else:
+        db.execute(table.update().where(where).values(no_leidas=clamped))
+
+def _apply_counts(db, plant_counts: Dict[int, int], owners: Dict[int, int], sign: int):
+    user_counts = Counter()
+    for plant_id, count in plant_counts.items():
+        user_id = owners.get(plant_id)
+        if user_id is None or not count:
+            continue
+        _bump(db, PLANT_COUNTERS, PLANT_COUNTERS.c.id_planta == plant_id, sign * count,
+              {"id_planta": plant_id, "id_usuario": user_id})
+        user_counts[user_id] += count
+    for user_id, count in user_counts.items():
+        _bump(db, USER_COUNTERS, USER_COUNTERS.c.id_usuario == user_id, sign * count,
+              {"id_usuario": user_id})
+
+def increment_unread_counters(db, plant_counts: Dict[int, int]):
+    """Sumar alertas nuevas a los contadores (en la misma transacción que el INSERT)"""
+    if not plant_counts:
+        return
+    owners = dict(db.execute(
+        select(Planta.id_planta, Planta.id_usuario).where(Planta.id_planta.in_(list(plant_counts)))
+    ).all())
+    _apply_counts(db, plant_counts, owners, 1)
+
+def mark_alerts_read(
+    db: Session,
+    user_id: int,
+    alert_ids: Optional[List[int]] = None,
+    plant_id: Optional[int] = None
+) -> int:
+    """Marcar como leídas alertas del usuario y descontarlas de los contadores"""
+    query = select(Alerta.id_alerta, Alerta.id_planta).join(
+        Planta, Planta.id_planta == Alerta.id_planta
+    ).where(Planta.id_usuario == user_id, Planta.pendiente_purga == False, _unread_filter())
+    if alert_ids is not None:
+        query = query.where(Alerta.id_alerta.in_(alert_ids))
+    if plant_id is not None:
+        query = query.where(Alerta.id_planta == plant_id)
+
+    rows = db.execute(query.with_for_update(of=Alerta)).all()
+    if not rows:
+        return 0
+
+    db.execute(
+        Alerta.__table__.update()
+        .where(Alerta.id_alerta.in_([row.id_alerta for row in rows]))
+        .values(leida=True)
+    )
+    plant_counts = Counter(row.id_planta for row in rows)
+    _apply_counts(db, plant_counts, {plant: user_id for plant in plant_counts}, -1)
+    return len(rows)
+
+def remove_plant_counters(db: Session, plant_id: int):
+    """Eliminar el contador de una planta descontándolo de su usuario"""
+    row = db.execute(
+        select(PLANT_COUNTERS.c.id_usuario, PLANT_COUNTERS.c.no_leidas)
+        .where(PLANT_COUNTERS.c.id_planta == plant_id)
+    ).first()
+    if not row:
+        return
+    _bump(db, USER_COUNTERS, USER_COUNTERS.c.id_usuario == row.id_usuario, -row.no_leidas, {})
+    db.execute(PLANT_COUNTERS.delete().where(PLANT_COUNTERS.c.id_planta == plant_id))
+
+def reconcile_unread_counters(db) -> int:
+    """
+    Recalcular los contadores a partir de la tabla de alertas.
+
+    Se corrigen en su sitio (UPDATE ... SET = (subconsulta)) y se crean los que
+    faltan, sin vaciar las tablas. Las plantas pendientes de purga no cuentan:
+    sus alertas ya no se listan y la purga borra su contador. Devuelve cuántos
+    contadores se corrigieron.
+    """
+    purging = select(Planta.id_planta).where(Planta.pendiente_purga == True)
+    unread_plant = select(func.count()).where(
+        _unread_filter(), Alerta.id_planta == PLANT_COUNTERS.c.id_planta
+    ).scalar_subquery()
+    fixed = db.execute(
+        PLANT_COUNTERS.update()
+        .where(PLANT_COUNTERS.c.no_leidas != unread_plant, PLANT_COUNTERS.c.id_planta.not_in(purging))
+        .values(no_leidas=unread_plant)
+    ).rowcount
+
+    rows = db.execute(
+        select(Alerta.id_planta, Planta.id_usuario, func.count())
+        .join(Planta, Planta.id_planta == Alerta.id_planta)
+        .where(_unread_filter(), Planta.pendiente_purga == False)
+        .group_by(Alerta.id_planta, Planta.id_usuario)
+    ).all()
+    existing = set(db.execute(select(PLANT_COUNTERS.c.id_planta)).scalars().all())
+    for plant_id, user_id, count in rows:
+        if plant_id not in existing:
+            upsert(db, PLANT_COUNTERS, {"id_planta": plant_id, "id_usuario": user_id, "no_leidas": count},
+                   {"no_leidas": count})
+            fixed += 1
+
+    unread_user = select(func.coalesce(func.sum(PLANT_COUNTERS.c.no_leidas), 0)).where(
+        PLANT_COUNTERS.c.id_usuario == USER_COUNTERS.c.id_usuario,
+        PLANT_COUNTERS.c.id_planta.not_in(purging)
+    ).scalar_subquery()
+    fixed += db.execute(
+        USER_COUNTERS.update().where(USER_COUNTERS.c.no_leidas != unread_user).values(no_leidas=unread_user)
+    ).rowcount
+
+    user_counts = Counter()
+    for _, user_id, count in rows:
+        user_counts[user_id] += count
+    existing = set(db.execute(select(USER_COUNTERS.c.id_usuario)).scalars().all())
+    for user_id, count in user_counts.items():
+        if user_id not in existing:
+            upsert(db, USER_COUNTERS, {"id_usuario": user_id, "no_leidas": count}, {"no_leidas": count})
+            fixed += 1
+    return fixed
@@ -0,0 +1,120 @@
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+from app.infrastructure.database.models import Planta, ContadorCatalogo, ContadorCatalogoUsuario
+from app.infrastructure.database.upsert import upsert
+
+CATALOG_COUNTERS = ContadorCatalogo.__table__
+CATALOG_USER_COUNTERS = ContadorCatalogoUsuario.__table__
+
+def get_catalog_counters(db: Session, catalog_id: int) -> dict:
+    """Plantas activas y usuarios activos de una especie desde su contador"""
+    row = db.execute(
+        select(CATALOG_COUNTERS.c.plantas_activas, CATALOG_COUNTERS.c.usuarios_activos)
+        .where(CATALOG_COUNTERS.c.id_catalogo == catalog_id)
+    ).first()
+    return {
+        'total_plantas': row.plantas_activas if row else 0,
+        'usuarios_activos': row.usuarios_activos if row else 0
+    }
+
+def _clamped(column, delta: int):
+    value = column + delta
+    return case((value < 0, 0), else_=value)
+
+def _bump_catalog(db, catalog_id: int, plantas: int, usuarios: int):
+    if plantas > 0:
+        # Crear el contador si no existe en la misma sentencia que lo incrementa
+        upsert(db, CATALOG_COUNTERS,
+               {"id_catalogo": catalog_id, "plantas_activas": plantas, "usuarios_activos": max(usuarios, 0)},
+               {"plantas_activas": _clamped(CATALOG_COUNTERS.c.plantas_activas, plantas),
+                "usuarios_activos": _clamped(CATALOG_COUNTERS.c.usuarios_activos, usuarios)})
+        return
+    db.execute(
+        CATALOG_COUNTERS.update().where(CATALOG_COUNTERS.c.id_catalogo == catalog_id).values(
+            plantas_activas=_clamped(CATALOG_COUNTERS.c.plantas_activas, plantas),
+            usuarios_activos=_clamped(CATALOG_COUNTERS.c.usuarios_activos, usuarios)
+        )
+    )
+
+def add_active_plant(db: Session, catalog_id: int, user_id: int):
+    """Contar una planta activa más (en la misma transacción que el INSERT/UPDATE)"""
+    pair = (CATALOG_USER_COUNTERS.c.id_catalogo == catalog_id) & (CATALOG_USER_COUNTERS.c.id_usuario == user_id)
+    upsert(db, CATALOG_USER_COUNTERS,
+           {"id_catalogo": catalog_id, "id_usuario": user_id, "plantas_activas": 1},
+           {"plantas_activas": CATALOG_USER_COUNTERS.c.plantas_activas + 1})
+    # El upsert deja la fila bloqueada hasta el commit: si vale 1 es la primera
+    # planta activa de este usuario para la especie
+    plantas = db.execute(select(CATALOG_USER_COUNTERS.c.plantas_activas).where(pair)).scalar()
+    _bump_catalog(db, catalog_id, 1, 1 if plantas == 1 else 0)
+
+def remove_active_plant(db: Session, catalog_id: int, user_id: int):
+    """Descontar una planta activa (baja lógica o borrado)"""
+    pair = (CATALOG_USER_COUNTERS.c.id_catalogo == catalog_id) & (CATALOG_USER_COUNTERS.c.id_usuario == user_id)
+    row = db.execute(
+        select(CATALOG_USER_COUNTERS.c.plantas_activas).where(pair).with_for_update()
+    ).first()
+    if row is None:
+        # Contadores desincronizados: la reconciliación lo corrige
+        return
+
+    if row.plantas_activas <= 1:
+        # Era la última planta activa del usuario para la especie
+        db.execute(CATALOG_USER_COUNTERS.delete().where(pair))
+        _bump_catalog(db, catalog_id, -1, -1)
+    else:
+        db.execute(CATALOG_USER_COUNTERS.update().where(pair).values(
+            plantas_activas=CATALOG_USER_COUNTERS.c.plantas_activas - 1
+        ))
+        _bump_catalog(db, catalog_id, -1, 0)
+
+def reconcile_catalog_counters(db) -> int:
+    """
+    Recalcular los contadores del catálogo a partir de las plantas activas.
+
+    Se corrigen en su sitio (UPDATE ... SET = (subconsulta)) y se crean los que
+    faltan: los contadores no desaparecen mientras se reconcilia. Devuelve
+    cuántos contadores se corrigieron.
+    """
+    ccu = CATALOG_USER_COUNTERS
+    active_pair = select(func.count()).where(
+        Planta.activa == True, Planta.id_catalogo == ccu.c.id_catalogo, Planta.id_usuario == ccu.c.id_usuario
+    ).scalar_subquery()
+    fixed = db.execute(
+        ccu.update().where(ccu.c.plantas_activas != active_pair).values(plantas_activas=active_pair)
+    ).rowcount
+    db.execute(ccu.delete().where(ccu.c.plantas_activas <= 0))
+
+    pairs = db.execute(
+        select(Planta.id_catalogo, Planta.id_usuario, func.count())
+        .where(Planta.activa == True)
+        .group_by(Planta.id_catalogo, Planta.id_usuario)
+    ).all()
+    existing = set(db.execute(select(ccu.c.id_catalogo, ccu.c.id_usuario)).all())
+    for catalog_id, user_id, count in pairs:
+        if (catalog_id, user_id) not in existing:
+            upsert(db, ccu, {"id_catalogo": catalog_id, "id_usuario": user_id, "plantas_activas": count},
+                   {"plantas_activas": count})
+            fixed += 1
+
+    cc = CATALOG_COUNTERS
+    active_plants = select(func.count()).where(
+        Planta.activa == True, Planta.id_catalogo == cc.c.id_catalogo
+    ).scalar_subquery()
+    active_users = select(func.count()).where(ccu.c.id_catalogo == cc.c.id_catalogo).scalar_subquery()
+    fixed += db.execute(
+        cc.update()
+        .where((cc.c.plantas_activas != active_plants) | (cc.c.usuarios_activos != active_users))
+        .values(plantas_activas=active_plants, usuarios_activos=active_users)
+    ).rowcount
+
+    existing = set(db.execute(select(cc.c.id_catalogo)).scalars().all())
+    totals = {}
+    for catalog_id, _, count in pairs:
+        plantas, usuarios = totals.get(catalog_id, (0, 0))
+        totals[catalog_id] = (plantas + count, usuarios + 1)
+    for catalog_id, (plantas, usuarios) in totals.items():
+        if catalog_id not in existing:
+            upsert(db, cc, {"id_catalogo": catalog_id, "plantas_activas": plantas, "usuarios_activos": usuarios},
+                   {"plantas_activas": plantas, "usuarios_activos": usuarios})
+            fixed += 1
+    return fixed
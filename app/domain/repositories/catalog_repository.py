@@ -1,8 +1,11 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, distinct
-from app.infrastructure.database.models import CatalogoPlanta, Planta, Usuario
+from sqlalchemy.orm import Session, defer
+from app.infrastructure.database.models import CatalogoPlanta, VersionDatos
+from app.infrastructure.database.upsert import upsert
+from app.domain.repositories.catalog_counter_repository import get_catalog_counters
 from typing import Optional
 
+CATALOG_VERSION_KEY = "catalogo"
+
 def get_all_catalog_plants(
     db: Session, 
     skip: int = 0, 
@@ -10,8 +13,8 @@ def get_all_catalog_plants(
     search: Optional[str] = None, 
     active_only: bool = True
 ):
-    """Obtener plantas del catálogo con filtros"""
-    query = db.query(CatalogoPlanta)
+    """Obtener plantas del catálogo con filtros (sin cargar la imagen en línea)"""
+    query = db.query(CatalogoPlanta).options(defer(CatalogoPlanta.imagen_referencia))
     
     # Filtrar solo activas si se especifica
     if active_only:
@@ -61,21 +64,8 @@ def get_catalog_plant_by_id_with_stats(db: Session, catalog_id: int):
     if not plant:
         return None
     
-    # Obtener estadísticas
-    total_plantas = db.query(Planta).filter(
-        Planta.id_catalogo == catalog_id,
-        Planta.activa == True
-    ).count()
-    
-    usuarios_activos = db.query(distinct(Planta.id_usuario)).filter(
-        Planta.id_catalogo == catalog_id,
-        Planta.activa == True
-    ).count()
-    
-    stats = {
-        'total_plantas': total_plantas,
-        'usuarios_activos': usuarios_activos
-    }
+    # Estadísticas desde los contadores mantenidos (lectura por clave)
+    stats = get_catalog_counters(db, catalog_id)
     
     return plant, stats
 
@@ -84,4 +74,32 @@ def get_catalog_plant_by_id(db: Session, catalog_id: int):
     return db.query(CatalogoPlanta).filter(
         CatalogoPlanta.id_catalogo == catalog_id,
         CatalogoPlanta.activo == True
-    ).first()
\ No newline at end of file
+    ).first()
+
+def get_catalog_image(db: Session, catalog_id: int):
+    """Obtener solo la imagen de referencia (en línea y/o hash) de una planta del catálogo"""
+    return db.query(CatalogoPlanta.imagen_referencia, CatalogoPlanta.imagen_hash).filter(
+        CatalogoPlanta.id_catalogo == catalog_id
+    ).first()
+
+def get_catalog_index_rows(db: Session):
+    """Columnas ligeras de todo el catálogo para el índice de búsqueda en memoria"""
+    return db.query(
+        CatalogoPlanta.id_catalogo,
+        CatalogoPlanta.nombre_comun,
+        CatalogoPlanta.nombre_cientifico,
+        CatalogoPlanta.descripcion,
+        CatalogoPlanta.altura_maxima_cm,
+        CatalogoPlanta.activo,
+        CatalogoPlanta.imagen_hash,
+        CatalogoPlanta.tiene_imagen
+    ).all()
+
+def get_catalog_version(db: Session) -> int:
+    """Versión del catálogo (0 si nunca se subió)"""
+    return db.query(VersionDatos.version).filter(VersionDatos.clave == CATALOG_VERSION_KEY).scalar() or 0
+
+def bump_catalog_version(db: Session):
+    """Avisar a los índices del catálogo de otros procesos (en la misma transacción que el cambio)"""
+    table = VersionDatos.__table__
+    upsert(db, table, {"clave": CATALOG_VERSION_KEY, "version": 1}, {"version": table.c.version + 1})
@@ -36,4 +36,11 @@ def update_device_name(db: Session, device_id: int, nombre_dispositivo: str):
         device.nombre_dispositivo = nombre_dispositivo
         db.commit()
         db.refresh(device)
-    return device
\ No newline at end of file
+    return device
+
+def set_device_key_hash(db: Session, device_id: int, key_hash: str):
+    """Guardar el digest de la clave API de un dispositivo"""
+    db.query(Dispositivo).filter(Dispositivo.id_dispositivo == device_id).update(
+        {Dispositivo.clave_api_hash: key_hash}, synchronize_session=False
+    )
+    db.commit()
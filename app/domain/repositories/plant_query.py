@@ -0,0 +1,159 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import func, case, and_, or_
+from sqlalchemy.orm import Session, joinedload
+from app.infrastructure.database.models import Planta, CatalogoPlanta
+
+# Campos de orden admitidos -> (expresión, conversión del valor del cursor)
+SORT_FIELDS = {
+    "fecha_registro": (Planta.fecha_registro, datetime.fromisoformat),
+    "nombre": (func.coalesce(Planta.nombre_personalizado, ""), str),
+    "id": (Planta.id_planta, int),
+}
+
+MAX_LIMIT = 200
+
+
+class InvalidCursorError(ValueError):
+    """El cursor de paginación no corresponde a este orden o está dañado"""
+
+
+def _encode_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class PlantQuery:
+    """
+    Consulta componible de plantas.
+
+    Los filtros se encadenan (`for_user`, `on_device`, `of_catalog`, `active`,
+    `located`) y la misma consulta sirve para:
+
+    - `page()`: una página ordenada por (campo, id_planta) con paginación por
+      cursor (keyset), sin OFFSET y sin cargar el resto de filas;
+    - `summary()`: total, activas y con dispositivo calculados en SQL con un
+      solo agregado sobre los mismos filtros.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        # Las plantas en purga ya no existen para el usuario
+        self._filters = [Planta.pendiente_purga == False]
+        self._sort = "fecha_registro"
+        self._descending = True
+        self._include_image = False
+
+    # -- filtros -------------------------------------------------------
+    def for_user(self, user_id: Optional[int]):
+        if user_id is not None:
+            self._filters.append(Planta.id_usuario == user_id)
+        return self
+
+    def on_device(self, device_id: Optional[int]):
+        if device_id is not None:
+            self._filters.append(Planta.id_dispositivo == device_id)
+        return self
+
+    def of_catalog(self, catalog_id: Optional[int]):
+        if catalog_id is not None:
+            self._filters.append(Planta.id_catalogo == catalog_id)
+        return self
+
+    def active(self, activa: Optional[bool]):
+        """True: solo activas; False: solo eliminadas; None: todas"""
+        if activa is not None:
+            self._filters.append(Planta.activa == activa)
+        return self
+
+    def located(self, ubicacion: Optional[str]):
+        if ubicacion:
+            self._filters.append(Planta.ubicacion.ilike(f"%{ubicacion.strip()}%"))
+        return self
+
+    # -- orden y carga --------------------------------------------------
+    def order_by(self, field: str = "fecha_registro", descending: bool = True):
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Orden no válido: {field}")
+        self._sort = field
+        self._descending = descending
+        return self
+
+    def with_image(self, include_image: bool = True):
+        self._include_image = include_image
+        return self
+
+    # -- cursor ---------------------------------------------------------
+    def encode_cursor(self, planta) -> str:
+        if self._sort == "nombre":
+            value = planta.nombre_personalizado or ""
+        else:
+            value = getattr(planta, SORT_FIELDS[self._sort][0].key)
+        raw = json.dumps([self._sort, _encode_value(value), planta.id_planta])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> Tuple[object, int]:
+        try:
+            sort, value, id_planta = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            if sort != self._sort:
+                raise InvalidCursorError("El cursor corresponde a otro orden")
+            # null: la fila del cursor no tenía valor (p. ej. fecha_registro NULL)
+            return (None if value is None else SORT_FIELDS[sort][1](value)), int(id_planta)
+        except InvalidCursorError:
+            raise
+        except Exception:
+            raise InvalidCursorError("Cursor de paginación inválido")
+
+    def _after(self, cursor: str):
+        value, id_planta = self.decode_cursor(cursor)
+        column = SORT_FIELDS[self._sort][0]
+        if self._sort == "id":
+            return Planta.id_planta < id_planta if self._descending else Planta.id_planta > id_planta
+        # MySQL y SQLite ordenan NULL como el menor valor: al final en DESC, al principio en ASC
+        if value is None:
+            if self._descending:
+                return and_(column.is_(None), Planta.id_planta < id_planta)
+            return or_(column.isnot(None), and_(column.is_(None), Planta.id_planta > id_planta))
+        if self._descending:
+            return or_(column < value, and_(column == value, Planta.id_planta < id_planta), column.is_(None))
+        return or_(column > value, and_(column == value, Planta.id_planta > id_planta))
+
+    # -- ejecución ------------------------------------------------------
+    def page(self, limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Planta], Optional[str]]:
+        """Una página de plantas y el cursor de la siguiente (None si no hay más)"""
+        limit = max(1, min(limit, MAX_LIMIT))
+        loader = joinedload(Planta.catalogo_info)
+        if not self._include_image:
+            loader = loader.defer(CatalogoPlanta.imagen_referencia)
+
+        query = self.db.query(Planta).options(loader).filter(*self._filters)
+        if cursor:
+            query = query.filter(self._after(cursor))
+
+        column = SORT_FIELDS[self._sort][0]
+        if self._sort == "id":
+            ordering = [Planta.id_planta.desc() if self._descending else Planta.id_planta.asc()]
+        elif self._descending:
+            ordering = [column.desc(), Planta.id_planta.desc()]
+        else:
+            ordering = [column.asc(), Planta.id_planta.asc()]
+
+        # Una fila extra indica si hay otra página
+        rows = query.order_by(*ordering).limit(limit + 1).all()
+        plantas = rows[:limit]
+        next_cursor = self.encode_cursor(plantas[-1]) if len(rows) > limit else None
+        return plantas, next_cursor
+
+    def summary(self) -> dict:
+        """Totales de las plantas que cumplen los filtros (un solo agregado en SQL)"""
+        total, activas, con_dispositivo = self.db.query(
+            func.count(Planta.id_planta),
+            func.coalesce(func.sum(case((Planta.activa == True, 1), else_=0)), 0),
+            func.count(Planta.id_dispositivo)
+        ).filter(*self._filters).one()
+        return {
+            "total_plantas": total,
+            "plantas_activas": int(activas),
+            "plantas_con_dispositivo": con_dispositivo
+        }
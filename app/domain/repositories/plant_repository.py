@@ -1,10 +1,14 @@
+from datetime import datetime
 from sqlalchemy.orm import Session, joinedload
 from app.infrastructure.database.models import Planta, CatalogoPlanta, Usuario, Dispositivo
+from app.domain.repositories.catalog_counter_repository import add_active_plant
 
 def create_plant(db: Session, plant_data: dict):
-    """Crear una nueva planta"""
+    """Crear una nueva planta (y contarla en los contadores del catálogo)"""
     db_plant = Planta(**plant_data)
     db.add(db_plant)
+    if plant_data.get("activa", True):
+        add_active_plant(db, plant_data["id_catalogo"], plant_data["id_usuario"])
     db.commit()
     db.refresh(db_plant)
     return db_plant
@@ -52,6 +56,7 @@ def soft_delete_plant(db: Session, plant_id: int):
     plant = db.query(Planta).filter(Planta.id_planta == plant_id).first()
     if plant:
         plant.activa = False
+        plant.fecha_baja = datetime.utcnow()
         db.commit()
         db.refresh(plant)
     return plant
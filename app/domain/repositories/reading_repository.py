@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.infrastructure.database.partitions import reading_source
+
+def _latest_readings_query(sensor_ids: List[int]):
+    """SELECT de la última lectura por sensor (máximo por grupo)"""
+    Lectura = reading_source()
+
+    # MAX(fecha_hora) por sensor se resuelve sobre ix_lectura_sensor_fecha
+    ultimas = select(
+        Lectura.id_sensor.label("id_sensor"),
+        func.max(Lectura.fecha_hora).label("fecha_hora")
+    ).where(Lectura.id_sensor.in_(sensor_ids)).group_by(Lectura.id_sensor).subquery()
+
+    return select(Lectura).join(ultimas, and_(
+        Lectura.id_sensor == ultimas.c.id_sensor,
+        Lectura.fecha_hora == ultimas.c.fecha_hora
+    ))
+
+def _latest_by_sensor(rows) -> Dict[int, object]:
+    # Si dos lecturas comparten fecha_hora gana la de mayor id
+    latest = {}
+    for lectura in rows:
+        current = latest.get(lectura.id_sensor)
+        if current is None or lectura.id_lectura > current.id_lectura:
+            latest[lectura.id_sensor] = lectura
+    return latest
+
+def get_latest_readings_by_sensor(db: Session, sensor_ids: List[int]) -> Dict[int, object]:
+    """Última lectura de cada sensor en una sola consulta (máximo por grupo)"""
+    if not sensor_ids:
+        return {}
+    return _latest_by_sensor(db.execute(_latest_readings_query(sensor_ids)).scalars().all())
+
+async def get_latest_readings_by_sensor_async(db: AsyncSession, sensor_ids: List[int]) -> Dict[int, object]:
+    """Igual que get_latest_readings_by_sensor, con AsyncSession"""
+    if not sensor_ids:
+        return {}
+    return _latest_by_sensor((await db.execute(_latest_readings_query(sensor_ids))).scalars().all())
+
+def get_reading_stats_by_sensor(db: Session, sensor_ids: List[int], since: datetime) -> Dict[int, dict]:
+    """Conteo, promedio, mínimo y máximo por sensor desde `since` en una sola consulta"""
+    if not sensor_ids:
+        return {}
+    Lectura = reading_source(date_from=since)
+
+    rows = db.execute(
+        select(
+            Lectura.id_sensor,
+            func.count(),
+            func.avg(Lectura.valor),
+            func.min(Lectura.valor),
+            func.max(Lectura.valor)
+        ).where(
+            Lectura.id_sensor.in_(sensor_ids),
+            Lectura.fecha_hora >= since
+        ).group_by(Lectura.id_sensor)
+    ).all()
+
+    return {
+        id_sensor: {
+            "total_lecturas": total,
+            "promedio": float(promedio) if promedio is not None else None,
+            "minimo": float(minimo) if minimo is not None else None,
+            "maximo": float(maximo) if maximo is not None else None
+        }
+        for id_sensor, total, promedio, minimo, maximo in rows
+    }
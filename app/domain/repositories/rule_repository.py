@@ -0,0 +1,32 @@
+from sqlalchemy.orm import Session
+from app.infrastructure.database.models import ReglaCuidado
+
+def get_active_rules(db: Session):
+    """Obtener todas las reglas de cuidado activas"""
+    return db.query(ReglaCuidado).filter(ReglaCuidado.activa == True).all()
+
+def get_catalog_rules(db: Session, catalog_id: int):
+    """Obtener las reglas activas de una planta del catálogo"""
+    return db.query(ReglaCuidado).filter(
+        ReglaCuidado.id_catalogo == catalog_id,
+        ReglaCuidado.activa == True
+    ).order_by(ReglaCuidado.tipo_sensor, ReglaCuidado.id_regla).all()
+
+def create_rule(db: Session, rule_data: dict):
+    """Crear una regla de cuidado"""
+    db_rule = ReglaCuidado(**rule_data)
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+def deactivate_rule(db: Session, catalog_id: int, rule_id: int):
+    """Desactivar una regla de cuidado de la planta del catálogo"""
+    rule = db.query(ReglaCuidado).filter(
+        ReglaCuidado.id_regla == rule_id,
+        ReglaCuidado.id_catalogo == catalog_id
+    ).first()
+    if rule:
+        rule.activa = False
+        db.commit()
+    return rule
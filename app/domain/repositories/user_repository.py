@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
 from app.infrastructure.database.models import Usuario, Dispositivo
 
 def create_user(db: Session, user_data):
@@ -13,7 +14,7 @@ def get_user_by_username(db: Session, username: str):
 
 def get_user_with_devices(db: Session, username: str):
     """Obtiene usuario con sus dispositivos asociados"""
-    return db.query(Usuario).filter(Usuario.usuario == username).first()
+    return db.query(Usuario).options(selectinload(Usuario.dispositivos)).filter(Usuario.usuario == username).first()
 
 def get_user_devices(db: Session, user_id: int):
     """Obtiene todos los dispositivos asociados a un usuario"""
@@ -23,10 +24,39 @@ def get_all_users(db: Session, skip: int = 0, limit: int = 100):
     """Obtiene todos los usuarios con paginación"""
     return db.query(Usuario).offset(skip).limit(limit).all()
 
+def _prefix_range(column, prefix: str):
+    """Prefijo como rango [prefix, sucesor) para que use el índice (LIKE no lo usa en SQLite)"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(column >= prefix, column < upper)
+
+def get_users_page(db: Session, after_id=None, limit: int = 100, search=None, skip: int = 0):
+    """Página de usuarios por id con sus dispositivos (dos consultas en total)"""
+    query = db.query(Usuario).options(selectinload(Usuario.dispositivos))
+    if search:
+        query = query.filter(or_(
+            _prefix_range(Usuario.usuario, search),
+            _prefix_range(Usuario.correo, search)
+        ))
+    if after_id is not None:
+        query = query.filter(Usuario.id_usuario > after_id)
+    elif skip:
+        query = query.offset(skip)
+
+    # Una fila extra indica si hay otra página
+    rows = query.order_by(Usuario.id_usuario).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
 def get_users_count(db: Session):
     """Obtiene el total de usuarios registrados"""
     return db.query(Usuario).count()
 
 def get_user_by_id(db: Session, user_id: int):
     """Obtiene usuario por ID"""
-    return db.query(Usuario).filter(Usuario.id_usuario == user_id).first()
\ No newline at end of file
+    return db.query(Usuario).options(selectinload(Usuario.dispositivos)).filter(Usuario.id_usuario == user_id).first()
+
+def update_user_password(db: Session, user_id: int, hashed: str):
+    """Guardar un hash de contraseña nuevo (p. ej. al cambiar el coste de bcrypt)"""
+    db.query(Usuario).filter(Usuario.id_usuario == user_id).update(
+        {Usuario.contrasena: hashed}, synchronize_session=False
+    )
+    db.commit()
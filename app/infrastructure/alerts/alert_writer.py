@@ -0,0 +1,129 @@
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import List
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+from app.infrastructure.database.db import SessionLocal
+from app.infrastructure.database.models import Alerta
+from app.infrastructure.workers import PeriodicWorker
+from app.domain.repositories.alert_repository import increment_unread_counters
+
+logger = logging.getLogger(__name__)
+
+
+class AlertBatchWriter:
+    """
+    Búfer de alertas que se escriben en lotes desde un hilo en segundo plano.
+
+    `add` solo encola (O(1)); el worker inserta todo el búfer en una sola
+    sentencia cada ALERT_FLUSH_SECONDS o en cuanto se alcanza ALERT_BATCH_SIZE.
+    Si el lote falla se insertan de una en una y se descartan las que fallen;
+    el búfer no pasa de `max_pending` (se descartan las más antiguas).
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float, max_pending: int):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._worker = PeriodicWorker("alert-writer", flush_seconds, self.flush)
+        self.written = 0
+        self.dropped = 0
+
+    def start(self):
+        self._worker.start()
+
+    def stop(self):
+        self._worker.stop()
+        self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, id_planta: int, tipo_alerta: str, nivel: str, mensaje: str):
+        alert = {
+            "id_planta": id_planta,
+            "tipo_alerta": tipo_alerta,
+            "nivel": nivel,
+            "mensaje": mensaje,
+            "fecha_creacion": datetime.utcnow(),
+            "leida": False,
+            "activa": True,
+        }
+        with self._lock:
+            self._pending.append(alert)
+            self._trim()
+            full = len(self._pending) >= self.batch_size
+        if full:
+            if self._worker.running:
+                self._worker.wake()
+            else:
+                try:
+                    self.flush()
+                except Exception:
+                    # Se llama tras guardar la lectura: un fallo aquí no debe hacer fallar la petición
+                    logger.exception("Error al escribir alertas pendientes")
+
+    def _trim(self):
+        # Con el lock tomado
+        excess = len(self._pending) - self.max_pending
+        if excess > 0:
+            del self._pending[:excess]
+            self.dropped += excess
+            logger.warning("Búfer de alertas lleno (%s): se descartan %s alertas", self.max_pending, excess)
+
+    def flush(self) -> int:
+        """Insertar las alertas pendientes; devuelve cuántas se escribieron"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        try:
+            self._insert(batch)
+            written = len(batch)
+        except Exception:
+            logger.exception("Error al insertar un lote de %s alertas; se reintenta de una en una", len(batch))
+            written = self._insert_one_by_one(batch)
+
+        self.written += written
+        return written
+
+    def _insert(self, batch: List[dict]):
+        db = SessionLocal()
+        try:
+            db.execute(Alerta.__table__.insert(), batch)
+            # Los contadores de no leídas se actualizan en la misma transacción
+            increment_unread_counters(db, Counter(alert["id_planta"] for alert in batch))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert_one_by_one(self, batch: List[dict]) -> int:
+        written = 0
+        for index, alert in enumerate(batch):
+            try:
+                self._insert([alert])
+                written += 1
+            except OperationalError:
+                # Base de datos no disponible: el resto vuelve al búfer (acotado) para la siguiente pasada
+                logger.exception("Base de datos no disponible; %s alertas vuelven al búfer", len(batch) - index)
+                with self._lock:
+                    self._pending[:0] = batch[index:]
+                    self._trim()
+                break
+            except Exception:
+                # Fila que no se puede insertar (p. ej. planta borrada): se descarta
+                self.dropped += 1
+                logger.exception("Se descarta la alerta %s", alert)
+        return written
+
+alert_writer = AlertBatchWriter(
+    settings.ALERT_BATCH_SIZE, settings.ALERT_FLUSH_SECONDS, settings.ALERT_MAX_PENDING
+)
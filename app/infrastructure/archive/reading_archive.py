@@ -0,0 +1,70 @@
+import csv
+import gzip
+import io
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, Tuple
+from app.core.config import settings
+
+# Columnas de cada fila archivada
+ARCHIVE_COLUMNS = ("id_lectura", "id_sensor", "fecha_hora", "valor")
+
+
+class ReadingArchive:
+    """
+    Archivos comprimidos de lecturas por planta en disco local.
+
+    Cada planta tiene un archivo `<root>/planta_<id>.csv.gz`. Los lotes se
+    añaden como miembros gzip independientes (un archivo gzip puede ser la
+    concatenación de varios), así que escribir un lote más es un append y una
+    interrupción nunca deja un lote a medias dentro del archivo.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, plant_id: int) -> str:
+        return os.path.join(self.root, f"planta_{int(plant_id)}.csv.gz")
+
+    def append(self, plant_id: int, rows: Iterable[Tuple]) -> int:
+        """Añadir un lote (id_lectura, id_sensor, fecha_hora, valor) y sincronizarlo a disco"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for id_lectura, id_sensor, fecha_hora, valor in rows:
+            writer.writerow((
+                id_lectura, "" if id_sensor is None else id_sensor,
+                fecha_hora.isoformat() if fecha_hora else "", repr(valor)
+            ))
+        member = gzip.compress(buffer.getvalue().encode("utf-8"))
+
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.path(plant_id), "ab") as handle:
+            handle.write(member)
+            handle.flush()
+            # Las filas se borran de la tabla solo cuando ya están en disco
+            os.fsync(handle.fileno())
+        return len(member)
+
+    def read(self, plant_id: int) -> Iterator[Tuple]:
+        """Filas archivadas de la planta (puede haber ids repetidos si un lote se reintentó)"""
+        with gzip.open(self.path(plant_id), "rt", encoding="utf-8", newline="") as handle:
+            for id_lectura, id_sensor, fecha_hora, valor in csv.reader(handle):
+                yield (
+                    int(id_lectura),
+                    int(id_sensor) if id_sensor else None,
+                    datetime.fromisoformat(fecha_hora) if fecha_hora else None,
+                    float(valor)
+                )
+
+    def exists(self, plant_id: int) -> bool:
+        return os.path.exists(self.path(plant_id))
+
+    def size(self, plant_id: int) -> int:
+        return os.path.getsize(self.path(plant_id)) if self.exists(plant_id) else 0
+
+    def remove(self, plant_id: int):
+        if self.exists(plant_id):
+            os.remove(self.path(plant_id))
+
+
+reading_archive = ReadingArchive(settings.ARCHIVE_DIR)
@@ -0,0 +1,64 @@
+from typing import Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.infrastructure.database.db import pool_options
+from app.infrastructure.database.query_stats import track_queries
+
+# Driver asíncrono equivalente a cada backend síncrono
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """DB_URL con el driver asíncrono (mysql+pymysql -> mysql+aiomysql, ...)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver asíncrono configurado para {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+class AsyncDatabase:
+    """
+    Engine y sesiones asíncronas, creados al primer uso.
+
+    Así, con ASYNC_DB_ENABLED desactivado no hace falta tener instalados
+    aiomysql/aiosqlite. Usa el mismo dimensionado de pool que el engine
+    síncrono, pero es un pool aparte.
+    """
+
+    def __init__(self, url: Optional[str]):
+        self.url = url
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            url = async_url(self.url)
+            self._engine = create_async_engine(url, **pool_options(url))
+            track_queries(self._engine.sync_engine)
+            # expire_on_commit=False: tras el commit no hay lazy loads implícitos
+            self._sessionmaker = async_sessionmaker(self._engine, expire_on_commit=False, autoflush=False)
+        return self._engine
+
+    def session(self) -> AsyncSession:
+        self.engine
+        return self._sessionmaker()
+
+    async def dispose(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._sessionmaker = None
+
+
+async_database = AsyncDatabase(settings.ASYNC_DB_URL or settings.DB_URL)
+
+
+async def get_async_db():
+    async with async_database.session() as db:
+        yield db
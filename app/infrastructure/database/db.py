@@ -1,11 +1,33 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from app.infrastructure.database.models import Base
 from app.core.config import settings
+from app.infrastructure.database.pool import InstrumentedQueuePool
+from app.infrastructure.database.query_stats import track_queries
 
-engine = create_engine(settings.DB_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def pool_options(url: str) -> dict:
+    """Opciones del pool desde Settings (SQLite en memoria usa su propio pool)"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        # Reciclar antes del wait_timeout de MySQL evita conexiones muertas
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
 
-def create_database():
-    Base.metadata.create_all(bind=engine)
+def _engine_options(url: str) -> dict:
+    options = pool_options(url)
+    if options:
+        options["poolclass"] = InstrumentedQueuePool
+    return options
 
+engine = create_engine(settings.DB_URL, **_engine_options(settings.DB_URL))
+# Réplicas de lectura (ver routing.py); vacío = todo va al primario
+replica_engines = [create_engine(url, **_engine_options(url)) for url in settings.DB_REPLICA_URLS]
+for _engine in [engine] + replica_engines:
+    track_queries(_engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
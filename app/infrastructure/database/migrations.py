@@ -0,0 +1,375 @@
+"""
+Migraciones de esquema versionadas.
+
+Cada migración tiene un número de versión y se aplica una sola vez; las
+versiones aplicadas quedan en la tabla schema_version. El arranque de la API
+solo verifica que la base de datos esté en la última versión.
+
+Uso:
+    python -m app.infrastructure.database.migrations upgrade [--to N]
+    python -m app.infrastructure.database.migrations current
+    python -m app.infrastructure.database.migrations history
+"""
+import argparse
+import re
+from collections import namedtuple
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import (
+    Boolean, CheckConstraint, Column, Date, DateTime, Float, ForeignKey, Integer, MetaData,
+    String, Table, Text, UniqueConstraint, inspect, literal, select, text
+)
+
+from app.infrastructure.database.db import engine
+from app.infrastructure.database.models import (
+    LecturaDatos, SensorDatos, Dispositivo, Planta, Alerta, VersionEsquema, ReglaCuidado,
+    ContadorAlertasPlanta, ContadorAlertasUsuario, CatalogoPlanta, ContadorCatalogo,
+    ContadorCatalogoUsuario, PurgaPlanta, ArchivoLecturasPlanta, CorreoSaliente, VersionDatos
+)
+
+Migration = namedtuple("Migration", ["version", "descripcion", "upgrade"])
+
+
+class SchemaVersionError(RuntimeError):
+    """La base de datos no está en la versión de esquema esperada"""
+
+
+# ----------------------------------------------------------------------
+# Utilidades para las migraciones
+# ----------------------------------------------------------------------
+def _create_index_if_missing(conn, model, name: str):
+    """Crear un índice declarado en el modelo si aún no existe en la tabla"""
+    table = model.__table__
+    existing = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+    if name not in existing:
+        index = next(index for index in table.indexes if index.name == name)
+        index.create(conn)
+
+
+def _add_column_if_missing(conn, model, name: str, default=None):
+    """
+    Añadir una columna declarada en el modelo si aún no existe en la tabla.
+
+    Las columnas NOT NULL necesitan `default` para rellenar las filas existentes.
+    """
+    table = model.__table__
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    if name not in existing:
+        column = table.c[name]
+        column_type = column.type.compile(dialect=conn.dialect)
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"
+        if not column.nullable:
+            value = literal(default, column.type).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+            ddl += f" NOT NULL DEFAULT {value}"
+        conn.execute(text(ddl))
+
+
+# ----------------------------------------------------------------------
+# Esquema base (versión 1)
+#
+# Copia congelada de las tablas tal como existían antes de las migraciones.
+# No se actualiza al cambiar los modelos: lo nuevo entra con una migración,
+# así una instalación nueva recorre las mismas versiones que una existente.
+# ----------------------------------------------------------------------
+BASELINE = MetaData()
+
+Table(
+    "usuarios", BASELINE,
+    Column("id_usuario", Integer, primary_key=True, index=True),
+    Column("nombre_completo", String(100), nullable=False),
+    Column("telefono", String(15)),
+    Column("correo", String(100), unique=True, nullable=False),
+    Column("usuario", String(50), unique=True),
+    Column("contrasena", String(255)),
+    Column("fecha_registro", DateTime),
+)
+
+Table(
+    "dispositivo", BASELINE,
+    Column("id_dispositivo", Integer, primary_key=True, index=True),
+    Column("mac_address", String(17), nullable=False, unique=True),
+    Column("nombre_dispositivo", String(100)),
+    Column("fecha_asignacion", DateTime),
+    Column("id_usuario", Integer, ForeignKey("usuarios.id_usuario")),
+)
+
+Table(
+    "imagen", BASELINE,
+    Column("id_imagen", Integer, primary_key=True, index=True),
+    Column("ruta_archivo", String(255), nullable=False),
+    Column("fecha_hora", DateTime),
+    Column("id_dispositivo", Integer, ForeignKey("dispositivo.id_dispositivo")),
+)
+
+Table(
+    "catalogo_plantas", BASELINE,
+    Column("id_catalogo", Integer, primary_key=True, index=True),
+    Column("nombre_comun", String(100), nullable=False),
+    Column("nombre_cientifico", String(150), nullable=False, unique=True),
+    Column("descripcion", Text),
+    Column("altura_maxima_cm", Integer, nullable=True),
+    Column("cuidados_especiales", Text),
+    Column("imagen_referencia", Text),
+    Column("fecha_creacion", DateTime),
+    Column("activo", Boolean),
+    CheckConstraint("altura_maxima_cm <= 30", name="check_altura_maxima"),
+)
+
+Table(
+    "planta", BASELINE,
+    Column("id_planta", Integer, primary_key=True, index=True),
+    Column("id_catalogo", Integer, ForeignKey("catalogo_plantas.id_catalogo"), nullable=False),
+    Column("id_usuario", Integer, ForeignKey("usuarios.id_usuario"), nullable=False),
+    Column("id_dispositivo", Integer, ForeignKey("dispositivo.id_dispositivo"), nullable=True),
+    Column("nombre_personalizado", String(100)),
+    Column("ubicacion", String(100)),
+    Column("fecha_plantacion", Date),
+    Column("fecha_registro", DateTime),
+    Column("notas_usuario", Text),
+    Column("activa", Boolean),
+)
+
+Table(
+    "sensor_datos", BASELINE,
+    Column("id_sensor", Integer, primary_key=True, index=True),
+    Column("tipo_sensor", String(50), nullable=False),
+    Column("unidad_medida", String(20), nullable=False),
+    Column("descripcion", Text),
+    Column("id_dispositivo", Integer, ForeignKey("dispositivo.id_dispositivo")),
+)
+
+Table(
+    "lectura_datos", BASELINE,
+    Column("id_lectura", Integer, primary_key=True, index=True),
+    Column("valor", Float, nullable=False),
+    Column("fecha_hora", DateTime),
+    Column("id_sensor", Integer, ForeignKey("sensor_datos.id_sensor")),
+    Column("id_planta", Integer, ForeignKey("planta.id_planta")),
+)
+
+Table(
+    "lectura_agregada_hora", BASELINE,
+    Column("id_agregado", Integer, primary_key=True, index=True),
+    Column("id_sensor", Integer, ForeignKey("sensor_datos.id_sensor"), nullable=False),
+    Column("hora", DateTime, nullable=False),
+    Column("total_lecturas", Integer, nullable=False),
+    Column("suma", Float, nullable=False),
+    Column("promedio", Float),
+    Column("minimo", Float),
+    Column("maximo", Float),
+    UniqueConstraint("id_sensor", "hora", name="uq_agregado_sensor_hora"),
+)
+
+Table(
+    "estado_tarea", BASELINE,
+    Column("nombre", String(100), primary_key=True),
+    Column("ultimo_id", Integer),
+    Column("fecha_actualizacion", DateTime),
+)
+
+Table(
+    "alertas", BASELINE,
+    Column("id_alerta", Integer, primary_key=True, index=True),
+    Column("id_planta", Integer, ForeignKey("planta.id_planta"), nullable=False),
+    Column("tipo_alerta", String(50), nullable=False),
+    Column("nivel", String(20)),
+    Column("mensaje", Text, nullable=False),
+    Column("fecha_creacion", DateTime),
+    Column("leida", Boolean),
+    Column("activa", Boolean),
+)
+
+
+# ----------------------------------------------------------------------
+# Migraciones
+# ----------------------------------------------------------------------
+def _baseline(conn):
+    # Crea las tablas base que falten; las existentes no se modifican
+    BASELINE.create_all(bind=conn)
+
+
+def _hot_path_indexes(conn):
+    _create_index_if_missing(conn, LecturaDatos, "ix_lectura_sensor_fecha")
+    _create_index_if_missing(conn, SensorDatos, "ix_sensor_dispositivo_tipo")
+    _create_index_if_missing(conn, Planta, "ix_planta_usuario_activa_registro")
+    _create_index_if_missing(conn, Alerta, "ix_alerta_planta_activa_leida")
+
+
+def _care_rules(conn):
+    ReglaCuidado.__table__.create(conn, checkfirst=True)
+
+
+def _alert_counters(conn):
+    # Los contadores se calculan en la versión 16, con el esquema ya completo
+    _create_index_if_missing(conn, Alerta, "ix_alerta_planta_fecha")
+    ContadorAlertasPlanta.__table__.create(conn, checkfirst=True)
+    ContadorAlertasUsuario.__table__.create(conn, checkfirst=True)
+
+
+def _image_store(conn):
+    # Las imágenes se mueven al almacén con: python -m app.jobs.migrate_images
+    _add_column_if_missing(conn, CatalogoPlanta, "imagen_hash")
+    _create_index_if_missing(conn, CatalogoPlanta, "ix_catalogo_plantas_imagen_hash")
+
+
+def _catalog_counters(conn):
+    ContadorCatalogo.__table__.create(conn, checkfirst=True)
+    ContadorCatalogoUsuario.__table__.create(conn, checkfirst=True)
+
+
+def _device_plant_index(conn):
+    _create_index_if_missing(conn, Planta, "ix_planta_dispositivo_activa_registro")
+
+
+def _plant_purge(conn):
+    _add_column_if_missing(conn, Planta, "pendiente_purga", default=False)
+    PurgaPlanta.__table__.create(conn, checkfirst=True)
+    _create_index_if_missing(conn, LecturaDatos, "ix_lectura_planta")
+
+
+def _reading_archive(conn):
+    _add_column_if_missing(conn, Planta, "fecha_baja")
+    # Las bajas anteriores cuentan desde hoy
+    conn.execute(
+        Planta.__table__.update()
+        .where(Planta.activa == False, Planta.fecha_baja.is_(None))
+        .values(fecha_baja=datetime.utcnow())
+    )
+    ArchivoLecturasPlanta.__table__.create(conn, checkfirst=True)
+
+
+def _user_directory(conn):
+    _create_index_if_missing(conn, Dispositivo, "ix_dispositivo_usuario")
+
+
+def _device_keys(conn):
+    _add_column_if_missing(conn, Dispositivo, "clave_api_hash")
+
+
+def _email_outbox(conn):
+    CorreoSaliente.__table__.create(conn, checkfirst=True)
+
+
+def _scrub_outbox_passwords(conn):
+    # Los correos de alta encolados antes de esta versión llevaban la contraseña en claro
+    table = CorreoSaliente.__table__
+    rows = conn.execute(
+        select(table.c.id_correo, table.c.cuerpo).where(table.c.cuerpo.like("%Contraseña:%"))
+    ).all()
+    for id_correo, cuerpo in rows:
+        conn.execute(
+            table.update().where(table.c.id_correo == id_correo).values(
+                cuerpo=re.sub(r"(?m)^Contraseña:.*$", "Contraseña: la que elegiste al registrarte", cuerpo)
+            )
+        )
+
+
+def _data_versions(conn):
+    VersionDatos.__table__.create(conn, checkfirst=True)
+
+
+def _retention_index(conn):
+    _create_index_if_missing(conn, LecturaDatos, "ix_lectura_fecha")
+
+
+def _reconcile_counters(conn):
+    # Usa los modelos actuales: debe ser la última migración que toque el esquema
+    from app.domain.repositories.alert_repository import reconcile_unread_counters
+    from app.domain.repositories.catalog_counter_repository import reconcile_catalog_counters
+
+    reconcile_unread_counters(conn)
+    reconcile_catalog_counters(conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Esquema base", _baseline),
+    Migration(2, "Índices compuestos para las consultas frecuentes", _hot_path_indexes),
+    Migration(3, "Reglas de cuidado por especie", _care_rules),
+    Migration(4, "Contadores de alertas no leídas", _alert_counters),
+    Migration(5, "Referencia a imágenes del almacén por contenido", _image_store),
+    Migration(6, "Contadores de plantas y usuarios por especie", _catalog_counters),
+    Migration(7, "Índice de plantas por dispositivo para listas paginadas", _device_plant_index),
+    Migration(8, "Purga de plantas en segundo plano", _plant_purge),
+    Migration(9, "Archivo en frío de lecturas de plantas dadas de baja", _reading_archive),
+    Migration(10, "Índice de dispositivos por usuario para el listado de usuarios", _user_directory),
+    Migration(11, "Claves API por dispositivo", _device_keys),
+    Migration(12, "Bandeja de salida de correos", _email_outbox),
+    Migration(13, "Quitar contraseñas de los correos encolados", _scrub_outbox_passwords),
+    Migration(14, "Versiones de datos cacheados por la API", _data_versions),
+    Migration(15, "Índice por fecha para la retención de lecturas", _retention_index),
+    Migration(16, "Recalcular los contadores de alertas y del catálogo", _reconcile_counters),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+def current_version(conn) -> int:
+    """Última versión aplicada (0 si la base de datos no tiene migraciones)"""
+    if not inspect(conn).has_table(VersionEsquema.__tablename__):
+        return 0
+    versions = conn.execute(select(VersionEsquema.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def upgrade(target: Optional[int] = None) -> List[Migration]:
+    """Aplicar en orden las migraciones pendientes hasta `target`"""
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    for migration in MIGRATIONS:
+        if migration.version <= version or migration.version > target:
+            continue
+        with engine.begin() as conn:
+            VersionEsquema.__table__.create(conn, checkfirst=True)
+            migration.upgrade(conn)
+            conn.execute(VersionEsquema.__table__.insert().values(
+                version=migration.version,
+                descripcion=migration.descripcion,
+                fecha_aplicacion=datetime.utcnow()
+            ))
+        applied.append(migration)
+    return applied
+
+
+def verify_schema():
+    """Comprobar al arrancar que la base de datos está en la última versión"""
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version != LATEST_VERSION:
+        raise SchemaVersionError(
+            f"Versión de esquema {version}, se esperaba {LATEST_VERSION}. "
+            f"Ejecute: python -m app.infrastructure.database.migrations upgrade"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migraciones de esquema")
+    parser.add_argument("command", choices=["upgrade", "current", "history"])
+    parser.add_argument("--to", type=int, default=None, help="Versión destino")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = upgrade(args.to)
+        for migration in applied:
+            print(f"Aplicada {migration.version}: {migration.descripcion}")
+        if not applied:
+            print("El esquema ya está actualizado")
+    elif args.command == "current":
+        with engine.connect() as conn:
+            print(f"{current_version(conn)} (última: {LATEST_VERSION})")
+    elif args.command == "history":
+        with engine.connect() as conn:
+            version = current_version(conn)
+        for migration in MIGRATIONS:
+            mark = "x" if migration.version <= version else " "
+            print(f"[{mark}] {migration.version}: {migration.descripcion}")
+
+
+if __name__ == "__main__":
+    main()
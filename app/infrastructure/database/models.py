@@ -1,8 +1,8 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from datetime import datetime
-from sqlalchemy import Boolean, Date, CheckConstraint
+from sqlalchemy import Boolean, Date, CheckConstraint, UniqueConstraint, Index
 
 Base = declarative_base()
 
@@ -28,12 +28,18 @@ class Dispositivo(Base):
     nombre_dispositivo = Column(String(100))
     fecha_asignacion = Column(DateTime, default=datetime.utcnow)
     id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"))
+    # HMAC de la clave API del dispositivo (la clave en claro no se guarda)
+    clave_api_hash = Column(String(64))
     
     # Relación con usuario
     usuario = relationship("Usuario", back_populates="dispositivos")
     plantas = relationship("Planta", back_populates="dispositivo")
     sensores = relationship("SensorDatos", back_populates="dispositivo")
 
+    __table_args__ = (
+        Index('ix_dispositivo_usuario', 'id_usuario'),
+    )
+
 class Imagen(Base):
     __tablename__ = "imagen"
 
@@ -55,6 +61,10 @@ class Planta(Base):
     fecha_registro = Column(DateTime, default=datetime.utcnow)
     notas_usuario = Column(Text)
     activa = Column(Boolean, default=True)
+    # Borrado permanente solicitado: la planta ya no se muestra y el worker de purga la elimina
+    pendiente_purga = Column(Boolean, default=False, nullable=False)
+    # Fecha de la baja lógica; pasado ARCHIVE_AFTER_DAYS sus lecturas se archivan
+    fecha_baja = Column(DateTime)
     
     # Relaciones
     catalogo_info = relationship("CatalogoPlanta", foreign_keys=[id_catalogo])
@@ -63,6 +73,11 @@ class Planta(Base):
     alertas = relationship("Alerta", back_populates="planta", cascade="all, delete-orphan")
     lecturas = relationship("LecturaDatos", back_populates="planta", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_planta_usuario_activa_registro', 'id_usuario', 'activa', 'fecha_registro'),
+        Index('ix_planta_dispositivo_activa_registro', 'id_dispositivo', 'activa', 'fecha_registro'),
+    )
+
 
 
 class SensorDatos(Base):
@@ -77,6 +92,10 @@ class SensorDatos(Base):
     dispositivo = relationship("Dispositivo", foreign_keys=[id_dispositivo])
     lecturas = relationship("LecturaDatos", back_populates="sensor")
 
+    __table_args__ = (
+        Index('ix_sensor_dispositivo_tipo', 'id_dispositivo', 'tipo_sensor'),
+    )
+
 class LecturaDatos(Base):
     __tablename__ = "lectura_datos"
 
@@ -88,6 +107,94 @@ class LecturaDatos(Base):
     sensor = relationship("SensorDatos", back_populates="lecturas")
     id_planta = Column(Integer, ForeignKey("planta.id_planta"))
     planta = relationship("Planta", back_populates="lecturas")
+
+    __table_args__ = (
+        Index('ix_lectura_sensor_fecha', 'id_sensor', 'fecha_hora'),
+        Index('ix_lectura_planta', 'id_planta', 'id_lectura'),
+        Index('ix_lectura_fecha', 'fecha_hora', 'id_lectura'),
+    )
+
+class LecturaAgregadaHora(Base):
+    """Resumen por hora de lecturas crudas ya compactadas"""
+    __tablename__ = "lectura_agregada_hora"
+
+    id_agregado = Column(Integer, primary_key=True, index=True)
+    id_sensor = Column(Integer, ForeignKey("sensor_datos.id_sensor"), nullable=False)
+    hora = Column(DateTime, nullable=False)
+    total_lecturas = Column(Integer, nullable=False, default=0)
+    suma = Column(Float, nullable=False, default=0)
+    promedio = Column(Float)
+    minimo = Column(Float)
+    maximo = Column(Float)
+
+    __table_args__ = (
+        UniqueConstraint('id_sensor', 'hora', name='uq_agregado_sensor_hora'),
+    )
+
+class VersionEsquema(Base):
+    """Migraciones de esquema aplicadas"""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    descripcion = Column(String(255), nullable=False)
+    fecha_aplicacion = Column(DateTime, default=datetime.utcnow)
+
+class ArchivoLecturasPlanta(Base):
+    """Lecturas de una planta dada de baja movidas a un archivo comprimido"""
+    __tablename__ = "archivo_lecturas_planta"
+
+    id_planta = Column(Integer, ForeignKey("planta.id_planta"), primary_key=True, autoincrement=False)
+    ruta_archivo = Column(String(255), nullable=False)
+    total_lecturas = Column(Integer, nullable=False, default=0)
+    tamano_bytes = Column(Integer, nullable=False, default=0)
+    fecha_archivo = Column(DateTime, default=datetime.utcnow)
+
+class PurgaPlanta(Base):
+    """Borrado permanente de una planta en segundo plano y su progreso"""
+    __tablename__ = "purga_planta"
+
+    # Sin FK: la planta se borra al terminar y el registro queda como historial
+    id_planta = Column(Integer, primary_key=True, autoincrement=False)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"), nullable=False)
+    estado = Column(String(20), nullable=False, default="pendiente")
+    alertas_eliminadas = Column(Integer, nullable=False, default=0)
+    lecturas_eliminadas = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    fecha_solicitud = Column(DateTime, default=datetime.utcnow)
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow)
+    fecha_fin = Column(DateTime)
+
+    __table_args__ = (
+        Index('ix_purga_estado_solicitud', 'estado', 'fecha_solicitud'),
+    )
+
+class CorreoSaliente(Base):
+    """Bandeja de salida: correos que el worker envía por SMTP en segundo plano"""
+    __tablename__ = "correo_saliente"
+
+    id_correo = Column(Integer, primary_key=True, index=True)
+    destinatario = Column(String(100), nullable=False)
+    asunto = Column(String(200), nullable=False)
+    # Se vacía al enviarse o al fallar definitivamente
+    cuerpo = Column(Text, nullable=False)
+    estado = Column(String(20), nullable=False, default="pendiente")
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime, default=datetime.utcnow)
+    error = Column(Text)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_envio = Column(DateTime)
+
+    __table_args__ = (
+        Index('ix_correo_estado_intento', 'estado', 'proximo_intento'),
+    )
+
+class EstadoTarea(Base):
+    """Progreso persistido de tareas de mantenimiento reanudables"""
+    __tablename__ = "estado_tarea"
+
+    nombre = Column(String(100), primary_key=True)
+    ultimo_id = Column(Integer, default=0)
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow)
     
 class CatalogoPlanta(Base):
     __tablename__ = "catalogo_plantas"
@@ -99,13 +206,35 @@ class CatalogoPlanta(Base):
     altura_maxima_cm = Column(Integer, default=30, nullable=True)
     cuidados_especiales = Column(Text)
     imagen_referencia = Column(Text)  # En tu SQL lo modificaste a LONGTEXT, perfecto
+    # sha256 de la imagen en el almacén de imágenes (ver app/infrastructure/images)
+    imagen_hash = Column(String(64), index=True)
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
     activo = Column(Boolean, default=True)
+    # Saber si hay imagen sin leer el LONGTEXT (las listas lo difieren)
+    tiene_imagen = column_property(imagen_referencia.isnot(None))
     
     __table_args__ = (
         CheckConstraint('altura_maxima_cm <= 30', name='check_altura_maxima'),
     )
 
+class ReglaCuidado(Base):
+    """Rango de cuidado de una especie del catálogo para un tipo de sensor"""
+    __tablename__ = "reglas_cuidado"
+
+    id_regla = Column(Integer, primary_key=True, index=True)
+    id_catalogo = Column(Integer, ForeignKey("catalogo_plantas.id_catalogo"), nullable=False)
+    tipo_sensor = Column(String(50), nullable=False)
+    valor_minimo = Column(Float)
+    valor_maximo = Column(Float)
+    histeresis = Column(Float, default=0)
+    nivel = Column(String(20), default="advertencia")
+    activa = Column(Boolean, default=True)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_regla_catalogo_tipo', 'id_catalogo', 'tipo_sensor'),
+    )
+
 class Alerta(Base):
     __tablename__ = "alertas"
 
@@ -120,3 +249,50 @@ class Alerta(Base):
 
     planta = relationship("Planta", back_populates="alertas")
 
+    __table_args__ = (
+        Index('ix_alerta_planta_activa_leida', 'id_planta', 'activa', 'leida'),
+        Index('ix_alerta_planta_fecha', 'id_planta', 'fecha_creacion', 'id_alerta'),
+    )
+
+class ContadorAlertasPlanta(Base):
+    """Alertas no leídas por planta, mantenido al insertar y al marcar como leídas"""
+    __tablename__ = "contador_alertas_planta"
+
+    id_planta = Column(Integer, ForeignKey("planta.id_planta"), primary_key=True, autoincrement=False)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"), nullable=False, index=True)
+    no_leidas = Column(Integer, nullable=False, default=0)
+
+class ContadorAlertasUsuario(Base):
+    """Alertas no leídas por usuario (suma de sus plantas)"""
+    __tablename__ = "contador_alertas_usuario"
+
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"), primary_key=True, autoincrement=False)
+    no_leidas = Column(Integer, nullable=False, default=0)
+
+
+class ContadorCatalogo(Base):
+    """Plantas activas y usuarios distintos por especie del catálogo"""
+    __tablename__ = "contador_catalogo"
+
+    id_catalogo = Column(Integer, ForeignKey("catalogo_plantas.id_catalogo"), primary_key=True, autoincrement=False)
+    plantas_activas = Column(Integer, nullable=False, default=0)
+    usuarios_activos = Column(Integer, nullable=False, default=0)
+
+class ContadorCatalogoUsuario(Base):
+    """Plantas activas de cada usuario por especie (para contar usuarios distintos)"""
+    __tablename__ = "contador_catalogo_usuario"
+
+    id_catalogo = Column(Integer, ForeignKey("catalogo_plantas.id_catalogo"), primary_key=True, autoincrement=False)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"), primary_key=True, autoincrement=False)
+    plantas_activas = Column(Integer, nullable=False, default=0)
+
+
+class VersionDatos(Base):
+    """
+    Versión de datos que los procesos de la API cachean en memoria: quien los
+    modifica fuera de la API (p. ej. un comando) la sube y las cachés recargan
+    """
+    __tablename__ = "version_datos"
+
+    clave = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,379 @@
+"""
+Particionado mensual de lectura_datos.
+
+Dos estrategias según el motor:
+
+- "native" (MySQL): particiones RANGE nativas por mes sobre TO_DAYS(fecha_hora).
+  El optimizador descarta las particiones fuera del rango de fechas de cada
+  consulta y eliminar un mes es un DROP PARTITION.
+- "tables" (SQLite): una tabla por mes (lectura_datos_pYYYYMM). Las lecturas
+  nuevas entran en lectura_datos y `roll_closed_months` mueve los meses cerrados
+  a su tabla. Las consultas leen solo las tablas que se solapan con el rango.
+
+Uso desde consola:
+    python -m app.infrastructure.database.partitions ensure
+    python -m app.infrastructure.database.partitions list
+    python -m app.infrastructure.database.partitions roll
+    python -m app.infrastructure.database.partitions drop-before 2025-01
+    python -m app.infrastructure.database.partitions convert
+"""
+import argparse
+import time
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import (
+    Column, DateTime, Float, Index, Integer, MetaData, Table, inspect, select, text, union_all
+)
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.infrastructure.database.db import engine
+from app.infrastructure.database.models import LecturaDatos
+
+BASE_TABLE = LecturaDatos.__tablename__
+STRATEGIES = ("none", "native", "tables")
+# Segundos que se reutiliza la lista de particiones antes de volver a consultarla
+PARTITION_CACHE_TTL = 300
+
+
+def month_start(value) -> date:
+    """Primer día del mes de una fecha o datetime"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Sumar (o restar) meses a un primer día de mes"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Nombre de la partición de un mes (pYYYYMM)"""
+    return f"p{month:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Mes correspondiente a un nombre de partición o None si no es mensual"""
+    suffix = name.rsplit("_", 1)[-1]
+    if len(suffix) != 7 or not suffix.startswith("p") or not suffix[1:].isdigit():
+        return None
+    return date(int(suffix[1:5]), int(suffix[5:7]), 1)
+
+
+def _month_table(name: str) -> Table:
+    """Definición de una tabla mensual (sin FKs: los ids vienen de lectura_datos)"""
+    return Table(
+        name,
+        MetaData(),
+        Column("id_lectura", Integer, primary_key=True, autoincrement=False),
+        Column("valor", Float, nullable=False),
+        Column("fecha_hora", DateTime),
+        Column("id_sensor", Integer),
+        Column("id_planta", Integer),
+        Index(f"ix_{name}_sensor_fecha", "id_sensor", "fecha_hora"),
+    )
+
+
+class PartitionManager:
+    """Crea, lista y elimina particiones mensuales de lectura_datos"""
+
+    def __init__(self, engine, strategy: str = "none"):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia de particionado inválida: {strategy}")
+        self.engine = engine
+        self.strategy = strategy
+        self._months: Optional[List[date]] = None
+        self._loaded_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.strategy != "none"
+
+    # ------------------------------------------------------------------
+    # Consulta de particiones
+    # ------------------------------------------------------------------
+    def list_partitions(self, refresh: bool = False) -> List[date]:
+        """Meses que tienen partición, ordenados"""
+        if not self.enabled:
+            return []
+        expired = time.monotonic() - self._loaded_at > PARTITION_CACHE_TTL
+        if self._months is None or refresh or expired:
+            self._months = sorted(self._load_months())
+            self._loaded_at = time.monotonic()
+        return self._months
+
+    def _load_months(self) -> List[date]:
+        if self.strategy == "native":
+            with self.engine.connect() as conn:
+                names = conn.execute(text(
+                    "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                    "AND PARTITION_NAME IS NOT NULL"
+                ), {"table": BASE_TABLE}).scalars().all()
+        else:
+            names = [
+                name for name in inspect(self.engine).get_table_names()
+                if name.startswith(f"{BASE_TABLE}_p")
+            ]
+        return [month for month in map(partition_month, names) if month]
+
+    def partitions_for_range(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> List[date]:
+        """Meses con partición que se solapan con [date_from, date_to]"""
+        first = month_start(date_from) if date_from else None
+        last = month_start(date_to) if date_to else None
+        return [
+            month for month in self.list_partitions()
+            if (first is None or month >= first) and (last is None or month <= last)
+        ]
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+    def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """Crear por adelantado las particiones del mes actual y los siguientes"""
+        if not self.enabled:
+            return []
+        if months_ahead is None:
+            months_ahead = settings.READINGS_PARTITIONS_AHEAD
+
+        current = month_start(datetime.utcnow())
+        existing = set(self.list_partitions(refresh=True))
+        if self.strategy == "native" and not existing:
+            raise RuntimeError(
+                "lectura_datos no está particionada; ejecute primero el comando 'convert'"
+            )
+
+        wanted = [add_months(current, i) for i in range(months_ahead + 1)]
+        if existing:
+            # Nunca crear particiones anteriores a la última existente
+            wanted = [month for month in wanted if month > max(existing)]
+        missing = [month for month in wanted if month not in existing]
+        if not missing:
+            return []
+
+        if self.strategy == "native":
+            self._reorganize_maxvalue(missing)
+        else:
+            for month in missing:
+                _month_table(f"{BASE_TABLE}_{partition_name(month)}").create(
+                    self.engine, checkfirst=True
+                )
+
+        self.list_partitions(refresh=True)
+        return [partition_name(month) for month in missing]
+
+    def _reorganize_maxvalue(self, months: List[date]):
+        definitions = ", ".join(
+            f"PARTITION {partition_name(month)} VALUES LESS THAN "
+            f"(TO_DAYS('{add_months(month, 1):%Y-%m-%d}'))"
+            for month in months
+        )
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {BASE_TABLE} REORGANIZE PARTITION pmax INTO "
+                f"({definitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+            ))
+
+    def roll_closed_months(self, chunk_size: Optional[int] = None) -> int:
+        """
+        Mover a su tabla mensual las lecturas de meses cerrados (solo "tables").
+
+        Se avanza mes a mes y en lotes de `chunk_size` lecturas por clave
+        primaria; cada lote (INSERT ... SELECT + DELETE) es una transacción
+        corta, así la tabla no queda bloqueada durante todo el traslado.
+        """
+        if self.strategy != "tables":
+            return 0
+        chunk_size = chunk_size or settings.READINGS_ROLL_CHUNK_SIZE
+
+        base = LecturaDatos.__table__
+        current = month_start(datetime.utcnow())
+        moved = 0
+        month = self._oldest_month_before(current)
+        while month is not None:
+            following = add_months(month, 1)
+            table = _month_table(f"{BASE_TABLE}_{partition_name(month)}")
+            table.create(self.engine, checkfirst=True)
+            in_month = (base.c.fecha_hora >= month) & (base.c.fecha_hora < following)
+            columns = [base.c[column.name] for column in table.columns]
+            while True:
+                with self.engine.begin() as conn:
+                    ids = conn.execute(
+                        select(base.c.id_lectura).where(in_month).order_by(base.c.id_lectura).limit(chunk_size)
+                    ).scalars().all()
+                    if not ids:
+                        break
+                    conn.execute(table.insert().from_select(
+                        [column.name for column in table.columns],
+                        select(*columns).where(base.c.id_lectura.in_(ids))
+                    ))
+                    moved += conn.execute(base.delete().where(base.c.id_lectura.in_(ids))).rowcount
+            month = self._oldest_month_before(current)
+
+        self.list_partitions(refresh=True)
+        return moved
+
+    def _oldest_month_before(self, limit: date) -> Optional[date]:
+        """Mes de la lectura más antigua de lectura_datos anterior a `limit`"""
+        base = LecturaDatos.__table__
+        with self.engine.connect() as conn:
+            oldest = conn.execute(
+                select(base.c.fecha_hora).where(base.c.fecha_hora < limit)
+                .order_by(base.c.fecha_hora).limit(1)
+            ).scalar()
+        return month_start(oldest) if oldest else None
+
+    def _delete_before(self, cutoff: date, chunk_size: int) -> int:
+        """Borrar de lectura_datos, en lotes, las lecturas anteriores a `cutoff`"""
+        base = LecturaDatos.__table__
+        deleted = 0
+        while True:
+            with self.engine.begin() as conn:
+                ids = conn.execute(
+                    select(base.c.id_lectura).where(base.c.fecha_hora < cutoff)
+                    .order_by(base.c.id_lectura).limit(chunk_size)
+                ).scalars().all()
+                if not ids:
+                    return deleted
+                deleted += conn.execute(base.delete().where(base.c.id_lectura.in_(ids))).rowcount
+
+    def drop_partitions_before(self, cutoff: date) -> List[str]:
+        """Eliminar los meses anteriores a `cutoff` como operación de metadatos"""
+        if not self.enabled:
+            return []
+        cutoff = month_start(cutoff)
+        if self.strategy == "tables":
+            # Lo que aún no se trasladó de esos meses se borra directamente en
+            # vez de moverlo a una tabla que se va a eliminar
+            self._delete_before(cutoff, settings.READINGS_ROLL_CHUNK_SIZE)
+
+        old = [month for month in self.list_partitions(refresh=True) if month < cutoff]
+        if not old:
+            return []
+
+        names = [partition_name(month) for month in old]
+        with self.engine.begin() as conn:
+            if self.strategy == "native":
+                conn.execute(text(f"ALTER TABLE {BASE_TABLE} DROP PARTITION {', '.join(names)}"))
+            else:
+                for name in names:
+                    conn.execute(text(f"DROP TABLE IF EXISTS {BASE_TABLE}_{name}"))
+
+        self.list_partitions(refresh=True)
+        return names
+
+    def convert_to_native(self, months_ahead: Optional[int] = None) -> List[str]:
+        """
+        Convertir lectura_datos en tabla particionada (MySQL).
+
+        MySQL exige que la clave de partición forme parte de la PK y no admite
+        claves foráneas en tablas particionadas, por lo que se eliminan las FKs
+        y la PK pasa a ser (id_lectura, fecha_hora).
+        """
+        if self.strategy != "native":
+            raise RuntimeError("La conversión solo aplica a la estrategia 'native'")
+        if months_ahead is None:
+            months_ahead = settings.READINGS_PARTITIONS_AHEAD
+
+        with self.engine.begin() as conn:
+            oldest = conn.execute(text(f"SELECT MIN(fecha_hora) FROM {BASE_TABLE}")).scalar()
+            first = month_start(oldest or datetime.utcnow())
+            last = add_months(month_start(datetime.utcnow()), months_ahead)
+
+            months = [first]
+            while months[-1] < last:
+                months.append(add_months(months[-1], 1))
+
+            for fk in inspect(conn).get_foreign_keys(BASE_TABLE):
+                conn.execute(text(f"ALTER TABLE {BASE_TABLE} DROP FOREIGN KEY {fk['name']}"))
+            conn.execute(text(f"UPDATE {BASE_TABLE} SET fecha_hora = UTC_TIMESTAMP() WHERE fecha_hora IS NULL"))
+            conn.execute(text(
+                f"ALTER TABLE {BASE_TABLE} MODIFY fecha_hora DATETIME NOT NULL, "
+                f"DROP PRIMARY KEY, ADD PRIMARY KEY (id_lectura, fecha_hora)"
+            ))
+            definitions = ", ".join(
+                f"PARTITION {partition_name(month)} VALUES LESS THAN "
+                f"(TO_DAYS('{add_months(month, 1):%Y-%m-%d}'))"
+                for month in months
+            )
+            conn.execute(text(
+                f"ALTER TABLE {BASE_TABLE} PARTITION BY RANGE (TO_DAYS(fecha_hora)) "
+                f"({definitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+            ))
+
+        self.list_partitions(refresh=True)
+        return [partition_name(month) for month in months]
+
+    # ------------------------------------------------------------------
+    # Enrutado de consultas
+    # ------------------------------------------------------------------
+    def reading_tables(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> List[Table]:
+        """Tablas físicas que pueden contener lecturas del rango indicado"""
+        tables = [LecturaDatos.__table__]
+        if self.strategy == "tables":
+            tables += [
+                _month_table(f"{BASE_TABLE}_{partition_name(month)}")
+                for month in self.partitions_for_range(date_from, date_to)
+            ]
+        return tables
+
+
+partition_manager = PartitionManager(engine, settings.READINGS_PARTITIONING)
+
+
+def reading_source(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    """
+    Entidad a consultar para lecturas en [date_from, date_to].
+
+    Con la estrategia "tables" devuelve LecturaDatos sobre la unión de
+    lectura_datos y las tablas mensuales que se solapan con el rango. En los
+    demás casos devuelve LecturaDatos (MySQL poda particiones por fecha_hora).
+    """
+    tables = partition_manager.reading_tables(date_from, date_to)
+    if len(tables) == 1:
+        return LecturaDatos
+
+    columns = [column.name for column in _month_table(BASE_TABLE).columns]
+    union = union_all(*[
+        select(*[table.c[name] for name in columns]) for table in tables
+    ]).subquery(BASE_TABLE)
+    return aliased(LecturaDatos, union)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Particiones mensuales de lectura_datos")
+    parser.add_argument("command", choices=["ensure", "list", "roll", "drop-before", "convert"])
+    parser.add_argument("month", nargs="?", help="Mes límite (YYYY-MM) para drop-before")
+    parser.add_argument("--ahead", type=int, default=None, help="Meses a crear por adelantado")
+    args = parser.parse_args()
+
+    if not partition_manager.enabled:
+        parser.error("READINGS_PARTITIONING está desactivado ('none')")
+
+    if args.command == "ensure":
+        print("Particiones creadas:", partition_manager.ensure_partitions(args.ahead))
+    elif args.command == "list":
+        for month in partition_manager.list_partitions(refresh=True):
+            print(partition_name(month))
+    elif args.command == "roll":
+        print("Lecturas movidas:", partition_manager.roll_closed_months())
+    elif args.command == "drop-before":
+        if not args.month:
+            parser.error("drop-before requiere un mes (YYYY-MM)")
+        cutoff = datetime.strptime(args.month, "%Y-%m").date()
+        print("Particiones eliminadas:", partition_manager.drop_partitions_before(cutoff))
+    elif args.command == "convert":
+        print("Particiones creadas:", partition_manager.convert_to_native(args.ahead))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import bisect
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Límites superiores (ms) del histograma de espera al pedir una conexión
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000, 30000)
+
+
+class PoolMetrics:
+    """Esperas y timeouts al sacar conexiones del pool, acumulados desde el arranque"""
+
+    def __init__(self, buckets=WAIT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Un contador por límite más el de "más que el último"
+            self.bucket_counts = [0] * (len(self.buckets) + 1)
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_sum_ms = 0.0
+            self.wait_max_ms = 0.0
+
+    def record_wait(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(self.buckets, ms)] += 1
+            self.checkouts += 1
+            self.wait_sum_ms += ms
+            self.wait_max_ms = max(self.wait_max_ms, ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        """(conteos por límite, suma de esperas en ms, checkouts, timeouts) de un mismo instante"""
+        with self._lock:
+            return list(self.bucket_counts), self.wait_sum_ms, self.checkouts, self.timeouts
+
+    def histogram(self) -> dict:
+        """Conteos acumulados por límite ("le"), como los histogramas de Prometheus"""
+        with self._lock:
+            counts = list(self.bucket_counts)
+        result, total = {}, 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+            total += count
+            result[str(bound)] = total
+        return result
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mide cuánto espera cada checkout (incluye abrir la conexión
+    y el pre-ping) y cuenta los que agotan `pool_timeout`.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def pool_stats(engine) -> dict:
+    """Estado actual del pool del engine y métricas acumuladas de espera"""
+    pool = engine.pool
+    stats = {"clase": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "capacidad": pool.size() + max(pool._max_overflow, 0),
+            "timeout_segundos": pool.timeout(),
+            "en_uso": pool.checkedout(),
+            "libres": pool.checkedin(),
+            # Negativo mientras el pool aún no abrió pool_size conexiones
+            "overflow": pool.overflow(),
+        })
+    stats.update({
+        "checkouts": pool_metrics.checkouts,
+        "timeouts": pool_metrics.timeouts,
+        "espera_media_ms": pool_metrics.wait_sum_ms / pool_metrics.checkouts if pool_metrics.checkouts else 0.0,
+        "espera_max_ms": pool_metrics.wait_max_ms,
+        "espera_ms_histograma": pool_metrics.histogram(),
+    })
+    return stats
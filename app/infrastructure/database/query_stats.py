@@ -0,0 +1,59 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Sentencias SQL y tiempo de base de datos de la petición en curso"""
+
+    def __init__(self, budget: int = 0):
+        self.count = 0
+        self.duration = 0.0
+        # Máximo de sentencias de la ruta (0 = sin límite), ver QueryStatsMiddleware
+        self.budget = budget
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget > 0 and self.count > self.budget
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Una petición ejecutó más sentencias que su presupuesto (QUERY_BUDGET_STRICT)"""
+
+
+# Lo fija el middleware QueryStatsMiddleware; los workers de fondo no tienen contador
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    # En el contexto de la sentencia: si falla no queda nada pendiente en la conexión
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_start", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+    if settings.SLOW_QUERY_MS > 0 and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Consulta lenta (%.1f ms) en %s: %s",
+            elapsed * 1000, conn.engine.url.render_as_string(), " ".join(statement.split())[:1000]
+        )
+
+
+def track_queries(engine: Engine):
+    """Contar las sentencias del engine en la petición y registrar las lentas (SLOW_QUERY_MS)"""
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
@@ -0,0 +1,171 @@
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import Delete, Insert, Update, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.elements import TextClause
+from app.core.config import settings
+from app.infrastructure.database.db import engine, replica_engines
+from app.infrastructure.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingState:
+    """Estado de lectura/escritura de la petición en curso"""
+
+    def __init__(self, pinned_until: float = 0.0):
+        # Hasta cuándo (epoch) el cliente lee del primario tras su última escritura
+        self.pinned_until = pinned_until
+        self.wrote = False
+
+    @property
+    def pinned(self) -> bool:
+        return self.wrote or self.pinned_until > time.time()
+
+
+# Lo fija el middleware ReadYourWritesMiddleware; fuera de una petición no hay estado
+routing_state: ContextVar[Optional[RoutingState]] = ContextVar("routing_state", default=None)
+
+
+def mark_write():
+    state = routing_state.get()
+    if state is not None:
+        state.wrote = True
+
+
+class ReplicaSet:
+    """
+    Réplicas de lectura con selección round-robin.
+
+    Una réplica que falla al conectar o pierde la conexión queda fuera
+    durante DB_REPLICA_RETRY_SECONDS; mientras no quede ninguna sana, las
+    lecturas van al primario.
+    """
+
+    def __init__(self, engines: List[Engine], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._cycle = itertools.cycle(engines) if engines else None
+        self._down_until = {}
+        self._lock = threading.Lock()
+        self.reads = {id(replica): 0 for replica in engines}
+        self.fallbacks = 0
+        for replica in engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        # Sin conexión (fallo al conectar) o conexión perdida: la réplica no sirve
+        if context.connection is None or context.is_disconnect:
+            self.mark_down(context.engine)
+
+    def mark_down(self, replica: Engine):
+        with self._lock:
+            if self._down_until.get(id(replica), 0) <= time.monotonic():
+                logger.warning("Réplica %s fuera de servicio", replica.url.render_as_string())
+            self._down_until[id(replica)] = time.monotonic() + self.retry_seconds
+
+    def is_healthy(self, replica: Engine) -> bool:
+        return self._down_until.get(id(replica), 0) <= time.monotonic()
+
+    def pick(self) -> Optional[Engine]:
+        """Siguiente réplica sana, o None si no hay ninguna"""
+        if not self._cycle:
+            return None
+        with self._lock:
+            for _ in range(len(self.engines)):
+                replica = next(self._cycle)
+                if self.is_healthy(replica):
+                    self.reads[id(replica)] += 1
+                    return replica
+            self.fallbacks += 1
+        return None
+
+    def check(self):
+        """Comprobar las réplicas con SELECT 1 (las caídas se vuelven a probar aquí)"""
+        for replica in self.engines:
+            try:
+                with replica.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except Exception:
+                self.mark_down(replica)
+                continue
+            with self._lock:
+                self._down_until.pop(id(replica), None)
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {
+                    "url": replica.url.render_as_string(),
+                    "sana": self.is_healthy(replica),
+                    "lecturas": self.reads[id(replica)],
+                }
+                for replica in self.engines
+            ],
+            "lecturas_en_primario_por_fallo": self.fallbacks,
+        }
+
+
+replicas = ReplicaSet(replica_engines, settings.DB_REPLICA_RETRY_SECONDS)
+
+
+class RoutingSession(Session):
+    """
+    Sesión para servicios de solo lectura: las consultas van a una réplica y
+    las escrituras (y todo lo que venga después de escribir) al primario.
+
+    La réplica se elige una vez por sesión, así el conteo y la página de un
+    listado salen del mismo servidor. También se lee del primario si el
+    cliente escribió hace menos de DB_READ_YOUR_WRITES_SECONDS.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._replica: Optional[Engine] = None
+        self._primary_only = False
+
+    def _read_engine(self) -> Engine:
+        if self._replica is None:
+            replica = replicas.pick()
+            if replica is None:
+                return engine
+            try:
+                # Conectar ya: si la réplica no responde se lee del primario en esta misma petición
+                self.connection(bind_arguments={"bind": replica})
+            except Exception:
+                replicas.mark_down(replica)
+                return engine
+            self._replica = replica
+        return self._replica
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete, TextClause)):
+            self._primary_only = True
+        state = routing_state.get()
+        if self._primary_only or (state is not None and state.pinned):
+            return engine
+        return self._read_engine()
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    mark_write()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_write()
+
+
+replica_monitor = PeriodicWorker(
+    "replica-monitor", settings.DB_REPLICA_CHECK_SECONDS, replicas.check, final_run=False
+)
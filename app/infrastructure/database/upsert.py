@@ -0,0 +1,26 @@
+from sqlalchemy import Table
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+def upsert(db, table: Table, values: dict, on_conflict: dict):
+    """
+    INSERT de `values` que, si la clave primaria ya existe, aplica `on_conflict`
+    a la fila existente en la misma sentencia (MySQL: ON DUPLICATE KEY UPDATE,
+    SQLite: ON CONFLICT DO UPDATE).
+
+    Evita la carrera de UPDATE y luego INSERT si no había fila: dos
+    transacciones que crean el mismo contador a la vez no chocan con la PK.
+    """
+    # Session o Connection (las migraciones reconcilian con la conexión)
+    bind = db.get_bind() if hasattr(db, "get_bind") else db
+    dialect = bind.dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(table).values(**values).on_duplicate_key_update(**on_conflict)
+    elif dialect == "sqlite":
+        statement = sqlite_insert(table).values(**values).on_conflict_do_update(
+            index_elements=list(table.primary_key.columns), set_=on_conflict
+        )
+    else:
+        raise RuntimeError(f"upsert no soportado para el motor {dialect}")
+    return db.execute(statement)
@@ -0,0 +1,197 @@
+import logging
+import smtplib
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.infrastructure.database.db import SessionLocal
+from app.infrastructure.database.models import CorreoSaliente
+from app.infrastructure.email.send_credentials import open_smtp_connection, send_message
+from app.infrastructure.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+EMAIL_PENDING = "pendiente"
+EMAIL_SENT = "enviado"
+EMAIL_FAILED = "fallido"
+
+# Rechazos de un mensaje concreto: la conexión sigue sirviendo para el resto del
+# lote. Cualquier otro error (las excepciones de smtplib son OSError) se trata como
+# caída de la conexión y el resto del lote espera a la siguiente pasada.
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def enqueue_email(db: Session, to: str, subject: str, body: str) -> CorreoSaliente:
+    """
+    Añadir un correo a la bandeja de salida sin confirmar la transacción.
+
+    Se confirma junto con el cambio que lo origina (p. ej. el alta del
+    usuario): o se guardan los dos o ninguno.
+    """
+    email = CorreoSaliente(destinatario=to, asunto=subject, cuerpo=body, estado=EMAIL_PENDING, intentos=0)
+    db.add(email)
+    return email
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Espera exponencial tras `attempts` fallos, acotada a EMAIL_RETRY_MAX_SECONDS"""
+    seconds = settings.EMAIL_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.EMAIL_RETRY_MAX_SECONDS))
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Respuestas 5xx del servidor: reintentar no cambia el resultado"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def _record_failure(email: CorreoSaliente, error: Exception, now: datetime):
+    email.intentos = (email.intentos or 0) + 1
+    email.error = str(error)
+    if _is_permanent(error) or email.intentos >= settings.EMAIL_MAX_ATTEMPTS:
+        email.estado = EMAIL_FAILED
+        email.cuerpo = ""
+    else:
+        email.proximo_intento = now + retry_delay(email.intentos)
+
+
+def claim_emails(db: Session, ids: List[int], now: datetime) -> List[int]:
+    """
+    Reservar correos para este proceso; devuelve los que se consiguieron.
+
+    Cada correo se reserva con un UPDATE condicional que adelanta
+    `proximo_intento` EMAIL_CLAIM_SECONDS: si otro proceso (otro worker de
+    uvicorn, el comando send_emails) lo reservó antes, la condición ya no se
+    cumple y no se envía dos veces. Si el proceso cae a mitad de lote, el
+    correo vuelve a estar pendiente al vencer la reserva.
+    """
+    table = CorreoSaliente.__table__
+    lease = now + timedelta(seconds=settings.EMAIL_CLAIM_SECONDS)
+    claimed = []
+    for id_correo in ids:
+        result = db.execute(
+            table.update()
+            .where(
+                table.c.id_correo == id_correo,
+                table.c.estado == EMAIL_PENDING,
+                table.c.proximo_intento <= now
+            )
+            .values(proximo_intento=lease)
+        )
+        if result.rowcount == 1:
+            claimed.append(id_correo)
+    db.commit()
+    return claimed
+
+
+def send_pending_emails(db: Session, batch_size: Optional[int] = None) -> dict:
+    """
+    Enviar los correos pendientes cuyo reintento ya venció.
+
+    Los correos se reservan antes de enviarlos (`claim_emails`), así varios
+    procesos pueden vaciar la cola a la vez. Todo el lote va por una sola
+    conexión SMTP. Cada fallo suma un intento y
+    aplaza el correo con espera exponencial; tras EMAIL_MAX_ATTEMPTS (o ante
+    un rechazo 5xx) queda como fallido. Si se pierde la conexión, lo que
+    falta del lote sigue pendiente sin contar intento.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    now = datetime.utcnow()
+    report = {"enviados": 0, "reintentos": 0, "fallidos": 0, "completado": True}
+
+    candidates = db.query(CorreoSaliente.id_correo).filter(
+        CorreoSaliente.estado == EMAIL_PENDING,
+        CorreoSaliente.proximo_intento <= now
+    ).order_by(CorreoSaliente.proximo_intento, CorreoSaliente.id_correo).limit(batch_size).all()
+    if not candidates:
+        return report
+    report["completado"] = len(candidates) < batch_size
+
+    claimed = claim_emails(db, [id_correo for id_correo, in candidates], now)
+    if not claimed:
+        return report
+    emails = db.query(CorreoSaliente).filter(
+        CorreoSaliente.id_correo.in_(claimed)
+    ).order_by(CorreoSaliente.id_correo).all()
+
+    try:
+        server = open_smtp_connection()
+    except Exception as e:
+        # Sin servidor no se puede enviar nada: todo el lote cuenta el intento
+        for email in emails:
+            _record_failure(email, e, now)
+            report["fallidos" if email.estado == EMAIL_FAILED else "reintentos"] += 1
+        db.commit()
+        report["completado"] = True
+        return report
+
+    try:
+        for email in emails:
+            try:
+                send_message(server, email.destinatario, email.asunto, email.cuerpo)
+            except MESSAGE_ERRORS as e:
+                _record_failure(email, e, now)
+                report["fallidos" if email.estado == EMAIL_FAILED else "reintentos"] += 1
+                continue
+            except Exception as e:
+                _record_failure(email, e, now)
+                report["fallidos" if email.estado == EMAIL_FAILED else "reintentos"] += 1
+                report["completado"] = False
+                # Lo que falta del lote se libera para la siguiente pasada
+                for remaining in emails[emails.index(email) + 1:]:
+                    remaining.proximo_intento = now
+                break
+            email.estado = EMAIL_SENT
+            email.cuerpo = ""
+            email.error = None
+            email.intentos = (email.intentos or 0) + 1
+            email.fecha_envio = datetime.utcnow()
+            report["enviados"] += 1
+            # Confirmar cada envío: un fallo posterior no debe reenviarlo
+            db.commit()
+        db.commit()
+    finally:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    return report
+
+
+def outbox_stats(db: Session) -> dict:
+    """Profundidad de la cola: correos por estado y antigüedad del pendiente más viejo"""
+    counts = dict(
+        db.query(CorreoSaliente.estado, func.count())
+        .group_by(CorreoSaliente.estado)
+        .all()
+    )
+    oldest = db.query(func.min(CorreoSaliente.fecha_creacion)).filter(
+        CorreoSaliente.estado == EMAIL_PENDING
+    ).scalar()
+    return {
+        "pendientes": counts.get(EMAIL_PENDING, 0),
+        "enviados": counts.get(EMAIL_SENT, 0),
+        "fallidos": counts.get(EMAIL_FAILED, 0),
+        "antiguedad_pendiente_segundos": (datetime.utcnow() - oldest).total_seconds() if oldest else 0,
+        "worker_activo": email_sender.running,
+    }
+
+
+def _send_job():
+    db = SessionLocal()
+    try:
+        report = send_pending_emails(db)
+        if report["enviados"] or report["reintentos"] or report["fallidos"]:
+            logger.info("Bandeja de salida: %s", report)
+    finally:
+        db.close()
+    if not report["completado"] and report["enviados"]:
+        # Lote lleno y el servidor responde: seguir sin esperar al intervalo
+        email_sender.wake()
+
+
+email_sender = PeriodicWorker(
+    "email-sender", settings.EMAIL_OUTBOX_INTERVAL_SECONDS, _send_job, final_run=False
+)
@@ -1,22 +1,35 @@
 import smtplib
-import os
 from email.mime.text import MIMEText
 from app.core.config import settings
 
-def send_credentials_email(to: str, subject: str, body: str):
+def open_smtp_connection() -> smtplib.SMTP:
+    """Conexión SMTP autenticada; se puede reutilizar para varios envíos"""
+    server = smtplib.SMTP(settings.EMAIL_HOST or "smtp.gmail.com", settings.EMAIL_PORT, timeout=30)
+    try:
+        if settings.EMAIL_USE_TLS:
+            server.starttls()
+        if settings.EMAIL_USER and settings.EMAIL_PASS:
+            server.login(settings.EMAIL_USER, settings.EMAIL_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+def send_message(server: smtplib.SMTP, to: str, subject: str, body: str):
     from_email = settings.EMAIL_USER
-    password = settings.EMAIL_PASS
 
     msg = MIMEText(body)
     msg['Subject'] = subject
     msg['From'] = from_email
     msg['To'] = to
 
+    server.sendmail(from_email, [to], msg.as_string())
+
+def send_credentials_email(to: str, subject: str, body: str):
+    """Envío inmediato (bloqueante); el registro usa la bandeja de salida"""
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(from_email, password)
-            server.sendmail(from_email, [to], msg.as_string())
+        with open_smtp_connection() as server:
+            send_message(server, to, subject, body)
     except Exception as e:
         print(f"❌ Error al enviar correo: {e}")
         raise
@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import io
+import os
+import re
+import tempfile
+from typing import List, Optional
+from app.core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Sin Pillow no se generan miniaturas; se sirve el original
+    Image = None
+
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+IMAGE_SIGNATURES = [
+    (b"\x89PNG", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),
+]
+
+THUMBNAIL_MEDIA_TYPE = "image/jpeg"
+
+
+def sniff_media_type(content: bytes) -> str:
+    """Tipo MIME a partir de la firma de los primeros bytes"""
+    return next(
+        (mime for signature, mime in IMAGE_SIGNATURES if content.startswith(signature)),
+        "application/octet-stream"
+    )
+
+
+def decode_image(imagen_referencia: str):
+    """Decodificar una imagen guardada como data URI o base64 plano -> (bytes, media_type)"""
+    media_type = None
+    data = imagen_referencia.strip()
+    if data.startswith("data:"):
+        header, _, data = data.partition(",")
+        media_type = header[5:].split(";")[0] or None
+
+    content = base64.b64decode(data, validate=False)
+    return content, media_type or sniff_media_type(content)
+
+
+class ImageStore:
+    """
+    Almacén de imágenes direccionado por contenido en disco local.
+
+    Cada imagen se guarda una sola vez bajo su sha256 (`<root>/ab/<hash>`)
+    junto con sus miniaturas (`<hash>_<tamaño>.jpg`), que se generan al
+    guardarla. Como el contenido de un hash nunca cambia, las respuestas se
+    pueden cachear indefinidamente.
+    """
+
+    def __init__(self, root: str, thumbnail_sizes: List[int]):
+        self.root = root
+        self.thumbnail_sizes = sorted(thumbnail_sizes)
+
+    @staticmethod
+    def is_valid_hash(digest: str) -> bool:
+        return bool(digest and HASH_PATTERN.match(digest))
+
+    def path(self, digest: str, size: Optional[int] = None) -> str:
+        if not self.is_valid_hash(digest):
+            raise ValueError("Hash de imagen inválido")
+        name = digest if size is None else f"{digest}_{size}.jpg"
+        return os.path.join(self.root, digest[:2], name)
+
+    def exists(self, digest: str, size: Optional[int] = None) -> bool:
+        return self.is_valid_hash(digest) and os.path.exists(self.path(digest, size))
+
+    def _write(self, path: str, content: bytes):
+        # Escritura atómica: nunca se sirve un archivo a medio escribir
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put(self, content: bytes) -> str:
+        """Guardar una imagen (idempotente) y generar sus miniaturas; devuelve el sha256"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            self._write(path, content)
+        self.make_thumbnails(digest, content)
+        return digest
+
+    def make_thumbnails(self, digest: str, content: bytes) -> List[int]:
+        """Generar las miniaturas que falten; devuelve los tamaños disponibles"""
+        if Image is None:
+            return []
+        try:
+            source = Image.open(io.BytesIO(content))
+            source.load()
+        except Exception:
+            # No es una imagen que Pillow sepa leer: solo se sirve el original
+            return []
+
+        if source.mode in ("RGBA", "LA", "P"):
+            source = source.convert("RGBA")
+            background = Image.new("RGB", source.size, (255, 255, 255))
+            background.paste(source, mask=source.split()[-1])
+            source = background
+        elif source.mode != "RGB":
+            source = source.convert("RGB")
+
+        created = []
+        for size in self.thumbnail_sizes:
+            path = self.path(digest, size)
+            if not os.path.exists(path):
+                thumbnail = source.copy()
+                thumbnail.thumbnail((size, size))
+                buffer = io.BytesIO()
+                thumbnail.save(buffer, "JPEG", quality=85, optimize=True)
+                self._write(path, buffer.getvalue())
+            created.append(size)
+        return created
+
+    def resolve(self, digest: str, size: Optional[int] = None):
+        """
+        Archivo a servir -> (path, media_type, tamaño servido), o None si no existe.
+
+        Si se pide un tamaño sin miniatura se usa la más pequeña que lo cubra
+        y, si no hay ninguna, el original.
+        """
+        if not self.exists(digest):
+            return None
+        if size is not None:
+            for candidate in self.thumbnail_sizes:
+                if candidate >= size and self.exists(digest, candidate):
+                    return self.path(digest, candidate), THUMBNAIL_MEDIA_TYPE, candidate
+
+        path = self.path(digest)
+        with open(path, "rb") as handle:
+            media_type = sniff_media_type(handle.read(16))
+        return path, media_type, None
+
+
+image_store = ImageStore(settings.IMAGE_STORE_DIR, settings.IMAGE_THUMBNAIL_SIZES)
@@ -0,0 +1,223 @@
+import bisect
+import math
+import threading
+from collections import namedtuple
+from typing import Callable, Iterable, List
+
+# Formato de texto de Prometheus (GET /metrics)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites superiores (segundos) del histograma de latencia HTTP
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Familia de métricas generada al exportar; samples: (nombre, ((etiqueta, valor), ...), valor)
+MetricFamily = namedtuple("MetricFamily", ["name", "kind", "documentation", "samples"])
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Un contador por límite más el de "más que el último"
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Metric:
+    """
+    Métrica con etiquetas. `labels(...)` devuelve el hijo de esa combinación
+    de valores, creado una sola vez: en la ruta caliente conviene guardarlo y
+    reutilizarlo en vez de construir etiquetas en cada petición.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (registry or metrics_registry).register(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_pairs(self, values):
+        return tuple(zip(self.labelnames, values))
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        for values, child in list(self._children.items()):
+            samples.extend(self._child_samples(self._label_pairs(values), child))
+        return MetricFamily(self.name, self.kind, self.documentation, samples)
+
+    def _child_samples(self, labels, child):
+        return [(self.name, labels, child.value)]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _child_samples(self, labels, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        return histogram_samples(self.name, labels, self.buckets, counts, total, count)
+
+
+def histogram_samples(name, labels, buckets, counts, total, count) -> list:
+    """Muestras _bucket (acumuladas por "le"), _sum y _count de un histograma"""
+    samples, cumulative = [], 0
+    for bound, bucket_count in zip(list(buckets) + [math.inf], counts):
+        cumulative += bucket_count
+        samples.append((f"{name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+    samples.append((f"{name}_sum", labels, total))
+    samples.append((f"{name}_count", labels, count))
+    return samples
+
+
+class MetricsRegistry:
+    """
+    Métricas de la aplicación y colectores que se evalúan al exportar (estado
+    del pool, cachés...): lo que ya se cuenta en otra parte no añade coste
+    en la ruta caliente.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        self._collectors.append(collector)
+        return collector
+
+    def collect(self) -> List[MetricFamily]:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus"""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape(family.documentation, help_text=True)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples:
+                if labels:
+                    rendered = ",".join(f'{label}="{_escape(str(label_value))}"' for label, label_value in labels)
+                    lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str, help_text: bool = False) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value if help_text else value.replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, str):
+        return value
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+metrics_registry = MetricsRegistry()
+
+# Métricas de la API (las alimentan MetricsMiddleware y los servicios de ingesta)
+http_requests_in_flight = Gauge(
+    "easygrow_http_requests_in_flight", "Peticiones HTTP en curso"
+)
+http_request_duration_seconds = Histogram(
+    "easygrow_http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta",
+    ["method", "route"]
+)
+http_requests_total = Counter(
+    "easygrow_http_requests_total", "Peticiones HTTP por ruta y código de estado",
+    ["method", "route", "status"]
+)
+readings_ingested_total = Counter(
+    "easygrow_readings_ingested_total", "Lecturas de sensores guardadas por tipo de sensor",
+    ["sensor_type"]
+)
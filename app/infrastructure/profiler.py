@@ -0,0 +1,173 @@
+import functools
+import inspect
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from fastapi.routing import APIRoute
+from app.core.config import settings
+
+# Raíz del proyecto: los frames propios se muestran como app/...
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Nombres de los perfiles guardados (evita rutas arbitrarias en GET /internal/profiles/{name})
+PROFILE_NAME = re.compile(r"^[\w.-]+\.folded$")
+
+
+@lru_cache(maxsize=8192)
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT + os.sep):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    # co_qualname (3.11+) distingue métodos homónimos: ProfilerMiddleware.__call__
+    return f"{filename}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _stack(frame, root=None) -> Optional[Tuple[str, ...]]:
+    """Pila de raíz a hoja; con `root`, desde ese frame (None si no está en la pila)"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        if frame is root:
+            return tuple(reversed(names))
+        frame = frame.f_back
+    return None if root is not None else tuple(reversed(names))
+
+
+class StackSampler:
+    """
+    Perfil estadístico de una petición: cada `interval` segundos un hilo
+    aparte toma las pilas (sys._current_frames) de los hilos que trabajan
+    para ella.
+
+    - Bucle de eventos: solo cuenta si `root` (el frame del middleware de esta
+      petición) está en la pila, así no se mezclan otras peticiones.
+    - Threadpool: los hilos que ejecutan un endpoint síncrono de esta petición
+      se registran ellos mismos en `workers` (ver ProfiledRoute).
+
+    Para tomar una muestra el hilo del perfilador necesita el GIL, que CPython
+    cede cada sys.getswitchinterval() (5 ms) a uno de los hilos que esperan.
+    Con un endpoint que ocupa la CPU, la separación real entre muestras es de
+    unos 5-20 ms aunque `interval` sea menor. Mientras se perfila se baja el
+    intervalo de cambio a `interval`, y las muestras reales quedan en `samples`.
+    """
+
+    def __init__(self, interval: float, root):
+        self.interval = interval
+        self.root = root
+        self.loop_thread = threading.get_ident()
+        self.workers = set()
+        self.stacks = Counter()
+        self.samples = 0
+        self._switch_interval = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, max(self.interval, 0.0005)))
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frames = sys._current_frames()
+        self.samples += 1
+        stack = _stack(frames.get(self.loop_thread), self.root)
+        if stack:
+            self.stacks[("loop",) + stack] += 1
+        for thread in list(self.workers):
+            frame = frames.get(thread)
+            if frame is not None:
+                self.stacks[("threadpool",) + _stack(frame)] += 1
+
+    def collapsed(self) -> str:
+        """Formato "frame;frame;... muestras" de flamegraph.pl y speedscope"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# Muestreador de la petición perfilada; el threadpool lo hereda con el contexto de la petición
+current_sampler: ContextVar[Optional[StackSampler]] = ContextVar("current_sampler", default=None)
+
+
+def track_worker_thread(endpoint):
+    """Envolver un endpoint síncrono para que su hilo del threadpool se muestree"""
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        sampler = current_sampler.get()
+        if sampler is None:
+            return endpoint(*args, **kwargs)
+        thread = threading.get_ident()
+        sampler.workers.add(thread)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            sampler.workers.discard(thread)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Ruta cuyos endpoints síncronos se pueden perfilar en el threadpool
+    (`APIRouter(route_class=ProfiledRoute)`). Sin PROFILER_ENABLED no los envuelve.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if settings.PROFILER_ENABLED and not inspect.iscoroutinefunction(endpoint):
+            endpoint = track_worker_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class ProfileStore:
+    """Perfiles guardados en disco; se conservan los `max_files` más recientes"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+
+    @staticmethod
+    def profile_name(method: str, path: str) -> str:
+        slug = re.sub(r"[^\w-]+", "_", path.strip("/")) or "root"
+        return f"{datetime.utcnow():%Y%m%d-%H%M%S-%f}-{method}-{slug[:80]}.folded"
+
+    def save(self, name: str, collapsed: str):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as handle:
+            handle.write(collapsed)
+        for old in self.list()[self.max_files:]:
+            os.remove(os.path.join(self.directory, old["nombre"]))
+
+    def list(self) -> List[dict]:
+        """Perfiles guardados, del más reciente al más antiguo"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((name for name in os.listdir(self.directory) if PROFILE_NAME.match(name)), reverse=True)
+        return [
+            {"nombre": name, "bytes": os.path.getsize(os.path.join(self.directory, name))}
+            for name in names
+        ]
+
+    def path(self, name: str) -> Optional[str]:
+        path = os.path.join(self.directory, name)
+        if not PROFILE_NAME.match(name) or not os.path.isfile(path):
+            return None
+        return path
+
+
+profile_store = ProfileStore(settings.PROFILER_DIR, settings.PROFILER_MAX_FILES)
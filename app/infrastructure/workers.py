@@ -0,0 +1,63 @@
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """
+    Hilo en segundo plano que ejecuta `target` cada `interval` segundos.
+
+    `wake()` adelanta la siguiente ejecución (p. ej. cuando un búfer se
+    llena) y `stop()` ejecuta `target` una última vez antes de terminar
+    (salvo con `final_run=False`).
+    """
+
+    def __init__(self, name: str, interval: float, target: Callable[[], None], final_run: bool = True):
+        self.name = name
+        self.interval = interval
+        self.target = target
+        self.final_run = final_run
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0):
+        if not self.running:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run_once(self):
+        try:
+            self.target()
+        except Exception:
+            logger.exception("Error en el worker %s", self.name)
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            self._run_once()
+        # Última pasada para no perder trabajo pendiente al apagar
+        if self.final_run:
+            self._run_once()
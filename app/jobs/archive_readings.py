@@ -0,0 +1,44 @@
+"""
+Archivo en frío de lecturas de plantas dadas de baja.
+
+Mueve a `ARCHIVE_DIR/planta_<id>.csv.gz` las lecturas de las plantas inactivas
+desde hace más de ARCHIVE_AFTER_DAYS días y las borra de lectura_datos en
+lotes. Reactivar la planta (POST /api/v1/plants/{id}/restore) las devuelve.
+
+Uso:
+    python -m app.jobs.archive_readings [--days 30] [--chunk-size 5000] [--pause 0.1] [--max-plants N]
+    python -m app.jobs.archive_readings --restore PLANT_ID
+"""
+import argparse
+import json
+from app.infrastructure.database.db import SessionLocal
+from app.services.archive_service import run_archive_job, restore_plant_readings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivar lecturas de plantas dadas de baja")
+    parser.add_argument("--days", type=int, default=None, help="Días desde la baja antes de archivar")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Lecturas por lote")
+    parser.add_argument("--pause", type=float, default=None, help="Segundos de pausa entre lotes")
+    parser.add_argument("--max-plants", type=int, default=None, help="Detenerse tras N plantas")
+    parser.add_argument("--restore", type=int, default=None, metavar="PLANT_ID",
+                        help="Restaurar las lecturas archivadas de una planta (sin reactivarla)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.restore is not None:
+            report = {
+                "id_planta": args.restore,
+                "lecturas_restauradas": restore_plant_readings(db, args.restore, args.chunk_size)
+            }
+        else:
+            report = run_archive_job(db, args.days, args.chunk_size, args.pause, args.max_plants)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Migración de las imágenes en línea del catálogo al almacén por contenido.
+
+Guarda cada imagen base64 de catalogo_plantas.imagen_referencia como archivo
+(sha256), genera sus miniaturas y registra imagen_hash. Es reanudable.
+
+Uso:
+    python -m app.jobs.migrate_images [--batch-size 50] [--clear-inline]
+"""
+import argparse
+import json
+from app.infrastructure.database.db import SessionLocal
+from app.services.image_service import migrate_inline_images
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mover imágenes del catálogo al almacén por contenido")
+    parser.add_argument("--batch-size", type=int, default=50, help="Filas del catálogo por lote")
+    parser.add_argument("--clear-inline", action="store_true",
+                        help="Vaciar imagen_referencia una vez guardada la imagen")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = migrate_inline_images(db, args.batch_size, args.clear_inline)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
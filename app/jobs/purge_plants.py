@@ -0,0 +1,34 @@
+"""
+Purga de plantas con borrado permanente solicitado.
+
+Borra en lotes las alertas y lecturas de las plantas marcadas y luego la
+planta. La API lo hace en segundo plano cada PURGE_INTERVAL_SECONDS; esta
+tarea sirve para vaciar la cola a mano o con el worker desactivado.
+
+Uso:
+    python -m app.jobs.purge_plants [--chunk-size 1000] [--pause 0.05] [--max-chunks N]
+"""
+import argparse
+import json
+from app.infrastructure.database.db import SessionLocal
+from app.services.purge_service import run_purge_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purgar plantas con borrado permanente pendiente")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Filas por lote")
+    parser.add_argument("--pause", type=float, default=None, help="Segundos de pausa entre lotes")
+    parser.add_argument("--max-chunks", type=int, default=None, help="Detenerse tras N lotes (se reanuda después)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = run_purge_batch(db, args.chunk_size, args.pause, args.max_chunks)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
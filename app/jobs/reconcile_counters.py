@@ -0,0 +1,27 @@
+"""
+Reconciliación de contadores desnormalizados.
+
+Recalcula los contadores (alertas no leídas, plantas y usuarios por especie)
+a partir de las tablas de origen; útil tras cargas masivas o si se sospecha
+de deriva. La API también lo hace cada COUNTER_RECONCILE_SECONDS.
+
+Uso:
+    python -m app.jobs.reconcile_counters
+"""
+import json
+from app.infrastructure.database.db import SessionLocal
+from app.services.counter_service import reconcile_counters
+
+
+def main():
+    db = SessionLocal()
+    try:
+        report = reconcile_counters(db)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Tarea de retención de lecturas crudas.
+
+Uso:
+    python -m app.jobs.retention [--days 90] [--chunk-size 1000] [--pause 0.2] [--max-chunks N]
+"""
+import argparse
+import json
+from app.infrastructure.database.db import SessionLocal
+from app.services.retention_service import run_retention_job
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compactar y borrar lecturas crudas antiguas")
+    parser.add_argument("--days", type=int, default=None, help="Días de lecturas crudas a conservar")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Lecturas por lote")
+    parser.add_argument("--pause", type=float, default=None, help="Segundos de pausa entre lotes")
+    parser.add_argument("--max-chunks", type=int, default=None, help="Detenerse tras N lotes (se reanuda después)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = run_retention_job(db, args.days, args.chunk_size, args.pause, args.max_chunks)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
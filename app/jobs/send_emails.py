@@ -0,0 +1,44 @@
+"""
+Envío de los correos pendientes de la bandeja de salida.
+
+La API los envía en segundo plano cada EMAIL_OUTBOX_INTERVAL_SECONDS (y al
+registrar un usuario); esta tarea sirve para vaciar la cola a mano o con el
+worker desactivado. Con `--stats` solo muestra la profundidad de la cola.
+
+Uso:
+    python -m app.jobs.send_emails [--batch-size 50] [--stats]
+"""
+import argparse
+import json
+from app.infrastructure.database.db import SessionLocal
+from app.infrastructure.email.outbox import outbox_stats, send_pending_emails
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enviar los correos pendientes de la bandeja de salida")
+    parser.add_argument("--batch-size", type=int, default=None, help="Correos por conexión SMTP")
+    parser.add_argument("--stats", action="store_true", help="Solo mostrar el estado de la cola")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.stats:
+            report = outbox_stats(db)
+        else:
+            report = {"enviados": 0, "reintentos": 0, "fallidos": 0}
+            while True:
+                batch = send_pending_emails(db, args.batch_size)
+                for key in report:
+                    report[key] += batch[key]
+                # Seguir mientras se llenen lotes y el servidor responda
+                if batch["completado"] or not batch["enviados"]:
+                    break
+            report["cola"] = outbox_stats(db)
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.routes.auth_routes import router as auth_router
 from app.api.v1.routes.device_routes import router as device_router
@@ -6,8 +6,25 @@ from app.api.v1.routes.user_routes import router as user_router
 from app.api.v1.routes.plant_routes import router as plant_router
 from app.api.v1.routes.catalog_routes import router as catalog_router
 from app.api.v1.routes.sensor_routes import router as sensor_router
+from app.api.v1.routes.sensor_async_routes import router as sensor_async_router
+from app.api.v1.routes.alert_routes import router as alert_router
+from app.api.v1.routes.image_routes import router as image_router
+from app.api.v1.routes.internal_routes import router as internal_router
+from app.api.v1.routes.metrics_routes import router as metrics_router
 
-from app.infrastructure.database.db import create_database
+from app.core.config import settings
+from app.infrastructure.database.migrations import verify_schema
+from app.infrastructure.database.async_db import async_database
+from app.infrastructure.database.routing import replica_monitor, replicas
+from app.api.middleware import MetricsMiddleware, ProfilerMiddleware, QueryStatsMiddleware, ReadYourWritesMiddleware
+from app.infrastructure.database.partitions import partition_manager
+from app.infrastructure.alerts.alert_writer import alert_writer
+from app.services.counter_service import counter_reconciler
+from app.services.purge_service import plant_purger
+from app.core.password_pool import password_pool
+from app.core.jwt_auth import require_user
+from app.core.device_keys import check_device_auth_config
+from app.infrastructure.email.outbox import email_sender
 
 app = FastAPI(title="API FRONT EASYGROW")
 
@@ -19,16 +36,66 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Lecturas del primario justo después de escribir (réplicas, DB_REPLICA_URLS)
+app.add_middleware(ReadYourWritesMiddleware)
+# Sentencias SQL por petición: Server-Timing, presupuesto y log de consultas lentas
+app.add_middleware(QueryStatsMiddleware)
+if settings.METRICS_ENABLED:
+    # El último añadido es el más externo: la latencia incluye los demás middlewares
+    app.add_middleware(MetricsMiddleware)
+if settings.PROFILER_ENABLED:
+    # Perfiles de peticiones sueltas (X-Profile-Token), ver GET /internal/profiles
+    app.add_middleware(ProfilerMiddleware)
 
 @app.on_event("startup")
 async def startup():
-    create_database()
+    # El esquema se actualiza con la CLI de migraciones; aquí solo se verifica
+    verify_schema()
+    check_device_auth_config()
+    # Particiones de lectura_datos para los próximos meses
+    if partition_manager.enabled:
+        partition_manager.ensure_partitions()
+    alert_writer.start()
+    password_pool.start()
+    if settings.COUNTER_RECONCILE_SECONDS > 0:
+        counter_reconciler.start()
+    if settings.PURGE_INTERVAL_SECONDS > 0:
+        # Retoma también las purgas que quedaron a medias
+        plant_purger.start()
+        plant_purger.wake()
+    if replicas.engines:
+        replica_monitor.start()
+    if settings.EMAIL_OUTBOX_INTERVAL_SECONDS > 0:
+        # Envía también lo que quedó en cola antes de reiniciar
+        email_sender.start()
+        email_sender.wake()
 
+@app.on_event("shutdown")
+async def shutdown():
+    # Escribir las alertas que queden en el búfer
+    alert_writer.stop()
+    counter_reconciler.stop()
+    plant_purger.stop()
+    email_sender.stop()
+    replica_monitor.stop()
+    password_pool.shutdown()
+    await async_database.dispose()
 
-# Incluir rutas
+
+# Incluir rutas (con JWT_AUTH_ENABLED, las de usuario exigen token Bearer;
+# sensores lo exige por ruta porque la ingesta usa la clave del dispositivo)
+user_auth = [Depends(require_user)]
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["Auth"])
-app.include_router(device_router, prefix="/api/v1/devices", tags=["Devices"])
-app.include_router(user_router, prefix="/api/v1/users", tags=["Users"])
-app.include_router(plant_router, prefix="/api/v1/plants", tags=["Plants"])
+app.include_router(device_router, prefix="/api/v1/devices", tags=["Devices"], dependencies=user_auth)
+app.include_router(user_router, prefix="/api/v1/users", tags=["Users"], dependencies=user_auth)
+app.include_router(plant_router, prefix="/api/v1/plants", tags=["Plants"], dependencies=user_auth)
 app.include_router(catalog_router, prefix="/api/v1/catalog", tags=["Catalog"])
-app.include_router(sensor_router, prefix="/api/v1/sensors", tags=["Sensors"])
\ No newline at end of file
+if settings.ASYNC_DB_ENABLED:
+    # Antes que sensor_router: las rutas calientes se resuelven con AsyncSession
+    app.include_router(sensor_async_router, prefix="/api/v1/sensors", tags=["Sensors"])
+app.include_router(sensor_router, prefix="/api/v1/sensors", tags=["Sensors"])
+app.include_router(alert_router, prefix="/api/v1/alerts", tags=["Alerts"], dependencies=user_auth)
+app.include_router(image_router, prefix="/api/v1/images", tags=["Images"])
+app.include_router(internal_router, prefix="/internal", tags=["Internal"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router, tags=["Metrics"])
@@ -0,0 +1,115 @@
+import base64
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.domain.repositories.alert_repository import (
+    list_alerts, get_user_unread_count, get_plant_unread_count, mark_alerts_read
+)
+from app.domain.entities.alert import (
+    AlertResponse, AlertListResponse, AlertMarkReadRequest, AlertMarkReadResponse,
+    UnreadCountResponse
+)
+
+def encode_cursor(fecha: datetime, id_alerta: int) -> str:
+    """Cursor opaco con la posición (fecha_creacion, id_alerta) de la última alerta"""
+    raw = f"{fecha.isoformat()}|{id_alerta}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        fecha, id_alerta = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(fecha), int(id_alerta)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+def _alert_page(alertas, has_more: bool, limit: int, no_leidas: int):
+    alert_responses = [
+        AlertResponse(
+            id_alerta=alerta.id_alerta,
+            id_planta=alerta.id_planta,
+            tipo_alerta=alerta.tipo_alerta,
+            nivel=alerta.nivel,
+            mensaje=alerta.mensaje,
+            fecha_creacion=alerta.fecha_creacion,
+            leida=alerta.leida,
+            activa=alerta.activa
+        )
+        for alerta in alertas
+    ]
+    next_cursor = None
+    if has_more and alertas:
+        next_cursor = encode_cursor(alertas[-1].fecha_creacion, alertas[-1].id_alerta)
+
+    return AlertListResponse(
+        alertas=alert_responses,
+        limit=limit,
+        next_cursor=next_cursor,
+        no_leidas=no_leidas
+    )
+
+def get_user_alerts_service(
+    db: Session,
+    user_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    unread_only: bool = False
+):
+    """Obtener las alertas de todas las plantas de un usuario con paginación por cursor"""
+    try:
+        alertas, has_more = list_alerts(
+            db, user_id=user_id, after=decode_cursor(cursor), limit=limit, unread_only=unread_only
+        )
+        return _alert_page(alertas, has_more, limit, get_user_unread_count(db, user_id))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas del usuario: {str(e)}")
+
+def get_plant_alerts_service(
+    db: Session,
+    plant_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    unread_only: bool = False
+):
+    """Obtener las alertas de una planta con paginación por cursor"""
+    try:
+        alertas, has_more = list_alerts(
+            db, plant_id=plant_id, after=decode_cursor(cursor), limit=limit, unread_only=unread_only
+        )
+        return _alert_page(alertas, has_more, limit, get_plant_unread_count(db, plant_id))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas de la planta: {str(e)}")
+
+def mark_alerts_read_service(db: Session, request: AlertMarkReadRequest):
+    """Marcar alertas como leídas (por IDs, por planta o todas las del usuario)"""
+    try:
+        marcadas = mark_alerts_read(db, request.user_id, request.alert_ids, request.plant_id)
+        db.commit()
+        return AlertMarkReadResponse(
+            msg="Alertas marcadas como leídas",
+            marcadas=marcadas,
+            no_leidas=get_user_unread_count(db, request.user_id)
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al marcar alertas: {str(e)}")
+
+def get_user_unread_count_service(db: Session, user_id: int):
+    """Número de alertas no leídas del usuario (lectura de un contador)"""
+    try:
+        return UnreadCountResponse(user_id=user_id, no_leidas=get_user_unread_count(db, user_id))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas no leídas: {str(e)}")
+
+def get_plant_unread_count_service(db: Session, plant_id: int):
+    """Número de alertas no leídas de la planta (lectura de un contador)"""
+    try:
+        return UnreadCountResponse(plant_id=plant_id, no_leidas=get_plant_unread_count(db, plant_id))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener alertas no leídas: {str(e)}")
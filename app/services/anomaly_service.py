@@ -0,0 +1,174 @@
+import logging
+import math
+import threading
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.domain.entities.sensor import SENSOR_RANGES, BINARY_SENSORS, sensor_kind
+from app.infrastructure.alerts.alert_writer import alert_writer
+from app.services.plant_cache import device_plants
+
+logger = logging.getLogger(__name__)
+
+# Diferencia bajo la cual dos lecturas consecutivas se consideran iguales
+STUCK_EPSILON = 1e-9
+
+Anomaly = Tuple[str, str, str]  # (tipo_alerta, nivel, mensaje)
+
+
+class SensorState:
+    """Estado incremental de un sensor: media y varianza EWMA y racha de valores iguales"""
+    __slots__ = ("count", "mean", "var", "last_value", "repeats", "last_alert")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.last_value = None
+        self.repeats = 0
+        self.last_alert = {}
+
+
+class AnomalyDetector:
+    """
+    Detector de anomalías por sensor con coste O(1) por lectura.
+
+    - fuera_de_rango: la lectura sale del rango físico del sensor.
+    - pico: |z| sobre la media/varianza EWMA supera el umbral tras el calentamiento.
+    - sensor_atascado: el mismo valor se repite ANOMALY_STUCK_READINGS veces seguidas.
+
+    Cada tipo de alerta se emite como máximo una vez por sensor cada
+    ANOMALY_COOLDOWN_SECONDS para no inundar de alertas una misma falla.
+    """
+
+    def __init__(
+        self,
+        alpha: float,
+        z_threshold: float,
+        warmup: int,
+        stuck_readings: int,
+        cooldown_seconds: int
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.stuck_readings = stuck_readings
+        self.cooldown_seconds = cooldown_seconds
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        id_sensor: int,
+        tipo_sensor: str,
+        unidad_medida: str,
+        valor: float,
+        fecha_hora: datetime
+    ) -> List[Anomaly]:
+        """Actualizar el estado del sensor con una lectura y devolver sus anomalías"""
+        kind = sensor_kind(tipo_sensor, unidad_medida)
+        anomalies = []
+
+        with self._lock:
+            state = self._states.get(id_sensor)
+            if state is None:
+                state = self._states[id_sensor] = SensorState()
+
+            low, high = SENSOR_RANGES.get(kind, (-math.inf, math.inf))
+            if not low <= valor <= high:
+                # Las lecturas imposibles no se incorporan a la estadística
+                anomalies.append((
+                    "fuera_de_rango", "critico",
+                    f"Lectura fuera de rango del sensor {tipo_sensor} ({id_sensor}): "
+                    f"{valor} {unidad_medida}, esperado entre {low} y {high}"
+                ))
+                return self._throttle(state, anomalies, fecha_hora)
+
+            if kind not in BINARY_SENSORS:
+                if state.last_value is not None and abs(valor - state.last_value) <= STUCK_EPSILON:
+                    state.repeats += 1
+                else:
+                    state.repeats = 1
+                if state.repeats == self.stuck_readings:
+                    anomalies.append((
+                        "sensor_atascado", "advertencia",
+                        f"El sensor {tipo_sensor} ({id_sensor}) reporta {valor} {unidad_medida} "
+                        f"en {state.repeats} lecturas seguidas"
+                    ))
+
+                if state.count >= self.warmup and state.var > 0:
+                    z = (valor - state.mean) / math.sqrt(state.var)
+                    if abs(z) >= self.z_threshold:
+                        anomalies.append((
+                            "pico", "advertencia",
+                            f"Cambio brusco en el sensor {tipo_sensor} ({id_sensor}): "
+                            f"{valor} {unidad_medida} frente a una media de {state.mean:.2f} (z={z:.1f})"
+                        ))
+
+                # Actualización EWMA de media y varianza
+                if state.count == 0:
+                    state.mean = valor
+                else:
+                    diff = valor - state.mean
+                    increment = self.alpha * diff
+                    state.mean += increment
+                    state.var = (1 - self.alpha) * (state.var + diff * increment)
+
+            state.count += 1
+            state.last_value = valor
+            return self._throttle(state, anomalies, fecha_hora)
+
+    def _throttle(self, state: SensorState, anomalies: List[Anomaly], fecha_hora: datetime):
+        allowed = []
+        for anomaly in anomalies:
+            last = state.last_alert.get(anomaly[0])
+            if last is None or (fecha_hora - last).total_seconds() >= self.cooldown_seconds:
+                state.last_alert[anomaly[0]] = fecha_hora
+                allowed.append(anomaly)
+        return allowed
+
+    def reset(self, id_sensor=None):
+        with self._lock:
+            if id_sensor is None:
+                self._states.clear()
+            else:
+                self._states.pop(id_sensor, None)
+
+
+anomaly_detector = AnomalyDetector(
+    alpha=settings.ANOMALY_EWMA_ALPHA,
+    z_threshold=settings.ANOMALY_Z_THRESHOLD,
+    warmup=settings.ANOMALY_WARMUP_READINGS,
+    stuck_readings=settings.ANOMALY_STUCK_READINGS,
+    cooldown_seconds=settings.ANOMALY_COOLDOWN_SECONDS
+)
+
+
+def process_reading_anomalies(db: Session, sensor, lectura) -> int:
+    """
+    Pasar una lectura recién guardada por el detector y encolar sus alertas.
+
+    Las alertas se asocian a las plantas activas del dispositivo del sensor;
+    si el dispositivo no tiene plantas no hay a quién asociarlas y se omiten.
+    """
+    if not settings.ANOMALY_DETECTION_ENABLED:
+        return 0
+    try:
+        anomalies = anomaly_detector.observe(
+            sensor.id_sensor, sensor.tipo_sensor, sensor.unidad_medida,
+            lectura.valor, lectura.fecha_hora
+        )
+        if not anomalies or sensor.id_dispositivo is None:
+            return 0
+
+        queued = 0
+        for plant in device_plants.get(db, sensor.id_dispositivo):
+            for tipo_alerta, nivel, mensaje in anomalies:
+                alert_writer.add(plant.id_planta, tipo_alerta, nivel, mensaje)
+                queued += 1
+        return queued
+    except Exception:
+        # La detección nunca debe hacer fallar la ingesta
+        logger.exception("Error al procesar anomalías de la lectura %s", lectura.id_lectura)
+        return 0
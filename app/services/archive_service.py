@@ -0,0 +1,163 @@
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.infrastructure.archive.reading_archive import reading_archive
+from app.infrastructure.database.models import Planta, LecturaDatos, ArchivoLecturasPlanta
+from app.infrastructure.database.partitions import partition_manager
+
+
+def archive_plant_readings(
+    db: Session,
+    plant_id: int,
+    chunk_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None
+) -> int:
+    """
+    Mover las lecturas de una planta a su archivo comprimido.
+
+    Cada lote se añade al archivo (sincronizado a disco) antes de borrarse
+    de la tabla, y el borrado se confirma por lote. Si se interrumpe, la
+    siguiente pasada añade lo que quedó; un lote repetido en el archivo se
+    descarta al restaurar.
+    """
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    if pause_seconds is None:
+        pause_seconds = settings.ARCHIVE_PAUSE_SECONDS
+
+    archived = 0
+    for table in partition_manager.reading_tables():
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(table.c.id_lectura, table.c.id_sensor, table.c.fecha_hora, table.c.valor)
+                .where(table.c.id_planta == plant_id, table.c.id_lectura > last_id)
+                .order_by(table.c.id_lectura)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            reading_archive.append(plant_id, rows)
+            ids = [row.id_lectura for row in rows]
+            try:
+                db.execute(table.delete().where(table.c.id_lectura.in_(ids)))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            archived += len(rows)
+            last_id = ids[-1]
+            if len(rows) < chunk_size:
+                break
+            # Pausa entre lotes para no acaparar bloqueos ni E/S
+            time.sleep(pause_seconds)
+
+    record = db.get(ArchivoLecturasPlanta, plant_id)
+    if record is None:
+        record = ArchivoLecturasPlanta(
+            id_planta=plant_id, ruta_archivo=reading_archive.path(plant_id), total_lecturas=0
+        )
+        db.add(record)
+    record.total_lecturas = (record.total_lecturas or 0) + archived
+    record.tamano_bytes = reading_archive.size(plant_id)
+    record.fecha_archivo = datetime.utcnow()
+    db.commit()
+    return archived
+
+
+def run_archive_job(
+    db: Session,
+    after_days: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+    max_plants: Optional[int] = None
+) -> dict:
+    """Archivar las lecturas de las plantas dadas de baja hace más de `after_days` días"""
+    after_days = settings.ARCHIVE_AFTER_DAYS if after_days is None else after_days
+    cutoff = datetime.utcnow() - timedelta(days=after_days)
+    report = {
+        "fecha_corte": cutoff.isoformat(),
+        "plantas_archivadas": 0,
+        "lecturas_archivadas": 0,
+        "completado": True
+    }
+
+    # Plantas dadas de baja antes del corte y aún sin archivo
+    query = db.query(Planta.id_planta).outerjoin(
+        ArchivoLecturasPlanta, ArchivoLecturasPlanta.id_planta == Planta.id_planta
+    ).filter(
+        Planta.activa == False,
+        Planta.pendiente_purga == False,
+        Planta.fecha_baja < cutoff,
+        ArchivoLecturasPlanta.id_planta.is_(None)
+    ).order_by(Planta.fecha_baja)
+    plant_ids = [row.id_planta for row in query.all()]
+
+    for index, plant_id in enumerate(plant_ids):
+        if max_plants is not None and index >= max_plants:
+            report["completado"] = False
+            break
+        # La planta pudo reactivarse o borrarse mientras se archivaban las anteriores
+        still_inactive = db.query(Planta.id_planta).filter(
+            Planta.id_planta == plant_id, Planta.activa == False, Planta.pendiente_purga == False
+        ).first()
+        if not still_inactive:
+            continue
+        report["lecturas_archivadas"] += archive_plant_readings(db, plant_id, chunk_size, pause_seconds)
+        report["plantas_archivadas"] += 1
+    return report
+
+
+def _restore_batch(db: Session, plant_id: int, batch: dict) -> int:
+    """Insertar un lote archivado omitiendo los ids que ya estén en alguna tabla"""
+    ids = list(batch)
+    existing = set()
+    for table in partition_manager.reading_tables():
+        existing.update(db.execute(
+            select(table.c.id_lectura).where(table.c.id_lectura.in_(ids))
+        ).scalars())
+
+    values = [
+        {"id_lectura": id_lectura, "id_sensor": id_sensor, "fecha_hora": fecha_hora,
+         "valor": valor, "id_planta": plant_id}
+        for id_lectura, id_sensor, fecha_hora, valor in batch.values()
+        if id_lectura not in existing
+    ]
+    if values:
+        db.execute(LecturaDatos.__table__.insert(), values)
+    db.commit()
+    return len(values)
+
+
+def restore_plant_readings(db: Session, plant_id: int, chunk_size: Optional[int] = None) -> int:
+    """Devolver a lectura_datos las lecturas archivadas de una planta y borrar su archivo"""
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    restored = 0
+    if reading_archive.exists(plant_id):
+        batch = {}
+        for row in reading_archive.read(plant_id):
+            batch[row[0]] = row
+            if len(batch) >= chunk_size:
+                restored += _restore_batch(db, plant_id, batch)
+                batch = {}
+        if batch:
+            restored += _restore_batch(db, plant_id, batch)
+
+    db.query(ArchivoLecturasPlanta).filter(
+        ArchivoLecturasPlanta.id_planta == plant_id
+    ).delete(synchronize_session=False)
+    db.commit()
+    # El archivo se borra solo cuando todas sus filas ya están en la tabla
+    reading_archive.remove(plant_id)
+    return restored
+
+
+def discard_plant_archive(db: Session, plant_id: int):
+    """Olvidar el archivo de una planta que se va a borrar (sin confirmar la transacción)"""
+    db.query(ArchivoLecturasPlanta).filter(
+        ArchivoLecturasPlanta.id_planta == plant_id
+    ).delete(synchronize_session=False)
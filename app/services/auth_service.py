@@ -1,24 +1,34 @@
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
-from app.core.security import hash_password, verify_password, create_jwt
-from app.domain.repositories.user_repository import create_user, get_user_with_devices
-from app.infrastructure.email.send_credentials import send_credentials_email
+from starlette.concurrency import run_in_threadpool
+from app.core.security import hash_password, create_jwt
+from app.core.password_pool import password_pool
+from app.domain.repositories.user_repository import create_user, get_user_with_devices, update_user_password
+from app.infrastructure.email.outbox import enqueue_email, email_sender
 from app.domain.entities.user import UserResponse, DispositivoResponse, LoginResponse
+from app.services.user_cache import user_count
 
-def register_user(db, user):
+def register_user(db, user, hashed=None):
+    """
+    Dar de alta al usuario y dejar el correo de bienvenida en la bandeja de salida.
+
+    El correo se confirma en la misma transacción que el usuario y lo envía
+    el worker `email_sender`: el registro no espera al servidor SMTP ni
+    falla si este no responde. No lleva la contraseña: la tabla
+    `correo_saliente` no debe guardar secretos.
+    """
     try:
-        hashed = hash_password(user.contrasena)
+        hashed = hashed or hash_password(user.contrasena)
         user_data = user.dict()
         user_data["contrasena"] = hashed
-        new_user = create_user(db, user_data)
 
         email_body = f"""
 Hola {user.nombre_completo},
 
-🪴Bienvenido a EasyGrow.🪴 Aquí están tus credenciales para acceder a la plataforma:
+🪴Bienvenido a EasyGrow.🪴 Tu cuenta ya está lista para acceder a la plataforma:
 
 Usuario: {user.usuario}
-Contraseña: {user.contrasena}
+Contraseña: la que elegiste al registrarte
 
 Si tienes dudas o necesitas ayuda, contáctanos.
 
@@ -26,11 +36,16 @@ Saludos cordiales,
 Equipo EasyGrow ☘️🌻
         """
 
-        send_credentials_email(
+        enqueue_email(
+            db,
             to=user.correo,
-            subject="Tus credenciales de acceso a EasyGrow",
+            subject="Bienvenido a EasyGrow",
             body=email_body
         )
+        # create_user confirma el usuario y el correo encolado juntos
+        new_user = create_user(db, user_data)
+        user_count.invalidate()
+        email_sender.wake()
         return new_user
     except IntegrityError:
         db.rollback()
@@ -39,24 +54,17 @@ Equipo EasyGrow ☘️🌻
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno al registrar usuario: {str(e)}")
 
-def login_user(db, credentials):
-    user = get_user_with_devices(db, credentials.usuario)
-    if user and verify_password(credentials.contrasena, user.contrasena):
-        # Crear token JWT
-        token = create_jwt({"sub": user.usuario})
-        
-        # Convertir dispositivos a response model
-        dispositivos_response = [
-            DispositivoResponse(
-                id_dispositivo=dispositivo.id_dispositivo,
-                mac_address=dispositivo.mac_address,
-                nombre_dispositivo=dispositivo.nombre_dispositivo,
-                fecha_asignacion=dispositivo.fecha_asignacion
-            )
-            for dispositivo in user.dispositivos
-        ]
-        
-        # Crear respuesta del usuario
+def _load_login_candidate(db, username: str):
+    """
+    Usuario a validar -> (id, hash, respuesta) o None.
+
+    Todo en una sola llamada al threadpool y terminando la transacción: la
+    conexión vuelve al pool antes de esperar a bcrypt.
+    """
+    try:
+        user = get_user_with_devices(db, username)
+        if not user:
+            return None
         user_response = UserResponse(
             id_usuario=user.id_usuario,
             nombre_completo=user.nombre_completo,
@@ -64,13 +72,48 @@ def login_user(db, credentials):
             correo=user.correo,
             usuario=user.usuario,
             fecha_registro=user.fecha_registro,
-            dispositivos=dispositivos_response
-        )
-        
-        # Retornar respuesta completa
-        return LoginResponse(
-            access_token=token,
-            token_type="bearer",
-            user_info=user_response
+            dispositivos=[
+                DispositivoResponse(
+                    id_dispositivo=dispositivo.id_dispositivo,
+                    mac_address=dispositivo.mac_address,
+                    nombre_dispositivo=dispositivo.nombre_dispositivo,
+                    fecha_asignacion=dispositivo.fecha_asignacion
+                )
+                for dispositivo in user.dispositivos
+            ]
         )
-    return None
\ No newline at end of file
+        return user.id_usuario, user.contrasena, user_response
+    finally:
+        db.rollback()
+
+async def login_user(db, credentials):
+    """
+    Validar credenciales y emitir el token.
+
+    bcrypt corre en el pool de procesos (`password_pool`) y las consultas en
+    el threadpool, así el event loop no se bloquea. Si el hash guardado usa
+    otro coste que BCRYPT_ROUNDS se reemplaza por uno nuevo.
+    """
+    # Rechazar antes de tocar la base si el pool ya está lleno
+    password_pool.check_admission()
+
+    candidate = await run_in_threadpool(_load_login_candidate, db, credentials.usuario)
+    if not candidate:
+        return None
+    user_id, hashed, user_response = candidate
+
+    valid, new_hash = await password_pool.verify_and_update(credentials.contrasena, hashed)
+    if not valid:
+        return None
+    if new_hash:
+        await run_in_threadpool(update_user_password, db, user_id, new_hash)
+
+    # Crear token JWT
+    token = create_jwt({"sub": user_response.usuario})
+
+    # Retornar respuesta completa
+    return LoginResponse(
+        access_token=token,
+        token_type="bearer",
+        user_info=user_response
+    )
@@ -0,0 +1,176 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.domain.repositories.catalog_repository import get_catalog_index_rows, get_catalog_version
+
+# Lo necesario para responder una lista del catálogo sin ir a la base de datos
+CatalogEntry = namedtuple("CatalogEntry", [
+    "id_catalogo", "nombre_comun", "nombre_cientifico", "descripcion",
+    "altura_maxima_cm", "activo", "imagen_hash", "tiene_imagen"
+])
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """Minúsculas y sin acentos: "Orégano" -> "oregano" """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ids: Set[int] = set()
+
+
+class _Snapshot:
+    """Índices inmutables de una carga del catálogo (se reemplazan enteros)"""
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self.entries: Dict[int, CatalogEntry] = {}
+        self.texts: Dict[int, str] = {}
+        self.trie = _TrieNode()
+        self.trigrams: Dict[str, Set[int]] = {}
+
+        for entry in entries:
+            self.entries[entry.id_catalogo] = entry
+            text = f"{normalize(entry.nombre_comun)} {normalize(entry.nombre_cientifico)}"
+            self.texts[entry.id_catalogo] = text
+            for token in set(tokenize(text)):
+                node = self.trie
+                for char in token:
+                    node = node.children.setdefault(char, _TrieNode())
+                    node.ids.add(entry.id_catalogo)
+            for gram in trigrams(text):
+                self.trigrams.setdefault(gram, set()).add(entry.id_catalogo)
+
+        # Orden de la lista: nombre común sin acentos, luego id
+        self.ordered = sorted(
+            self.entries.values(),
+            key=lambda entry: (normalize(entry.nombre_comun), entry.id_catalogo)
+        )
+
+    def prefix_ids(self, token: str) -> Set[int]:
+        node = self.trie
+        for char in token:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def substring_ids(self, token: str) -> Set[int]:
+        # Candidatos por trigramas y verificación exacta sobre el texto normalizado
+        grams = trigrams(token)
+        candidates = None
+        for gram in grams:
+            ids = self.trigrams.get(gram)
+            if not ids:
+                return set()
+            candidates = set(ids) if candidates is None else candidates & ids
+        return {id_catalogo for id_catalogo in candidates if token in self.texts[id_catalogo]}
+
+    def match(self, search: str) -> Set[int]:
+        """Ids cuyo nombre contiene cada palabra buscada (prefijo o, desde 3 letras, subcadena)"""
+        matched = None
+        for token in tokenize(search):
+            ids = set(self.prefix_ids(token))
+            if len(token) >= 3:
+                ids |= self.substring_ids(token)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return set()
+        return matched or set()
+
+
+class CatalogIndex:
+    """
+    Índice en memoria del catálogo para listar y buscar sin consultar la base.
+
+    Los nombres se normalizan (minúsculas, sin acentos) y se indexan en un
+    trie de prefijos por palabra y en un índice de trigramas para búsquedas
+    por subcadena. El catálogo cambia poco: se recarga al invalidarlo, cada
+    CATALOG_INDEX_TTL_SECONDS y cuando cambia su versión en `version_datos`
+    (la suben los comandos que lo editan fuera de la API, p. ej.
+    migrate_images), que se consulta cada CATALOG_INDEX_CHECK_SECONDS.
+    """
+
+    def __init__(self, ttl: float, check_interval: float):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._loaded_at = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, entries: Iterable[CatalogEntry], version: Optional[int] = None):
+        snapshot = _Snapshot(entries)
+        with self._lock:
+            self._snapshot = snapshot
+            self._version = version
+            self._loaded_at = self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Forzar la recarga en la siguiente búsqueda"""
+        self._loaded_at = None
+
+    def needs_load(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _stale_version(self, db: Session) -> bool:
+        # Una consulta por clave primaria cada check_interval, no en cada búsqueda
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = time.monotonic()
+        return get_catalog_version(db) != self._version
+
+    def _ensure_loaded(self, db: Session) -> _Snapshot:
+        if self.needs_load() or self._stale_version(db):
+            self.misses += 1
+            # La versión se lee antes que las filas: un cambio a mitad de carga se vuelve a cargar
+            version = get_catalog_version(db)
+            self.load((CatalogEntry(*row) for row in get_catalog_index_rows(db)), version)
+        else:
+            self.hits += 1
+        return self._snapshot
+
+    def search(
+        self,
+        db: Session,
+        skip: int = 0,
+        limit: int = 50,
+        search: Optional[str] = None,
+        active_only: bool = True
+    ) -> Tuple[List[CatalogEntry], int]:
+        """Página de entradas y total, con los mismos filtros que el repositorio"""
+        snapshot = self._ensure_loaded(db)
+        ids = snapshot.match(search) if search and search.strip() else None
+
+        matches = [
+            entry for entry in snapshot.ordered
+            if (ids is None or entry.id_catalogo in ids) and (entry.activo or not active_only)
+        ]
+        return matches[skip:skip + limit], len(matches)
+
+
+catalog_index = CatalogIndex(settings.CATALOG_INDEX_TTL_SECONDS, settings.CATALOG_INDEX_CHECK_SECONDS)
@@ -1,11 +1,18 @@
+import binascii
+import hashlib
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.domain.repositories.catalog_repository import (
     get_all_catalog_plants,
     get_catalog_plant_by_id_with_stats,
-    count_catalog_plants
+    count_catalog_plants,
+    get_catalog_image
 )
+from app.infrastructure.images.image_store import image_store, decode_image
+from app.core.config import settings
+from app.services.image_service import catalog_image_url, catalog_thumbnail_url
+from app.services.catalog_index import catalog_index
 from app.domain.entities.catalog import (
     CatalogListResponse, 
     CatalogPlantDetailResponse,
@@ -21,11 +28,15 @@ def get_all_catalog_plants_service(
 ):
     """Obtener todas las plantas del catálogo con filtros y paginación"""
     try:
-        # Obtener plantas del repositorio
-        plants = get_all_catalog_plants(db, skip, limit, search, active_only)
-        
-        # Contar total de plantas
-        total = count_catalog_plants(db, search, active_only)
+        if settings.CATALOG_INDEX_ENABLED:
+            # Búsqueda y total desde el índice en memoria (sin ILIKE '%...%')
+            plants, total = catalog_index.search(db, skip, limit, search, active_only)
+        else:
+            # Obtener plantas del repositorio
+            plants = get_all_catalog_plants(db, skip, limit, search, active_only)
+            
+            # Contar total de plantas
+            total = count_catalog_plants(db, search, active_only)
         
         # Convertir a formato de respuesta
         catalog_plants = [
@@ -35,7 +46,8 @@ def get_all_catalog_plants_service(
                 nombre_cientifico=plant.nombre_cientifico,
                 descripcion=plant.descripcion,
                 altura_maxima_cm=plant.altura_maxima_cm,
-                imagen_referencia=plant.imagen_referencia,
+                imagen_url=catalog_image_url(plant),
+                imagen_miniatura_url=catalog_thumbnail_url(plant),
                 activo=plant.activo
             )
             for plant in plants
@@ -75,7 +87,10 @@ def get_catalog_plant_by_id_service(db: Session, catalog_id: int):
             nombre_cientifico=plant.nombre_cientifico,
             descripcion=plant.descripcion,
             altura_maxima_cm=plant.altura_maxima_cm,
-            imagen_referencia=plant.imagen_referencia,
+            # En línea solo mientras la imagen no esté en el almacén
+            imagen_referencia=None if plant.imagen_hash else plant.imagen_referencia,
+            imagen_url=catalog_image_url(plant),
+            imagen_miniatura_url=catalog_thumbnail_url(plant),
             activo=plant.activo,
             cuidados_especiales=plant.cuidados_especiales,
             fecha_creacion=plant.fecha_creacion,
@@ -89,4 +104,45 @@ def get_catalog_plant_by_id_service(db: Session, catalog_id: int):
         raise HTTPException(
             status_code=500, 
             detail=f"Error al obtener detalles de la planta: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def get_catalog_image_service(db: Session, catalog_id: int, if_none_match: Optional[str] = None):
+    """
+    Obtener la imagen de referencia decodificada -> (bytes, media_type, etag)
+
+    El ETag se calcula antes de leer el archivo o decodificar el base64: si
+    coincide con If-None-Match se devuelve (None, None, etag) sin tocar la imagen.
+    """
+    try:
+        row = get_catalog_image(db, catalog_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Planta no encontrada en el catálogo")
+
+        # Imagen ya migrada al almacén por contenido
+        if row.imagen_hash and image_store.exists(row.imagen_hash):
+            etag = f'"{row.imagen_hash}"'
+            if etag_matches(if_none_match, etag):
+                return None, None, etag
+            path, media_type, _ = image_store.resolve(row.imagen_hash)
+            with open(path, "rb") as handle:
+                return handle.read(), media_type, etag
+
+        if not row.imagen_referencia:
+            raise HTTPException(status_code=404, detail="La planta no tiene imagen de referencia")
+
+        etag = '"' + hashlib.sha256(row.imagen_referencia.encode()).hexdigest()[:32] + '"'
+        if etag_matches(if_none_match, etag):
+            return None, None, etag
+        content, media_type = decode_image(row.imagen_referencia)
+        return content, media_type, etag
+
+    except HTTPException as e:
+        raise e
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=422, detail="La imagen de referencia no es base64 válido")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener la imagen: {str(e)}")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True si el ETag está en la cabecera If-None-Match del cliente"""
+    return bool(if_none_match) and etag in [tag.strip() for tag in if_none_match.split(",")]
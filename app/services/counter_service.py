@@ -0,0 +1,34 @@
+import logging
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.domain.repositories.alert_repository import reconcile_unread_counters
+from app.domain.repositories.catalog_counter_repository import reconcile_catalog_counters
+from app.infrastructure.database.db import SessionLocal
+from app.infrastructure.workers import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+def reconcile_counters(db: Session) -> dict:
+    """Recalcular todos los contadores desnormalizados en una transacción"""
+    try:
+        report = {
+            "contadores_alertas_planta": reconcile_unread_counters(db),
+            "contadores_catalogo": reconcile_catalog_counters(db)
+        }
+        db.commit()
+        return report
+    except Exception:
+        db.rollback()
+        raise
+
+def _reconcile_job():
+    db = SessionLocal()
+    try:
+        report = reconcile_counters(db)
+        logger.info("Contadores reconciliados: %s", report)
+    finally:
+        db.close()
+
+counter_reconciler = PeriodicWorker(
+    "counter-reconciler", settings.COUNTER_RECONCILE_SECONDS, _reconcile_job, final_run=False
+)
@@ -1,11 +1,16 @@
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
 from app.domain.repositories.device_repository import (
     create_device, 
     check_device_exists, 
-    get_user_by_id
+    get_user_by_id,
+    get_device_by_id,
+    set_device_key_hash
 )
-from app.domain.entities.device import DeviceResponse, DeviceAssignResponse
+from app.domain.entities.device import DeviceResponse, DeviceAssignResponse, DeviceKeyResponse
+from app.domain.repositories.user_repository import get_user_by_username
+from app.core.device_keys import generate_device_key, key_digest, device_keys
 
 def assign_device_to_user(db, device_request):
     """Asignar un dispositivo a un usuario usando datos del body"""
@@ -60,4 +65,35 @@ def assign_device_to_user(db, device_request):
         raise HTTPException(
             status_code=500, 
             detail=f"Error interno al asignar dispositivo: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def rotate_device_key_service(db, device_id: int, claims: Optional[dict]):
+    """
+    Emitir una clave API nueva para el dispositivo (la anterior deja de valer).
+
+    El propietario sale del token (`sub`), nunca de un parámetro: sin
+    JWT_AUTH_ENABLED no hay forma de saber quién pide la clave y se rechaza.
+    Solo se guarda su HMAC; la clave en claro se devuelve esta única vez.
+    """
+    if claims is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Generar claves de dispositivo requiere JWT_AUTH_ENABLED"
+        )
+    user = get_user_by_username(db, claims.get("sub"))
+    device = get_device_by_id(db, device_id)
+    if not user or not device or device.id_usuario != user.id_usuario:
+        raise HTTPException(status_code=404, detail="Dispositivo no encontrado o no pertenece al usuario")
+
+    try:
+        key = generate_device_key()
+        set_device_key_hash(db, device_id, key_digest(key))
+        device_keys.invalidate(device_id)
+        return DeviceKeyResponse(
+            msg="Clave API generada; guárdala, no se vuelve a mostrar",
+            id_dispositivo=device_id,
+            clave_api=key
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al generar la clave del dispositivo: {str(e)}")
@@ -0,0 +1,90 @@
+import binascii
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.infrastructure.database.models import CatalogoPlanta
+from app.infrastructure.images.image_store import image_store, decode_image
+from app.domain.repositories.catalog_repository import bump_catalog_version
+
+def catalog_image_url(catalogo, size: Optional[int] = None):
+    """
+    URL de la imagen de referencia de una planta del catálogo (None si no tiene).
+
+    Las imágenes migradas al almacén se sirven por hash (cacheables para
+    siempre); las que siguen en línea, por el endpoint del catálogo.
+    """
+    if catalogo.imagen_hash:
+        url = f"/api/v1/images/{catalogo.imagen_hash}"
+        return f"{url}?size={size}" if size else url
+    if catalogo.tiene_imagen:
+        return f"/api/v1/catalog/{catalogo.id_catalogo}/image"
+    return None
+
+def catalog_thumbnail_url(catalogo):
+    """URL de la miniatura más pequeña (o de la imagen si no hay miniaturas)"""
+    size = image_store.thumbnail_sizes[0] if image_store.thumbnail_sizes else None
+    return catalog_image_url(catalogo, size)
+
+def get_image_service(image_hash: str, size: Optional[int] = None):
+    """Archivo a servir para un hash -> (path, media_type, etag)"""
+    if not image_store.is_valid_hash(image_hash):
+        raise HTTPException(status_code=400, detail="Hash de imagen inválido")
+    try:
+        resolved = image_store.resolve(image_hash, size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener la imagen: {str(e)}")
+    if not resolved:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+
+    path, media_type, served_size = resolved
+    etag = f'"{image_hash}-{served_size}"' if served_size else f'"{image_hash}"'
+    return path, media_type, etag
+
+def migrate_inline_images(db: Session, batch_size: int = 50, clear_inline: bool = False):
+    """
+    Mover las imágenes en línea (base64) del catálogo al almacén por contenido.
+
+    Recorre el catálogo por id en lotes, guarda cada imagen (y sus miniaturas)
+    y registra su hash. Con `clear_inline` además vacía imagen_referencia.
+    Es reanudable: las filas ya migradas se omiten.
+    """
+    report = {"migradas": 0, "vaciadas": 0, "errores": []}
+    last_id = 0
+
+    while True:
+        query = db.query(
+            CatalogoPlanta.id_catalogo, CatalogoPlanta.imagen_referencia, CatalogoPlanta.imagen_hash
+        ).filter(
+            CatalogoPlanta.id_catalogo > last_id,
+            CatalogoPlanta.imagen_referencia.isnot(None)
+        )
+        if not clear_inline:
+            query = query.filter(CatalogoPlanta.imagen_hash.is_(None))
+        rows = query.order_by(CatalogoPlanta.id_catalogo).limit(batch_size).all()
+        if not rows:
+            break
+
+        for id_catalogo, imagen_referencia, imagen_hash in rows:
+            try:
+                values = {}
+                if not imagen_hash:
+                    content, _ = decode_image(imagen_referencia)
+                    values["imagen_hash"] = image_store.put(content)
+                    report["migradas"] += 1
+                if clear_inline:
+                    values["imagen_referencia"] = None
+                    report["vaciadas"] += 1
+                db.query(CatalogoPlanta).filter(
+                    CatalogoPlanta.id_catalogo == id_catalogo
+                ).update(values, synchronize_session=False)
+            except (binascii.Error, ValueError) as e:
+                report["errores"].append({"id_catalogo": id_catalogo, "error": str(e)})
+
+        db.commit()
+        last_id = rows[-1].id_catalogo
+
+    # Las listas del catálogo devuelven URLs por hash: los índices de la API
+    # (otros procesos) recargan al ver la nueva versión
+    bump_catalog_version(db)
+    db.commit()
+    return report
@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import namedtuple
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from app.infrastructure.database.models import Planta
+
+DevicePlant = namedtuple("DevicePlant", ["id_planta", "id_catalogo"])
+
+# Segundos que se reutiliza la lista de plantas de un dispositivo
+DEVICE_PLANTS_TTL = 60
+
+
+class DevicePlantCache:
+    """Plantas activas asociadas a cada dispositivo, cacheadas en memoria"""
+
+    def __init__(self, ttl: float = DEVICE_PLANTS_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session, device_id: int) -> Tuple[DevicePlant, ...]:
+        entry = self._entries.get(device_id)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        plants = tuple(
+            DevicePlant(*row) for row in db.query(Planta.id_planta, Planta.id_catalogo).filter(
+                Planta.id_dispositivo == device_id,
+                Planta.activa == True
+            ).all()
+        )
+        with self._lock:
+            self._entries[device_id] = (time.monotonic() + self.ttl, plants)
+        return plants
+
+    def invalidate(self, device_id=None):
+        """Olvidar un dispositivo (o todos si no se indica)"""
+        with self._lock:
+            if device_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(device_id, None)
+
+
+device_plants = DevicePlantCache()
+
+
+def reading_plant_id(plants: Tuple[DevicePlant, ...]) -> Optional[int]:
+    """
+    Planta a la que se atribuye una lectura del dispositivo (lectura_datos.id_planta).
+
+    Solo si el dispositivo tiene una única planta activa: con varias, la
+    lectura es de todas y no se asigna, así archivar o purgar una de ellas
+    no se lleva los datos de las demás.
+    """
+    return plants[0].id_planta if len(plants) == 1 else None
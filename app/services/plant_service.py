@@ -3,189 +3,240 @@ from sqlalchemy import and_
 from app.infrastructure.database.models import Planta, CatalogoPlanta, Dispositivo
 from app.domain.entities.plant import (
     UserPlantsResponse, DevicePlantsResponse, UserDevicePlantsResponse, 
-    PlantDetailResponse, PlantResponse, CatalogPlantInfo
+    PlantDetailResponse, PlantResponse, CatalogPlantInfo, PlantDeleteResponse,
+    PlantListResponse, PlantPurgeResponse, PlantRestoreResponse
+)
+from app.domain.repositories.plant_query import PlantQuery, InvalidCursorError
+from app.infrastructure.database.models import SensorDatos, PurgaPlanta, ArchivoLecturasPlanta
+from app.infrastructure.archive.reading_archive import reading_archive
+from app.services.archive_service import restore_plant_readings
+from app.services.plant_cache import device_plants
+from app.services.image_service import catalog_image_url, catalog_thumbnail_url
+from app.domain.repositories.alert_repository import remove_plant_counters
+from app.domain.repositories.catalog_counter_repository import add_active_plant, remove_active_plant
+from app.domain.repositories.reading_repository import (
+    get_latest_readings_by_sensor, get_reading_stats_by_sensor
 )
-from app.infrastructure.database.models import LecturaDatos, Alerta
 
 from fastapi import HTTPException
+from datetime import datetime, timedelta
+from typing import Optional
+
+def _catalog_info(catalogo, include_image: bool = False):
+    return CatalogPlantInfo(
+        id_catalogo=catalogo.id_catalogo,
+        nombre_comun=catalogo.nombre_comun,
+        nombre_cientifico=catalogo.nombre_cientifico,
+        descripcion=catalogo.descripcion,
+        altura_maxima_cm=catalogo.altura_maxima_cm,
+        cuidados_especiales=catalogo.cuidados_especiales,
+        imagen_referencia=catalogo.imagen_referencia if include_image else None,
+        imagen_url=catalog_image_url(catalogo),
+        imagen_miniatura_url=catalog_thumbnail_url(catalogo)
+    )
 
-def get_user_plants_service(db: Session, user_id: int, active_only: bool = True):
-    """Obtener todas las plantas de un usuario específico"""
+def _plant_response(planta, include_image: bool = False):
+    return PlantResponse(
+        id_planta=planta.id_planta,
+        id_catalogo=planta.id_catalogo,
+        id_usuario=planta.id_usuario,
+        id_dispositivo=planta.id_dispositivo,
+        nombre_personalizado=planta.nombre_personalizado,
+        ubicacion=planta.ubicacion,
+        fecha_plantacion=planta.fecha_plantacion,
+        fecha_registro=planta.fecha_registro,
+        notas_usuario=planta.notas_usuario,
+        activa=planta.activa,
+        catalogo_info=_catalog_info(planta.catalogo_info, include_image)
+    )
+
+def _plant_page(query: PlantQuery, limit: int, cursor: Optional[str], include_image: bool):
+    """Página de PlantResponse, cursor siguiente y resumen de la consulta"""
     try:
-        query = db.query(Planta).options(
-            joinedload(Planta.catalogo_info),
-            joinedload(Planta.dispositivo)
-        ).filter(Planta.id_usuario == user_id)
-        
-        if active_only:
-            query = query.filter(Planta.activa == True)
-        
-        plantas_db = query.order_by(Planta.fecha_registro.desc()).all()
-        
-        # Convertir a formato de respuesta
-        plantas = []
-        for planta in plantas_db:
-            catalog_info = CatalogPlantInfo(
-                id_catalogo=planta.catalogo_info.id_catalogo,
-                nombre_comun=planta.catalogo_info.nombre_comun,
-                nombre_cientifico=planta.catalogo_info.nombre_cientifico,
-                descripcion=planta.catalogo_info.descripcion,
-                altura_maxima_cm=planta.catalogo_info.altura_maxima_cm,
-                cuidados_especiales=planta.catalogo_info.cuidados_especiales,
-                imagen_referencia=planta.catalogo_info.imagen_referencia  # ✅ AGREGADO
-            )
-            
-            plant_response = PlantResponse(
-                id_planta=planta.id_planta,
-                id_catalogo=planta.id_catalogo,
-                id_usuario=planta.id_usuario,
-                id_dispositivo=planta.id_dispositivo,
-                nombre_personalizado=planta.nombre_personalizado,
-                ubicacion=planta.ubicacion,
-                fecha_plantacion=planta.fecha_plantacion,
-                fecha_registro=planta.fecha_registro,
-                notas_usuario=planta.notas_usuario,
-                activa=planta.activa,
-                catalogo_info=catalog_info
-            )
-            plantas.append(plant_response)
-        
-        # Estadísticas
-        total_plantas = len(plantas)
-        plantas_activas = len([p for p in plantas if p.activa])
-        plantas_con_dispositivo = len([p for p in plantas if p.id_dispositivo])
-        
+        plantas_db, next_cursor = query.with_image(include_image).page(limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    plantas = [_plant_response(planta, include_image) for planta in plantas_db]
+    return plantas, next_cursor, query.summary()
+
+def list_plants_service(
+    db: Session,
+    user_id: Optional[int] = None,
+    device_id: Optional[int] = None,
+    catalog_id: Optional[int] = None,
+    activa: Optional[bool] = True,
+    ubicacion: Optional[str] = None,
+    sort: str = "fecha_registro",
+    descending: bool = True,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_image: bool = False
+):
+    """Listar plantas con filtros combinables, orden y paginación por cursor"""
+    try:
+        try:
+            query = PlantQuery(db).for_user(user_id).on_device(device_id).of_catalog(catalog_id) \
+                .active(activa).located(ubicacion).order_by(sort, descending)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        plantas, next_cursor, resumen = _plant_page(query, limit, cursor, include_image)
+        return PlantListResponse(
+            plantas=plantas,
+            limit=limit,
+            next_cursor=next_cursor,
+            **resumen
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al listar plantas: {str(e)}")
+
+def get_user_plants_service(
+    db: Session,
+    user_id: int,
+    active_only: bool = True,
+    include_image: bool = False,
+    limit: int = 50,
+    cursor: Optional[str] = None
+):
+    """Obtener las plantas de un usuario específico (paginadas)"""
+    try:
+        query = PlantQuery(db).for_user(user_id).active(True if active_only else None)
+        plantas, next_cursor, resumen = _plant_page(query, limit, cursor, include_image)
+
         return UserPlantsResponse(
             user_id=user_id,
             plantas=plantas,
-            total_plantas=total_plantas,
-            plantas_activas=plantas_activas,
-            plantas_con_dispositivo=plantas_con_dispositivo
+            limit=limit,
+            next_cursor=next_cursor,
+            **resumen
         )
-        
+
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener plantas del usuario: {str(e)}")
 
-def get_device_plants_service(db: Session, device_id: int, active_only: bool = True):
-    """Obtener plantas monitoreadas por un dispositivo específico"""
+def get_device_plants_service(
+    db: Session,
+    device_id: int,
+    active_only: bool = True,
+    include_image: bool = False,
+    limit: int = 50,
+    cursor: Optional[str] = None
+):
+    """Obtener plantas monitoreadas por un dispositivo específico (paginadas)"""
     try:
         # Obtener información del dispositivo
         device = db.query(Dispositivo).filter(Dispositivo.id_dispositivo == device_id).first()
         if not device:
             raise HTTPException(status_code=404, detail="Dispositivo no encontrado")
-        
-        query = db.query(Planta).options(
-            joinedload(Planta.catalogo_info)
-        ).filter(Planta.id_dispositivo == device_id)
-        
-        if active_only:
-            query = query.filter(Planta.activa == True)
-        
-        plantas_db = query.order_by(Planta.fecha_registro.desc()).all()
-        
-        # Convertir a formato de respuesta
-        plantas = []
-        for planta in plantas_db:
-            catalog_info = CatalogPlantInfo(
-                id_catalogo=planta.catalogo_info.id_catalogo,
-                nombre_comun=planta.catalogo_info.nombre_comun,
-                nombre_cientifico=planta.catalogo_info.nombre_cientifico,
-                descripcion=planta.catalogo_info.descripcion,
-                altura_maxima_cm=planta.catalogo_info.altura_maxima_cm,
-                cuidados_especiales=planta.catalogo_info.cuidados_especiales,
-                imagen_referencia=planta.catalogo_info.imagen_referencia  # ✅ AGREGADO
-            )
-            
-            plant_response = PlantResponse(
-                id_planta=planta.id_planta,
-                id_catalogo=planta.id_catalogo,
-                id_usuario=planta.id_usuario,
-                id_dispositivo=planta.id_dispositivo,
-                nombre_personalizado=planta.nombre_personalizado,
-                ubicacion=planta.ubicacion,
-                fecha_plantacion=planta.fecha_plantacion,
-                fecha_registro=planta.fecha_registro,
-                notas_usuario=planta.notas_usuario,
-                activa=planta.activa,
-                catalogo_info=catalog_info
-            )
-            plantas.append(plant_response)
-        
+
+        query = PlantQuery(db).on_device(device_id).active(True if active_only else None)
+        plantas, next_cursor, resumen = _plant_page(query, limit, cursor, include_image)
+
         return DevicePlantsResponse(
             device_id=device_id,
             mac_address=device.mac_address,
             nombre_dispositivo=device.nombre_dispositivo,
             plantas=plantas,
-            total_plantas=len(plantas)
+            total_plantas=resumen["total_plantas"],
+            limit=limit,
+            next_cursor=next_cursor
         )
-        
+
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener plantas del dispositivo: {str(e)}")
 
-def get_user_device_plants_service(db: Session, user_id: int, device_id: int, active_only: bool = True):
-    """Obtener plantas de un usuario específico monitoreadas por un dispositivo específico"""
+def get_user_device_plants_service(
+    db: Session,
+    user_id: int,
+    device_id: int,
+    active_only: bool = True,
+    include_image: bool = False,
+    limit: int = 50,
+    cursor: Optional[str] = None
+):
+    """Obtener plantas de un usuario específico monitoreadas por un dispositivo específico (paginadas)"""
     try:
-        query = db.query(Planta).options(
-            joinedload(Planta.catalogo_info)
-        ).filter(
-            and_(
-                Planta.id_usuario == user_id,
-                Planta.id_dispositivo == device_id
-            )
-        )
-        
-        if active_only:
-            query = query.filter(Planta.activa == True)
-        
-        plantas_db = query.order_by(Planta.fecha_registro.desc()).all()
-        
-        # Convertir a formato de respuesta
-        plantas = []
-        for planta in plantas_db:
-            catalog_info = CatalogPlantInfo(
-                id_catalogo=planta.catalogo_info.id_catalogo,
-                nombre_comun=planta.catalogo_info.nombre_comun,
-                nombre_cientifico=planta.catalogo_info.nombre_cientifico,
-                descripcion=planta.catalogo_info.descripcion,
-                altura_maxima_cm=planta.catalogo_info.altura_maxima_cm,
-                cuidados_especiales=planta.catalogo_info.cuidados_especiales,
-                imagen_referencia=planta.catalogo_info.imagen_referencia  # ✅ AGREGADO
-            )
-            
-            plant_response = PlantResponse(
-                id_planta=planta.id_planta,
-                id_catalogo=planta.id_catalogo,
-                id_usuario=planta.id_usuario,
-                id_dispositivo=planta.id_dispositivo,
-                nombre_personalizado=planta.nombre_personalizado,
-                ubicacion=planta.ubicacion,
-                fecha_plantacion=planta.fecha_plantacion,
-                fecha_registro=planta.fecha_registro,
-                notas_usuario=planta.notas_usuario,
-                activa=planta.activa,
-                catalogo_info=catalog_info
-            )
-            plantas.append(plant_response)
-        
+        query = PlantQuery(db).for_user(user_id).on_device(device_id).active(True if active_only else None)
+        plantas, next_cursor, resumen = _plant_page(query, limit, cursor, include_image)
+
         return UserDevicePlantsResponse(
             user_id=user_id,
             device_id=device_id,
             plantas=plantas,
-            total_plantas=len(plantas)
+            total_plantas=resumen["total_plantas"],
+            limit=limit,
+            next_cursor=next_cursor
         )
-        
+
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener plantas del usuario y dispositivo: {str(e)}")
 
+STATS_WINDOW_HOURS = 24
+
+def _plant_sensor_summary(db: Session, device_id):
+    """
+    Últimas lecturas y estadísticas de 24h de los sensores del dispositivo.
+
+    Siempre son tres consultas (sensores, máximo por grupo y agregados),
+    sin importar cuántos sensores tenga el dispositivo.
+    """
+    desde = datetime.utcnow() - timedelta(hours=STATS_WINDOW_HOURS)
+    if device_id is None:
+        return [], {"periodo_horas": STATS_WINDOW_HOURS, "desde": desde, "sensores": []}
+
+    sensores = db.query(SensorDatos).filter(
+        SensorDatos.id_dispositivo == device_id
+    ).order_by(SensorDatos.tipo_sensor, SensorDatos.id_sensor).all()
+    sensor_ids = [sensor.id_sensor for sensor in sensores]
+
+    latest = get_latest_readings_by_sensor(db, sensor_ids)
+    stats = get_reading_stats_by_sensor(db, sensor_ids, desde)
+
+    ultimas_lecturas = []
+    estadisticas = []
+    for sensor in sensores:
+        lectura = latest.get(sensor.id_sensor)
+        if lectura:
+            ultimas_lecturas.append({
+                "id_sensor": sensor.id_sensor,
+                "tipo_sensor": sensor.tipo_sensor,
+                "unidad_medida": sensor.unidad_medida,
+                "id_lectura": lectura.id_lectura,
+                "valor": lectura.valor,
+                "fecha_hora": lectura.fecha_hora
+            })
+        sensor_stats = stats.get(sensor.id_sensor, {
+            "total_lecturas": 0, "promedio": None, "minimo": None, "maximo": None
+        })
+        estadisticas.append({
+            "id_sensor": sensor.id_sensor,
+            "tipo_sensor": sensor.tipo_sensor,
+            "unidad_medida": sensor.unidad_medida,
+            **sensor_stats
+        })
+
+    return ultimas_lecturas, {
+        "periodo_horas": STATS_WINDOW_HOURS,
+        "desde": desde,
+        "sensores": estadisticas
+    }
+
 def get_plant_detail_service(db: Session, plant_id: int):
     """Obtener detalles completos de una planta específica"""
     try:
         planta = db.query(Planta).options(
             joinedload(Planta.catalogo_info),
             joinedload(Planta.dispositivo)
-        ).filter(Planta.id_planta == plant_id).first()
+        ).filter(Planta.id_planta == plant_id, Planta.pendiente_purga == False).first()
         
         if not planta:
             raise HTTPException(status_code=404, detail="Planta no encontrada")
@@ -198,7 +249,9 @@ def get_plant_detail_service(db: Session, plant_id: int):
             descripcion=planta.catalogo_info.descripcion,
             altura_maxima_cm=planta.catalogo_info.altura_maxima_cm,
             cuidados_especiales=planta.catalogo_info.cuidados_especiales,
-            imagen_referencia=planta.catalogo_info.imagen_referencia  # ✅ AGREGADO
+            imagen_referencia=planta.catalogo_info.imagen_referencia,  # ✅ AGREGADO
+            imagen_url=catalog_image_url(planta.catalogo_info),
+            imagen_miniatura_url=catalog_thumbnail_url(planta.catalogo_info)
         )
         
         # Calcular días desde plantación
@@ -217,6 +270,8 @@ def get_plant_detail_service(db: Session, plant_id: int):
                 "fecha_asignacion": planta.dispositivo.fecha_asignacion
             }
         
+        ultimas_lecturas, estadisticas_sensores = _plant_sensor_summary(db, planta.id_dispositivo)
+        
         return PlantDetailResponse(
             id_planta=planta.id_planta,
             id_catalogo=planta.id_catalogo,
@@ -231,8 +286,8 @@ def get_plant_detail_service(db: Session, plant_id: int):
             catalogo_info=catalog_info,
             dias_desde_plantacion=dias_desde_plantacion,
             dispositivo_info=dispositivo_info,
-            ultimas_lecturas=None,  # Se puede implementar después
-            estadisticas_sensores=None  # Se puede implementar después
+            ultimas_lecturas=ultimas_lecturas,
+            estadisticas_sensores=estadisticas_sensores
         )
         
     except HTTPException as e:
@@ -266,6 +321,7 @@ def create_plant_service(db, plant_request):
     # Crear la planta
     plant_data = plant_request.dict()
     new_plant = create_plant(db, plant_data)
+    device_plants.invalidate(new_plant.id_dispositivo)
 
     # Construir respuesta
     catalog_info = CatalogPlantInfo(
@@ -275,7 +331,9 @@ def create_plant_service(db, plant_request):
         descripcion=catalog.descripcion,
         altura_maxima_cm=catalog.altura_maxima_cm,
         cuidados_especiales=catalog.cuidados_especiales,
-        imagen_referencia=catalog.imagen_referencia  # ✅ AGREGADO
+        imagen_referencia=catalog.imagen_referencia,  # ✅ AGREGADO
+        imagen_url=catalog_image_url(catalog),
+        imagen_miniatura_url=catalog_thumbnail_url(catalog)
     )
 
     plant_response = PlantResponse(
@@ -297,7 +355,8 @@ def create_plant_service(db, plant_request):
         planta=plant_response
     )
 
-def delete_plant_permanent_service(db: Session, plant_id: int, user_id: int):
+def delete_plant_service(db: Session, plant_id: int, user_id: int):
+    """Baja lógica de una planta: se marca como inactiva y deja de contarse"""
     plant = db.query(Planta).filter(
         Planta.id_planta == plant_id,
         Planta.id_usuario == user_id
@@ -305,22 +364,105 @@ def delete_plant_permanent_service(db: Session, plant_id: int, user_id: int):
 
     if not plant:
         raise HTTPException(status_code=404, detail="Planta no encontrada o no pertenece al usuario")
+    if not plant.activa:
+        raise HTTPException(status_code=400, detail="La planta ya está eliminada")
 
     try:
-        # Borrar alertas asociadas
-        db.query(Alerta).filter(Alerta.id_planta == plant_id).delete()
-        # Borrar lecturas asociadas
-        db.query(LecturaDatos).filter(LecturaDatos.id_planta == plant_id).delete()
-
-        # Finalmente borrar la planta
-        db.delete(plant)
+        plant.activa = False
+        plant.fecha_baja = datetime.utcnow()
+        remove_active_plant(db, plant.id_catalogo, plant.id_usuario)
         db.commit()
+        device_plants.invalidate(plant.id_dispositivo)
+
+        return PlantDeleteResponse(
+            msg="Planta eliminada correctamente",
+            plant_id=plant_id,
+            deleted_permanently=False
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al eliminar la planta: {str(e)}")
+
+def restore_plant_service(db: Session, plant_id: int, user_id: int):
+    """
+    Reactivar una planta dada de baja.
+
+    Si sus lecturas se archivaron en frío, se devuelven a lectura_datos en
+    lotes y se borra el archivo. Repetir la llamada completa una
+    restauración interrumpida.
+    """
+    plant = db.query(Planta).filter(
+        Planta.id_planta == plant_id,
+        Planta.id_usuario == user_id,
+        Planta.pendiente_purga == False
+    ).first()
+
+    if not plant:
+        raise HTTPException(status_code=404, detail="Planta no encontrada o no pertenece al usuario")
+
+    archived = reading_archive.exists(plant_id) or db.get(ArchivoLecturasPlanta, plant_id) is not None
+    if plant.activa and not archived:
+        raise HTTPException(status_code=400, detail="La planta ya está activa")
+
+    try:
+        if not plant.activa:
+            plant.activa = True
+            plant.fecha_baja = None
+            add_active_plant(db, plant.id_catalogo, plant.id_usuario)
+            db.commit()
+            device_plants.invalidate(plant.id_dispositivo)
+
+        restored = restore_plant_readings(db, plant_id) if archived else 0
+        return PlantRestoreResponse(
+            msg="Planta reactivada correctamente",
+            plant_id=plant_id,
+            activa=True,
+            lecturas_restauradas=restored
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al reactivar la planta: {str(e)}")
+
+def delete_plant_permanent_service(db: Session, plant_id: int, user_id: int):
+    """
+    Solicitar el borrado permanente de una planta.
+
+    La planta se marca al momento (deja de listarse y de contar) y el worker
+    de purga borra sus alertas y lecturas en lotes. El progreso se consulta
+    en GET /plants/{plant_id}/purge.
+    """
+    from app.services.purge_service import plant_purger, purge_status, PURGE_PENDING
+
+    plant = db.query(Planta).filter(
+        Planta.id_planta == plant_id,
+        Planta.id_usuario == user_id
+    ).first()
 
-        return {
-            "msg": "Planta, alertas y lecturas asociadas eliminadas permanentemente",
-            "plant_id": plant_id,
-            "deleted_permanently": True
-        }
+    if not plant:
+        raise HTTPException(status_code=404, detail="Planta no encontrada o no pertenece al usuario")
+
+    try:
+        purga = db.get(PurgaPlanta, plant_id)
+        if not plant.pendiente_purga:
+            # Contadores desnormalizados: se descuentan ya, no al terminar la purga
+            remove_plant_counters(db, plant_id)
+            if plant.activa:
+                remove_active_plant(db, plant.id_catalogo, plant.id_usuario)
+            plant.activa = False
+            plant.pendiente_purga = True
+            if purga is None:
+                purga = PurgaPlanta(id_planta=plant_id, id_usuario=user_id, estado=PURGE_PENDING)
+                db.add(purga)
+            db.commit()
+            device_plants.invalidate(plant.id_dispositivo)
+            plant_purger.wake()
+
+        return PlantPurgeResponse(
+            msg="Planta marcada para eliminación permanente; sus alertas y lecturas se borran en segundo plano",
+            plant_id=plant_id,
+            deleted_permanently=True,
+            purga=purge_status(purga)
+        )
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error al eliminar la planta: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al eliminar la planta: {str(e)}")
@@ -0,0 +1,164 @@
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.domain.entities.plant import PlantPurgeStatus
+from app.domain.repositories.alert_repository import remove_plant_counters
+from app.infrastructure.archive.reading_archive import reading_archive
+from app.infrastructure.database.db import SessionLocal
+from app.infrastructure.database.models import Alerta, Planta, PurgaPlanta
+from app.infrastructure.database.partitions import partition_manager
+from app.infrastructure.workers import PeriodicWorker
+from app.services.archive_service import discard_plant_archive
+
+logger = logging.getLogger(__name__)
+
+PURGE_PENDING = "pendiente"
+PURGE_RUNNING = "en_curso"
+PURGE_DONE = "completada"
+
+
+def purge_status(purga: PurgaPlanta) -> PlantPurgeStatus:
+    return PlantPurgeStatus(
+        plant_id=purga.id_planta,
+        estado=purga.estado,
+        alertas_eliminadas=purga.alertas_eliminadas or 0,
+        lecturas_eliminadas=purga.lecturas_eliminadas or 0,
+        error=purga.error,
+        fecha_solicitud=purga.fecha_solicitud,
+        fecha_actualizacion=purga.fecha_actualizacion,
+        fecha_fin=purga.fecha_fin,
+        status_url=f"/api/v1/plants/{purga.id_planta}/purge?user_id={purga.id_usuario}"
+    )
+
+
+def _delete_chunk(db: Session, table, plant_id: int, chunk_size: int) -> int:
+    """Borrar hasta `chunk_size` filas de la planta por clave primaria"""
+    pk = table.primary_key.columns.values()[0]
+    ids = db.execute(
+        select(pk).where(table.c.id_planta == plant_id).order_by(pk).limit(chunk_size)
+    ).scalars().all()
+    if not ids:
+        return 0
+    return db.execute(table.delete().where(pk.in_(ids))).rowcount
+
+
+def purge_plant(
+    db: Session,
+    purga: PurgaPlanta,
+    chunk_size: int,
+    pause_seconds: float,
+    max_chunks: Optional[int] = None
+) -> int:
+    """
+    Borrar alertas y lecturas de la planta en lotes y, al final, la planta.
+
+    Cada lote se confirma por separado y actualiza el progreso, así que los
+    bloqueos duran lo que un lote y una interrupción solo deja filas por
+    borrar: la siguiente pasada continúa donde quedó. Devuelve los lotes
+    ejecutados; si se alcanza `max_chunks` la purga sigue en curso.
+    """
+    chunks = 0
+    purga.estado = PURGE_RUNNING
+    db.commit()
+
+    steps = [(Alerta.__table__, "alertas_eliminadas")] + [
+        (table, "lecturas_eliminadas") for table in partition_manager.reading_tables()
+    ]
+    for table, counter in steps:
+        while True:
+            if max_chunks is not None and chunks >= max_chunks:
+                return chunks
+            deleted = _delete_chunk(db, table, purga.id_planta, chunk_size)
+            setattr(purga, counter, (getattr(purga, counter) or 0) + deleted)
+            purga.fecha_actualizacion = datetime.utcnow()
+            db.commit()
+            chunks += 1
+            if deleted < chunk_size:
+                break
+            # Pausa entre lotes para no acaparar bloqueos ni E/S
+            time.sleep(pause_seconds)
+
+    # Sin hijos ya: borrar la fila sin que el ORM cargue las relaciones en cascada
+    discard_plant_archive(db, purga.id_planta)
+    # La reconciliación pudo recrear el contador durante la purga: su FK impediría el DELETE
+    remove_plant_counters(db, purga.id_planta)
+    db.execute(Planta.__table__.delete().where(Planta.id_planta == purga.id_planta))
+    purga.estado = PURGE_DONE
+    purga.error = None
+    purga.fecha_fin = purga.fecha_actualizacion = datetime.utcnow()
+    db.commit()
+    # Lecturas archivadas en frío de la planta, si las había
+    reading_archive.remove(purga.id_planta)
+    return chunks
+
+
+def run_purge_batch(
+    db: Session,
+    chunk_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+    max_chunks: Optional[int] = None
+) -> dict:
+    """Procesar las purgas pendientes (también las interrumpidas) por orden de solicitud"""
+    chunk_size = chunk_size or settings.PURGE_CHUNK_SIZE
+    if pause_seconds is None:
+        pause_seconds = settings.PURGE_PAUSE_SECONDS
+
+    report = {"plantas_purgadas": 0, "lotes": 0, "errores": [], "completado": True}
+    pending = db.query(PurgaPlanta).filter(
+        PurgaPlanta.estado.in_([PURGE_PENDING, PURGE_RUNNING])
+    ).order_by(PurgaPlanta.fecha_solicitud).all()
+
+    for purga in pending:
+        remaining = None if max_chunks is None else max_chunks - report["lotes"]
+        if remaining is not None and remaining <= 0:
+            report["completado"] = False
+            break
+        try:
+            report["lotes"] += purge_plant(db, purga, chunk_size, pause_seconds, remaining)
+        except Exception as e:
+            # Se reintenta en la siguiente pasada; el error queda en el estado
+            db.rollback()
+            purga.error = str(e)
+            purga.fecha_actualizacion = datetime.utcnow()
+            db.commit()
+            report["errores"].append({"id_planta": purga.id_planta, "error": str(e)})
+            continue
+        if purga.estado == PURGE_DONE:
+            report["plantas_purgadas"] += 1
+        else:
+            report["completado"] = False
+    return report
+
+
+def get_purge_status_service(db: Session, plant_id: int, user_id: int):
+    """Progreso del borrado permanente de una planta"""
+    purga = db.query(PurgaPlanta).filter(
+        PurgaPlanta.id_planta == plant_id,
+        PurgaPlanta.id_usuario == user_id
+    ).first()
+    if not purga:
+        raise HTTPException(status_code=404, detail="No hay borrado permanente solicitado para esta planta")
+    return purge_status(purga)
+
+
+def _purge_job():
+    db = SessionLocal()
+    try:
+        report = run_purge_batch(db, max_chunks=settings.PURGE_MAX_CHUNKS_PER_RUN)
+        if report["lotes"]:
+            logger.info("Purga de plantas: %s", report)
+    finally:
+        db.close()
+    if not report["completado"]:
+        # Quedan lotes: seguir sin esperar al siguiente intervalo
+        plant_purger.wake()
+
+
+plant_purger = PeriodicWorker(
+    "plant-purger", settings.PURGE_INTERVAL_SECONDS, _purge_job, final_run=False
+)
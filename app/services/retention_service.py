@@ -0,0 +1,132 @@
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.infrastructure.database.models import LecturaAgregadaHora
+from app.infrastructure.database.partitions import partition_manager
+
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _merge_hourly(db: Session, rows):
+    """Acumular un lote de lecturas en sus agregados por hora"""
+    buckets = {}
+    for _, id_sensor, valor, fecha_hora in rows:
+        key = (id_sensor, _hour(fecha_hora))
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [1, valor, valor, valor]
+        else:
+            bucket[0] += 1
+            bucket[1] += valor
+            bucket[2] = min(bucket[2], valor)
+            bucket[3] = max(bucket[3], valor)
+
+    existing = {
+        (agg.id_sensor, agg.hora): agg
+        for agg in db.query(LecturaAgregadaHora).filter(
+            tuple_(LecturaAgregadaHora.id_sensor, LecturaAgregadaHora.hora).in_(list(buckets))
+        )
+    }
+
+    created = 0
+    for (id_sensor, hora), (total, suma, minimo, maximo) in buckets.items():
+        agg = existing.get((id_sensor, hora))
+        if agg is None:
+            db.add(LecturaAgregadaHora(
+                id_sensor=id_sensor,
+                hora=hora,
+                total_lecturas=total,
+                suma=suma,
+                promedio=suma / total,
+                minimo=minimo,
+                maximo=maximo
+            ))
+            created += 1
+        else:
+            agg.total_lecturas += total
+            agg.suma += suma
+            agg.promedio = agg.suma / agg.total_lecturas
+            agg.minimo = min(agg.minimo, minimo)
+            agg.maximo = max(agg.maximo, maximo)
+
+    return created, len(buckets) - created
+
+
+def run_retention_job(
+    db: Session,
+    retention_days: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+    max_chunks: Optional[int] = None
+):
+    """
+    Compactar a agregados por hora las lecturas crudas más antiguas que el
+    periodo de retención y borrarlas en lotes pequeños por clave primaria.
+
+    Cada lote se resume y se borra en la misma transacción, por lo que una
+    interrupción no pierde ni duplica datos. Los lotes salen en orden de
+    (fecha_hora, id_lectura) por ix_lectura_fecha: como lo procesado se borra,
+    cada pasada empieza por la lectura vencida más antigua, aunque su id sea
+    bajo (cargas retroactivas, relojes desfasados, lecturas restauradas del
+    archivo), y no recorre las lecturas recientes.
+    """
+    if retention_days is None:
+        retention_days = settings.RETENTION_DAYS
+    chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+    if pause_seconds is None:
+        pause_seconds = settings.RETENTION_PAUSE_SECONDS
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    report = {
+        "fecha_corte": cutoff.isoformat(),
+        "lecturas_compactadas": 0,
+        "lecturas_eliminadas": 0,
+        "agregados_creados": 0,
+        "agregados_actualizados": 0,
+        "lotes": 0,
+        "completado": True
+    }
+
+    for table in partition_manager.reading_tables(date_to=cutoff):
+        while True:
+            if max_chunks is not None and report["lotes"] >= max_chunks:
+                report["completado"] = False
+                return report
+
+            rows = db.execute(
+                select(table.c.id_lectura, table.c.id_sensor, table.c.valor, table.c.fecha_hora)
+                .where(table.c.fecha_hora < cutoff)
+                .order_by(table.c.fecha_hora, table.c.id_lectura)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            try:
+                created, updated = _merge_hourly(db, rows)
+                ids = [row[0] for row in rows]
+                deleted = db.execute(
+                    table.delete().where(table.c.id_lectura.in_(ids))
+                ).rowcount
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            report["lecturas_compactadas"] += len(rows)
+            report["lecturas_eliminadas"] += deleted
+            report["agregados_creados"] += created
+            report["agregados_actualizados"] += updated
+            report["lotes"] += 1
+
+            if len(rows) < chunk_size:
+                break
+            # Pausa entre lotes para no acaparar bloqueos ni E/S
+            time.sleep(pause_seconds)
+
+    return report
@@ -0,0 +1,135 @@
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy.orm import Session
+from app.domain.entities.sensor import sensor_kind
+from app.domain.repositories.rule_repository import get_active_rules
+from app.infrastructure.alerts.alert_writer import alert_writer
+from app.services.plant_cache import DevicePlant, device_plants
+
+logger = logging.getLogger(__name__)
+
+# Segundos tras los que se recompilan las reglas aunque no se hayan invalidado
+RULES_TTL = 60
+
+
+class CompiledRule:
+    """Regla precalculada: límites de violación y de recuperación (con histéresis)"""
+    __slots__ = ("id_regla", "tipo_sensor", "minimo", "maximo", "clear_low", "clear_high", "nivel")
+
+    def __init__(self, rule):
+        histeresis = rule.histeresis or 0
+        self.id_regla = rule.id_regla
+        self.tipo_sensor = rule.tipo_sensor
+        self.minimo = -math.inf if rule.valor_minimo is None else rule.valor_minimo
+        self.maximo = math.inf if rule.valor_maximo is None else rule.valor_maximo
+        self.clear_low = self.minimo + histeresis
+        self.clear_high = self.maximo - histeresis
+        self.nivel = rule.nivel or "advertencia"
+
+    def describe(self, unidad: str) -> str:
+        if self.minimo == -math.inf:
+            return f"máximo {self.maximo} {unidad}"
+        if self.maximo == math.inf:
+            return f"mínimo {self.minimo} {unidad}"
+        return f"{self.minimo} a {self.maximo} {unidad}"
+
+
+class RuleEngine:
+    """
+    Motor de reglas de cuidado por especie.
+
+    Las reglas activas se compilan en un índice (tipo de sensor, id_catalogo)
+    y, por planta, en un índice (tipo de sensor, id_planta) que se memoriza al
+    primer uso: cada lectura evalúa solo las reglas que le aplican.
+
+    Cada par (regla, planta) tiene un estado de violación. Se emite una alerta
+    al entrar en violación y no se vuelve a emitir hasta que el valor regresa
+    dentro del rango reducido por la histéresis.
+    """
+
+    def __init__(self, ttl: float = RULES_TTL):
+        self.ttl = ttl
+        self._by_catalog: Dict[Tuple[str, int], Tuple[CompiledRule, ...]] = {}
+        self._by_plant: Dict[Tuple[str, int], Tuple[CompiledRule, ...]] = {}
+        self._violations = set()
+        self._compiled_at = None
+        self._lock = threading.Lock()
+        self.evaluations = 0
+
+    def compile(self, rules: Iterable):
+        """Reconstruir los índices a partir de las reglas activas"""
+        by_catalog = defaultdict(list)
+        for rule in rules:
+            by_catalog[(rule.tipo_sensor, rule.id_catalogo)].append(CompiledRule(rule))
+        with self._lock:
+            self._by_catalog = {key: tuple(value) for key, value in by_catalog.items()}
+            self._by_plant = {}
+            active = {rule.id_regla for rules in self._by_catalog.values() for rule in rules}
+            self._violations = {key for key in self._violations if key[0] in active}
+            self._compiled_at = time.monotonic()
+
+    def invalidate(self):
+        """Forzar la recompilación en la siguiente lectura"""
+        self._compiled_at = None
+
+    def needs_compile(self) -> bool:
+        return self._compiled_at is None or time.monotonic() - self._compiled_at > self.ttl
+
+    def rules_for(self, kind: str, plant: DevicePlant) -> Tuple[CompiledRule, ...]:
+        key = (kind, plant.id_planta)
+        rules = self._by_plant.get(key)
+        if rules is None:
+            rules = self._by_plant[key] = self._by_catalog.get((kind, plant.id_catalogo), ())
+        return rules
+
+    def evaluate(self, kind: str, plants: Iterable[DevicePlant], valor: float) -> List[Tuple[int, CompiledRule]]:
+        """Evaluar una lectura y devolver las (id_planta, regla) que entran en violación"""
+        triggered = []
+        with self._lock:
+            self._evaluate(kind, plants, valor, triggered)
+        return triggered
+
+    def _evaluate(self, kind, plants, valor, triggered):
+        for plant in plants:
+            for rule in self.rules_for(kind, plant):
+                self.evaluations += 1
+                key = (rule.id_regla, plant.id_planta)
+                if valor < rule.minimo or valor > rule.maximo:
+                    if key not in self._violations:
+                        self._violations.add(key)
+                        triggered.append((plant.id_planta, rule))
+                elif key in self._violations and rule.clear_low <= valor <= rule.clear_high:
+                    self._violations.discard(key)
+
+
+rule_engine = RuleEngine()
+
+
+def process_reading_rules(db: Session, sensor, lectura) -> int:
+    """Evaluar las reglas de cuidado de una lectura recién guardada y encolar sus alertas"""
+    if sensor.id_dispositivo is None:
+        return 0
+    try:
+        if rule_engine.needs_compile():
+            rule_engine.compile(get_active_rules(db))
+
+        kind = sensor_kind(sensor.tipo_sensor, sensor.unidad_medida)
+        plants = device_plants.get(db, sensor.id_dispositivo)
+        triggered = rule_engine.evaluate(kind, plants, lectura.valor)
+        for id_planta, rule in triggered:
+            alert_writer.add(
+                id_planta,
+                "regla_cuidado",
+                rule.nivel,
+                f"{rule.tipo_sensor} fuera del rango de cuidado "
+                f"({rule.describe(sensor.unidad_medida)}): {lectura.valor} {sensor.unidad_medida}"
+            )
+        return len(triggered)
+    except Exception:
+        # La evaluación de reglas nunca debe hacer fallar la ingesta
+        logger.exception("Error al evaluar reglas de la lectura %s", lectura.id_lectura)
+        return 0
@@ -0,0 +1,69 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.domain.repositories.catalog_repository import get_catalog_plant_by_id
+from app.domain.repositories.rule_repository import get_catalog_rules, create_rule, deactivate_rule
+from app.domain.entities.rule import CareRuleCreate, CareRuleResponse, CareRuleListResponse
+from app.services.rule_engine import rule_engine
+
+def _rule_response(rule):
+    return CareRuleResponse(
+        id_regla=rule.id_regla,
+        id_catalogo=rule.id_catalogo,
+        tipo_sensor=rule.tipo_sensor,
+        valor_minimo=rule.valor_minimo,
+        valor_maximo=rule.valor_maximo,
+        histeresis=rule.histeresis,
+        nivel=rule.nivel,
+        activa=rule.activa,
+        fecha_creacion=rule.fecha_creacion
+    )
+
+def get_catalog_rules_service(db: Session, catalog_id: int):
+    """Obtener las reglas de cuidado de una planta del catálogo"""
+    try:
+        if not get_catalog_plant_by_id(db, catalog_id):
+            raise HTTPException(status_code=404, detail="Planta no encontrada en el catálogo")
+
+        reglas = [_rule_response(rule) for rule in get_catalog_rules(db, catalog_id)]
+        return CareRuleListResponse(id_catalogo=catalog_id, reglas=reglas, total=len(reglas))
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener reglas de cuidado: {str(e)}")
+
+def create_catalog_rule_service(db: Session, catalog_id: int, rule_request: CareRuleCreate):
+    """Crear una regla de cuidado y recompilar el motor de reglas"""
+    try:
+        if not get_catalog_plant_by_id(db, catalog_id):
+            raise HTTPException(status_code=404, detail="Planta no encontrada en el catálogo")
+
+        rule_data = rule_request.dict()
+        rule_data["id_catalogo"] = catalog_id
+        new_rule = create_rule(db, rule_data)
+        rule_engine.invalidate()
+
+        return _rule_response(new_rule)
+
+    except HTTPException as e:
+        db.rollback()
+        raise e
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al crear regla de cuidado: {str(e)}")
+
+def delete_catalog_rule_service(db: Session, catalog_id: int, rule_id: int):
+    """Desactivar una regla de cuidado y recompilar el motor de reglas"""
+    try:
+        rule = deactivate_rule(db, catalog_id, rule_id)
+        if not rule:
+            raise HTTPException(status_code=404, detail="Regla de cuidado no encontrada")
+        rule_engine.invalidate()
+
+        return {"msg": "Regla de cuidado desactivada", "id_regla": rule_id}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al eliminar regla de cuidado: {str(e)}")
@@ -0,0 +1,252 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.database.models import SensorDatos, LecturaDatos, Dispositivo
+from app.infrastructure.database.partitions import reading_source
+from app.domain.repositories.reading_repository import get_latest_readings_by_sensor_async
+from app.services.anomaly_service import process_reading_anomalies
+from app.services.rule_engine import process_reading_rules
+from app.services.plant_cache import device_plants, reading_plant_id
+from app.infrastructure.metrics import readings_ingested_total
+from app.domain.entities.sensor import (
+    ReadingListResponse, ReadingResponse, ReadingCreateRequest,
+    ReadingCreateResponse, DeviceReadingsResponse, LatestReadingsResponse
+)
+
+# Equivalentes con AsyncSession de los servicios más usados de sensor_service,
+# con las mismas respuestas (ver sensor_async_routes y ASYNC_DB_ENABLED)
+
+async def _count(db: AsyncSession, query) -> int:
+    return (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
+
+async def _device_exists(db: AsyncSession, device_id: int) -> bool:
+    return (await db.execute(
+        select(Dispositivo.id_dispositivo).where(Dispositivo.id_dispositivo == device_id)
+    )).first() is not None
+
+def _date_range(date_from: Optional[datetime], date_to: Optional[datetime]):
+    if not (date_from or date_to):
+        return None
+    return {
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None
+    }
+
+async def get_sensor_readings_async(
+    db: AsyncSession,
+    sensor_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+):
+    """Obtener lecturas de un sensor específico con filtros de fecha"""
+    try:
+        sensor = await db.get(SensorDatos, sensor_id)
+        if not sensor:
+            raise HTTPException(status_code=404, detail="Sensor no encontrado")
+
+        # Solo se consultan las particiones que se solapan con el rango
+        Lectura = reading_source(date_from, date_to)
+        query = select(Lectura).where(Lectura.id_sensor == sensor_id)
+        if date_from:
+            query = query.where(Lectura.fecha_hora >= date_from)
+        if date_to:
+            query = query.where(Lectura.fecha_hora <= date_to)
+
+        total = await _count(db, query)
+        lecturas = (await db.execute(
+            query.order_by(desc(Lectura.fecha_hora)).offset(skip).limit(limit)
+        )).scalars().all()
+
+        return ReadingListResponse(
+            lecturas=[
+                ReadingResponse(
+                    id_lectura=lectura.id_lectura,
+                    valor=lectura.valor,
+                    fecha_hora=lectura.fecha_hora,
+                    id_sensor=lectura.id_sensor,
+                    tipo_sensor=sensor.tipo_sensor,
+                    unidad_medida=sensor.unidad_medida
+                )
+                for lectura in lecturas
+            ],
+            sensor_id=sensor_id,
+            total=total,
+            skip=skip,
+            limit=limit,
+            date_range=_date_range(date_from, date_to)
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener lecturas: {str(e)}")
+
+async def get_device_readings_async(
+    db: AsyncSession,
+    device_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sensor_type: Optional[str] = None
+):
+    """Obtener todas las lecturas de todos los sensores de un dispositivo"""
+    try:
+        if not await _device_exists(db, device_id):
+            raise HTTPException(status_code=404, detail="Dispositivo no encontrado")
+
+        sensor_query = select(SensorDatos).where(SensorDatos.id_dispositivo == device_id)
+        if sensor_type:
+            sensor_query = sensor_query.where(SensorDatos.tipo_sensor == sensor_type)
+        # Los sensores se cargan una vez y se cruzan en memoria con las lecturas
+        sensores = {sensor.id_sensor: sensor for sensor in (await db.execute(sensor_query)).scalars().all()}
+
+        if not sensores:
+            return DeviceReadingsResponse(
+                lecturas=[],
+                dispositivo_id=device_id,
+                total=0,
+                skip=skip,
+                limit=limit,
+                sensores_incluidos=[],
+                date_range=None
+            )
+
+        Lectura = reading_source(date_from, date_to)
+        query = select(Lectura).where(Lectura.id_sensor.in_(list(sensores)))
+        if date_from:
+            query = query.where(Lectura.fecha_hora >= date_from)
+        if date_to:
+            query = query.where(Lectura.fecha_hora <= date_to)
+
+        total = await _count(db, query)
+        lecturas = (await db.execute(
+            query.order_by(desc(Lectura.fecha_hora)).offset(skip).limit(limit)
+        )).scalars().all()
+
+        reading_responses = []
+        sensores_incluidos = set()
+        for lectura in lecturas:
+            sensor = sensores[lectura.id_sensor]
+            reading_responses.append(ReadingResponse(
+                id_lectura=lectura.id_lectura,
+                valor=lectura.valor,
+                fecha_hora=lectura.fecha_hora,
+                id_sensor=lectura.id_sensor,
+                tipo_sensor=sensor.tipo_sensor,
+                unidad_medida=sensor.unidad_medida
+            ))
+            sensores_incluidos.add(sensor.tipo_sensor)
+
+        return DeviceReadingsResponse(
+            lecturas=reading_responses,
+            dispositivo_id=device_id,
+            total=total,
+            skip=skip,
+            limit=limit,
+            sensores_incluidos=list(sensores_incluidos),
+            date_range=_date_range(date_from, date_to)
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener lecturas del dispositivo: {str(e)}")
+
+async def get_latest_readings_async(db: AsyncSession, device_id: int):
+    """Obtener las últimas lecturas de cada sensor del dispositivo"""
+    try:
+        if not await _device_exists(db, device_id):
+            raise HTTPException(status_code=404, detail="Dispositivo no encontrado")
+
+        sensores = (await db.execute(
+            select(SensorDatos).where(SensorDatos.id_dispositivo == device_id)
+        )).scalars().all()
+
+        lecturas_por_sensor = []
+        ultima_actualizacion = None
+        latest = await get_latest_readings_by_sensor_async(db, [sensor.id_sensor for sensor in sensores])
+
+        for sensor in sensores:
+            ultima_lectura = latest.get(sensor.id_sensor)
+            if ultima_lectura:
+                if not ultima_actualizacion or ultima_lectura.fecha_hora > ultima_actualizacion:
+                    ultima_actualizacion = ultima_lectura.fecha_hora
+
+                lecturas_por_sensor.append({
+                    "sensor_info": {
+                        "id_sensor": sensor.id_sensor,
+                        "tipo_sensor": sensor.tipo_sensor,
+                        "unidad_medida": sensor.unidad_medida,
+                        "descripcion": sensor.descripcion
+                    },
+                    "ultima_lectura": {
+                        "id_lectura": ultima_lectura.id_lectura,
+                        "valor": ultima_lectura.valor,
+                        "fecha_hora": ultima_lectura.fecha_hora
+                    }
+                })
+
+        return LatestReadingsResponse(
+            dispositivo_id=device_id,
+            ultima_actualizacion=ultima_actualizacion or datetime.utcnow(),
+            lecturas_por_sensor=lecturas_por_sensor
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener últimas lecturas: {str(e)}")
+
+def _process_reading(db, sensor, lectura):
+    # Detección de anomalías y reglas de cuidado; sus consultas (solo en fallos
+    # de caché) usan la conexión asíncrona a través de run_sync
+    process_reading_anomalies(db, sensor, lectura)
+    process_reading_rules(db, sensor, lectura)
+
+async def create_reading_async(db: AsyncSession, reading: ReadingCreateRequest, device_id: Optional[int] = None):
+    """Crear una nueva lectura de sensor (`device_id`: dispositivo autenticado, si lo hay)"""
+    try:
+        sensor = await db.get(SensorDatos, reading.id_sensor)
+        if not sensor:
+            raise HTTPException(status_code=404, detail="Sensor no encontrado")
+        if device_id is not None and sensor.id_dispositivo != device_id:
+            raise HTTPException(status_code=403, detail="El sensor no pertenece al dispositivo autenticado")
+
+        # Asociada a la planta del dispositivo si solo tiene una (caché; consulta solo en fallos)
+        plants = await db.run_sync(device_plants.get, sensor.id_dispositivo)
+        nueva_lectura = LecturaDatos(
+            valor=reading.valor,
+            id_sensor=reading.id_sensor,
+            id_planta=reading_plant_id(plants),
+            fecha_hora=datetime.utcnow()
+        )
+        db.add(nueva_lectura)
+        # Sin refresh: el id lo asigna el INSERT y el resto de campos ya está en memoria
+        await db.commit()
+        readings_ingested_total.labels(sensor.tipo_sensor).inc()
+
+        await db.run_sync(_process_reading, sensor, nueva_lectura)
+
+        return ReadingCreateResponse(
+            msg="Lectura creada exitosamente",
+            lectura=ReadingResponse(
+                id_lectura=nueva_lectura.id_lectura,
+                valor=nueva_lectura.valor,
+                fecha_hora=nueva_lectura.fecha_hora,
+                id_sensor=nueva_lectura.id_sensor,
+                tipo_sensor=sensor.tipo_sensor,
+                unidad_medida=sensor.unidad_medida
+            )
+        )
+
+    except HTTPException as e:
+        await db.rollback()
+        raise e
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al crear lectura: {str(e)}")
@@ -6,6 +6,12 @@ from typing import Optional
 from app.infrastructure.database.models import (
     SensorDatos, LecturaDatos, Dispositivo
 )
+from app.infrastructure.database.partitions import reading_source
+from app.domain.repositories.reading_repository import get_latest_readings_by_sensor
+from app.services.anomaly_service import process_reading_anomalies
+from app.services.rule_engine import process_reading_rules
+from app.services.plant_cache import device_plants, reading_plant_id
+from app.infrastructure.metrics import readings_ingested_total
 from app.domain.entities.sensor import (
     SensorListResponse, SensorDetailResponse, SensorResponse,
     ReadingListResponse, ReadingResponse, ReadingCreateRequest,
@@ -54,13 +60,14 @@ def get_sensor_detail_service(db: Session, sensor_id: int):
             raise HTTPException(status_code=404, detail="Sensor no encontrado")
         
         # Obtener estadísticas del sensor
-        total_lecturas = db.query(LecturaDatos).filter(
-            LecturaDatos.id_sensor == sensor_id
+        Lectura = reading_source()
+        total_lecturas = db.query(Lectura).filter(
+            Lectura.id_sensor == sensor_id
         ).count()
         
-        ultima_lectura_query = db.query(LecturaDatos).filter(
-            LecturaDatos.id_sensor == sensor_id
-        ).order_by(desc(LecturaDatos.fecha_hora)).first()
+        ultima_lectura_query = db.query(Lectura).filter(
+            Lectura.id_sensor == sensor_id
+        ).order_by(desc(Lectura.fecha_hora)).first()
         
         ultima_lectura = None
         if ultima_lectura_query:
@@ -68,10 +75,11 @@ def get_sensor_detail_service(db: Session, sensor_id: int):
         
         # Promedio últimas 24 horas
         hace_24h = datetime.utcnow() - timedelta(hours=24)
-        promedio_24h = db.query(func.avg(LecturaDatos.valor)).filter(
+        Lectura = reading_source(date_from=hace_24h)
+        promedio_24h = db.query(func.avg(Lectura.valor)).filter(
             and_(
-                LecturaDatos.id_sensor == sensor_id,
-                LecturaDatos.fecha_hora >= hace_24h
+                Lectura.id_sensor == sensor_id,
+                Lectura.fecha_hora >= hace_24h
             )
         ).scalar()
         
@@ -120,19 +128,21 @@ def get_sensor_readings_service(
         if not sensor:
             raise HTTPException(status_code=404, detail="Sensor no encontrado")
         
-        query = db.query(LecturaDatos).filter(LecturaDatos.id_sensor == sensor_id)
+        # Solo se consultan las particiones que se solapan con el rango
+        Lectura = reading_source(date_from, date_to)
+        query = db.query(Lectura).filter(Lectura.id_sensor == sensor_id)
         
         # Aplicar filtros de fecha
         if date_from:
-            query = query.filter(LecturaDatos.fecha_hora >= date_from)
+            query = query.filter(Lectura.fecha_hora >= date_from)
         if date_to:
-            query = query.filter(LecturaDatos.fecha_hora <= date_to)
+            query = query.filter(Lectura.fecha_hora <= date_to)
         
         # Contar total
         total = query.count()
         
         # Aplicar paginación y ordenar
-        lecturas = query.order_by(desc(LecturaDatos.fecha_hora)).offset(skip).limit(limit).all()
+        lecturas = query.order_by(desc(Lectura.fecha_hora)).offset(skip).limit(limit).all()
         
         # Convertir a formato de respuesta
         reading_responses = []
@@ -183,17 +193,17 @@ def get_device_readings_service(
         if not device:
             raise HTTPException(status_code=404, detail="Dispositivo no encontrado")
         
-        # Subconsulta para obtener sensores del dispositivo
-        sensor_subquery = db.query(SensorDatos.id_sensor).filter(
+        # Sensores del dispositivo: se cargan una vez y se cruzan en memoria con las lecturas
+        sensor_query = db.query(SensorDatos).filter(
             SensorDatos.id_dispositivo == device_id
         )
         
         if sensor_type:
-            sensor_subquery = sensor_subquery.filter(SensorDatos.tipo_sensor == sensor_type)
+            sensor_query = sensor_query.filter(SensorDatos.tipo_sensor == sensor_type)
         
-        sensor_ids = [s[0] for s in sensor_subquery.all()]
+        sensores = {sensor.id_sensor: sensor for sensor in sensor_query.all()}
         
-        if not sensor_ids:
+        if not sensores:
             return DeviceReadingsResponse(
                 lecturas=[],
                 dispositivo_id=device_id,
@@ -204,42 +214,39 @@ def get_device_readings_service(
                 date_range=None
             )
         
-        # Query principal para lecturas
-        query = db.query(LecturaDatos).join(SensorDatos).filter(
-            LecturaDatos.id_sensor.in_(sensor_ids)
+        # Query principal para lecturas (solo particiones dentro del rango)
+        Lectura = reading_source(date_from, date_to)
+        query = db.query(Lectura).filter(
+            Lectura.id_sensor.in_(list(sensores))
         )
         
         # Aplicar filtros de fecha
         if date_from:
-            query = query.filter(LecturaDatos.fecha_hora >= date_from)
+            query = query.filter(Lectura.fecha_hora >= date_from)
         if date_to:
-            query = query.filter(LecturaDatos.fecha_hora <= date_to)
+            query = query.filter(Lectura.fecha_hora <= date_to)
         
         # Contar total
         total = query.count()
         
         # Obtener lecturas con información del sensor
-        lecturas = query.order_by(desc(LecturaDatos.fecha_hora)).offset(skip).limit(limit).all()
+        lecturas = query.order_by(desc(Lectura.fecha_hora)).offset(skip).limit(limit).all()
         
         # Convertir a formato de respuesta
         reading_responses = []
         sensores_incluidos = set()
         
         for lectura in lecturas:
-            sensor = db.query(SensorDatos).filter(
-                SensorDatos.id_sensor == lectura.id_sensor
-            ).first()
-            
-            if sensor:
-                reading_responses.append(ReadingResponse(
-                    id_lectura=lectura.id_lectura,
-                    valor=lectura.valor,
-                    fecha_hora=lectura.fecha_hora,
-                    id_sensor=lectura.id_sensor,
-                    tipo_sensor=sensor.tipo_sensor,
-                    unidad_medida=sensor.unidad_medida
-                ))
-                sensores_incluidos.add(sensor.tipo_sensor)
+            sensor = sensores[lectura.id_sensor]
+            reading_responses.append(ReadingResponse(
+                id_lectura=lectura.id_lectura,
+                valor=lectura.valor,
+                fecha_hora=lectura.fecha_hora,
+                id_sensor=lectura.id_sensor,
+                tipo_sensor=sensor.tipo_sensor,
+                unidad_medida=sensor.unidad_medida
+            ))
+            sensores_incluidos.add(sensor.tipo_sensor)
         
         date_range = None
         if date_from or date_to:
@@ -278,12 +285,11 @@ def get_latest_readings_service(db: Session, device_id: int):
         
         lecturas_por_sensor = []
         ultima_actualizacion = None
+        # Última lectura de todos los sensores en una sola consulta
+        latest = get_latest_readings_by_sensor(db, [sensor.id_sensor for sensor in sensores])
         
         for sensor in sensores:
-            # Obtener la última lectura de cada sensor
-            ultima_lectura = db.query(LecturaDatos).filter(
-                LecturaDatos.id_sensor == sensor.id_sensor
-            ).order_by(desc(LecturaDatos.fecha_hora)).first()
+            ultima_lectura = latest.get(sensor.id_sensor)
             
             if ultima_lectura:
                 if not ultima_actualizacion or ultima_lectura.fecha_hora > ultima_actualizacion:
@@ -317,8 +323,8 @@ def get_latest_readings_service(db: Session, device_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener últimas lecturas: {str(e)}")
 
-def create_reading_service(db: Session, reading: ReadingCreateRequest):
-    """Crear una nueva lectura de sensor"""
+def create_reading_service(db: Session, reading: ReadingCreateRequest, device_id: Optional[int] = None):
+    """Crear una nueva lectura de sensor (`device_id`: dispositivo autenticado, si lo hay)"""
     try:
         # Verificar que el sensor existe
         sensor = db.query(SensorDatos).filter(
@@ -327,17 +333,25 @@ def create_reading_service(db: Session, reading: ReadingCreateRequest):
         
         if not sensor:
             raise HTTPException(status_code=404, detail="Sensor no encontrado")
+        if device_id is not None and sensor.id_dispositivo != device_id:
+            raise HTTPException(status_code=403, detail="El sensor no pertenece al dispositivo autenticado")
         
-        # Crear la lectura
+        # Crear la lectura (asociada a la planta del dispositivo si solo tiene una)
         nueva_lectura = LecturaDatos(
             valor=reading.valor,
             id_sensor=reading.id_sensor,
+            id_planta=reading_plant_id(device_plants.get(db, sensor.id_dispositivo)),
             fecha_hora=datetime.utcnow()
         )
         
         db.add(nueva_lectura)
         db.commit()
         db.refresh(nueva_lectura)
+        readings_ingested_total.labels(sensor.tipo_sensor).inc()
+        
+        # Detección de anomalías y reglas de cuidado en memoria; las alertas se escriben en lote
+        process_reading_anomalies(db, sensor, nueva_lectura)
+        process_reading_rules(db, sensor, nueva_lectura)
         
         # Crear respuesta
         reading_response = ReadingResponse(
@@ -398,17 +412,18 @@ def get_device_sensor_readings_by_type_service(
         
         sensor_ids = [s.id_sensor for s in sensores]
         
-        # Query para obtener lecturas
-        query = db.query(LecturaDatos).filter(
+        # Query para obtener lecturas (solo particiones desde la fecha límite)
+        Lectura = reading_source(date_from=fecha_limite)
+        query = db.query(Lectura).filter(
             and_(
-                LecturaDatos.id_sensor.in_(sensor_ids),
-                LecturaDatos.fecha_hora >= fecha_limite
+                Lectura.id_sensor.in_(sensor_ids),
+                Lectura.fecha_hora >= fecha_limite
             )
         )
         
         total = query.count()
         
-        lecturas = query.order_by(desc(LecturaDatos.fecha_hora)).offset(skip).limit(limit).all()
+        lecturas = query.order_by(desc(Lectura.fecha_hora)).offset(skip).limit(limit).all()
         
         # Convertir a formato de respuesta
         reading_responses = []
@@ -0,0 +1,37 @@
+import threading
+import time
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.domain.repositories.user_repository import get_users_count
+
+
+class UserCountCache:
+    """Total de usuarios registrados, cacheado en memoria para el listado"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session) -> int:
+        if self._value is not None and self._expires_at > time.monotonic():
+            self.hits += 1
+            return self._value
+
+        self.misses += 1
+        value = get_users_count(db)
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        """Recontar en la siguiente lectura (p. ej. tras registrar un usuario)"""
+        with self._lock:
+            self._value = None
+
+
+user_count = UserCountCache(settings.USER_COUNT_TTL_SECONDS)
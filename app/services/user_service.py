@@ -1,49 +1,71 @@
+import base64
+from typing import Optional
 from fastapi import HTTPException
-from app.domain.repositories.user_repository import get_all_users, get_users_count
+from app.domain.repositories.user_repository import get_users_page
 from app.domain.entities.user import UserResponse, DispositivoResponse, UsersListResponse
+from app.services.user_cache import user_count
 
-def get_all_users_service(db, skip: int = 0, limit: int = 100):
-    """Obtener todos los usuarios con sus dispositivos"""
+def encode_cursor(id_usuario: int) -> str:
+    return base64.urlsafe_b64encode(str(id_usuario).encode()).decode()
+
+def decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+def _user_response(user):
+    return UserResponse(
+        id_usuario=user.id_usuario,
+        nombre_completo=user.nombre_completo,
+        telefono=user.telefono,
+        correo=user.correo,
+        usuario=user.usuario,
+        fecha_registro=user.fecha_registro,
+        dispositivos=[
+            DispositivoResponse(
+                id_dispositivo=dispositivo.id_dispositivo,
+                mac_address=dispositivo.mac_address,
+                nombre_dispositivo=dispositivo.nombre_dispositivo,
+                fecha_asignacion=dispositivo.fecha_asignacion
+            )
+            for dispositivo in user.dispositivos
+        ]
+    )
+
+def get_all_users_service(
+    db,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    search: Optional[str] = None
+):
+    """
+    Obtener usuarios con sus dispositivos, paginados por id_usuario.
+
+    Siempre son dos consultas: la página y los dispositivos de toda la página
+    (selectinload). `total` es el número de usuarios registrados y sale de un
+    contador en memoria; `search` filtra por prefijo de usuario o correo.
+    """
     try:
         # Validar parámetros
         if skip < 0:
             raise HTTPException(status_code=400, detail="Skip debe ser mayor o igual a 0")
         if limit <= 0 or limit > 100:
             raise HTTPException(status_code=400, detail="Limit debe estar entre 1 y 100")
-        
-        # Obtener usuarios
-        users = get_all_users(db, skip, limit)
-        total_users = get_users_count(db)
-        
-        # Convertir a response model
-        users_response = []
-        for user in users:
-            dispositivos_response = [
-                DispositivoResponse(
-                    id_dispositivo=dispositivo.id_dispositivo,
-                    mac_address=dispositivo.mac_address,
-                    nombre_dispositivo=dispositivo.nombre_dispositivo,
-                    fecha_asignacion=dispositivo.fecha_asignacion
-                )
-                for dispositivo in user.dispositivos
-            ]
-            
-            user_response = UserResponse(
-                id_usuario=user.id_usuario,
-                nombre_completo=user.nombre_completo,
-                telefono=user.telefono,
-                correo=user.correo,
-                usuario=user.usuario,
-                fecha_registro=user.fecha_registro,
-                dispositivos=dispositivos_response
-            )
-            users_response.append(user_response)
-        
+        search = search.strip() if search else None
+
+        users, has_more = get_users_page(db, decode_cursor(cursor), limit, search, skip)
+
         return UsersListResponse(
-            usuarios=users_response,
-            total=total_users,
+            usuarios=[_user_response(user) for user in users],
+            total=user_count.get(db),
             skip=skip,
-            limit=limit
+            limit=limit,
+            next_cursor=encode_cursor(users[-1].id_usuario) if has_more else None,
+            search_term=search
         )
         
     except HTTPException as e:
@@ -60,26 +82,7 @@ def get_user_by_id_service(db, user_id: int):
         if not user:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
-        # Convertir dispositivos a response model
-        dispositivos_response = [
-            DispositivoResponse(
-                id_dispositivo=dispositivo.id_dispositivo,
-                mac_address=dispositivo.mac_address,
-                nombre_dispositivo=dispositivo.nombre_dispositivo,
-                fecha_asignacion=dispositivo.fecha_asignacion
-            )
-            for dispositivo in user.dispositivos
-        ]
-        
-        return UserResponse(
-            id_usuario=user.id_usuario,
-            nombre_completo=user.nombre_completo,
-            telefono=user.telefono,
-            correo=user.correo,
-            usuario=user.usuario,
-            fecha_registro=user.fecha_registro,
-            dispositivos=dispositivos_response
-        )
+        return _user_response(user)
         
     except HTTPException as e:
         raise e
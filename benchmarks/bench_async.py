@@ -0,0 +1,149 @@
+"""
+Rendimiento de las rutas calientes de sensores: ruta síncrona frente a AsyncSession.
+
+Lanza `--requests` peticiones con `--concurrency` clientes a la vez contra la
+API (ASGI en proceso, sin red) y reporta peticiones/s y p50/p99 por
+endpoint:
+
+- GET  /api/v1/sensors/device/{id}/latest
+- GET  /api/v1/sensors/device/{id}/readings
+- POST /api/v1/sensors/readings
+
+Cada modo corre en un subproceso propio porque ASYNC_DB_ENABLED se lee al
+importar la API. SQLite admite un solo escritor: con muchas escrituras
+concurrentes aparecen "database is locked" en ambos modos, por eso `--mix read`
+mide solo las consultas.
+
+Uso:
+    python -m benchmarks.bench_async [--requests 3000] [--concurrency 200] [--mix all|read|ingest]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, ".data")
+
+
+def _percentile(values, fraction):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def _load(app, requests, concurrency, mix, device_id, sensor_id):
+    import httpx
+
+    endpoints = []
+    if mix in ("all", "read"):
+        endpoints += [
+            ("latest", "GET", f"/api/v1/sensors/device/{device_id}/latest", None),
+            ("readings", "GET", f"/api/v1/sensors/device/{device_id}/readings?limit=50", None),
+        ]
+    if mix in ("all", "ingest"):
+        endpoints.append(("ingest", "POST", "/api/v1/sensors/readings", {"id_sensor": sensor_id, "valor": 42.0}))
+    latencies = {name: [] for name, _, _, _ in endpoints}
+    errors = 0
+    next_request = iter(range(requests))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def worker():
+            nonlocal errors
+            for i in next_request:
+                name, method, url, body = endpoints[i % len(endpoints)]
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                latencies[name].append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def run_mode(args):
+    """Un modo (síncrono o asíncrono) en este proceso; imprime el resultado en JSON"""
+    from sqlalchemy import select
+    from app.infrastructure.database.db import engine
+    from app.infrastructure.database.models import SensorDatos
+    from app.main import app
+
+    with engine.connect() as conn:
+        sensor = conn.execute(select(SensorDatos).order_by(SensorDatos.id_sensor).limit(1)).first()
+    latencies, errors, elapsed = asyncio.run(
+        _load(app, args.requests, args.concurrency, args.mix, sensor.id_dispositivo, sensor.id_sensor)
+    )
+    print(json.dumps({
+        "rps": args.requests / elapsed,
+        "errores": errors,
+        "endpoints": {
+            name: {"p50": statistics.median(values), "p99": _percentile(values, 0.99)}
+            for name, values in latencies.items()
+        },
+    }))
+
+
+def main():
+    from benchmarks import seed as seeding
+
+    parser = argparse.ArgumentParser(description="Rutas de sensores: síncrona frente a AsyncSession")
+    parser.add_argument("--db", default=os.path.join(DATA_DIR, "async.db"), help="Ruta de la base SQLite")
+    parser.add_argument("--readings", type=int, default=20_000, help="Lecturas del dataset sintético")
+    parser.add_argument("--requests", type=int, default=3_000, help="Peticiones por modo")
+    parser.add_argument("--concurrency", type=int, default=200, help="Clientes simultáneos")
+    parser.add_argument("--mix", choices=["all", "read", "ingest"], default="all", help="Endpoints a medir")
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.environ["DB_URL"] = f"sqlite:///{args.db}"
+    os.environ.setdefault("READINGS_PARTITIONING", "none")
+    # Sin workers de fondo ni procesos de bcrypt: solo se mide la ruta de la petición
+    os.environ["PASSWORD_POOL_WORKERS"] = "0"
+
+    if args.mode:
+        os.environ["ASYNC_DB_ENABLED"] = "true" if args.mode == "async" else "false"
+        run_mode(args)
+        return
+
+    from app.infrastructure.database.db import engine
+    from app.infrastructure.database.migrations import upgrade
+
+    params = {"readings": args.readings}
+    meta_path = f"{args.db}.json"
+    if not seeding.is_seeded(meta_path, params):
+        engine.dispose()
+        for path in (args.db, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        upgrade()
+        seeding.write_meta(meta_path, seeding.seed(engine, params))
+    upgrade()
+
+    print(f"{args.requests} peticiones ({args.mix}), {args.concurrency} clientes simultáneos, CPUs: {os.cpu_count()}")
+    for mode in ("sync", "async"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_async", "--db", args.db,
+             "--readings", str(args.readings), "--requests", str(args.requests),
+             "--concurrency", str(args.concurrency), "--mix", args.mix, "--mode", mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        endpoints = "  ".join(
+            f"{name} p50 {stats['p50']:7.1f} / p99 {stats['p99']:7.1f} ms"
+            for name, stats in result["endpoints"].items()
+        )
+        print(f"{mode:<6} {result['rps']:7.0f} req/s  errores {result['errores']}  |  {endpoints}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Coste por petición de la autenticación de dispositivos y de usuarios.
+
+Mide en microsegundos:
+
+- la verificación de la clave de un dispositivo (HMAC) con el digest en la
+  caché y sin ella (consulta a la base);
+- la verificación de un JWT decodificándolo siempre frente a la caché de
+  claims;
+- `POST /api/v1/sensors/readings` de extremo a extremo (ASGI en proceso, sin
+  red) con la autenticación de dispositivos desactivada y activada.
+
+Uso:
+    python -m benchmarks.bench_auth [--iterations 5000] [--requests 500]
+"""
+import argparse
+import os
+import statistics
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, ".data")
+
+
+def _time_us(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main():
+    from benchmarks import seed as seeding
+
+    parser = argparse.ArgumentParser(description="Coste de la autenticación de dispositivos y JWT")
+    parser.add_argument("--db", default=os.path.join(DATA_DIR, "auth.db"), help="Ruta de la base SQLite")
+    parser.add_argument("--iterations", type=int, default=5_000, help="Iteraciones por micro-benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones por modo de extremo a extremo")
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.environ["DB_URL"] = f"sqlite:///{args.db}"
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret-de-al-menos-32-bytes")
+    os.environ.setdefault("READINGS_PARTITIONING", "none")
+
+    import jwt
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.core.device_keys import device_keys, generate_device_key, key_digest, verify_device_key
+    from app.core.jwt_auth import claims_cache, decode_jwt
+    from app.core.security import create_jwt
+    from app.infrastructure.database.db import engine
+    from app.infrastructure.database.migrations import upgrade
+    from app.infrastructure.database.models import Dispositivo, SensorDatos
+    from app.main import app
+
+    params = {"readings": 2_000}
+    meta_path = f"{args.db}.json"
+    if not seeding.is_seeded(meta_path, params):
+        engine.dispose()
+        for path in (args.db, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        upgrade()
+        seeding.write_meta(meta_path, seeding.seed(engine, params))
+    upgrade()
+
+    key = generate_device_key()
+    with engine.begin() as conn:
+        sensor = conn.execute(
+            SensorDatos.__table__.select().order_by(SensorDatos.id_sensor).limit(1)
+        ).first()
+        conn.execute(
+            Dispositivo.__table__.update()
+            .where(Dispositivo.id_dispositivo == sensor.id_dispositivo)
+            .values(clave_api_hash=key_digest(key))
+        )
+    device_id = sensor.id_dispositivo
+    token = create_jwt({"sub": "benchmark", "id": 1})
+
+    def verify_cold():
+        device_keys.invalidate(device_id)
+        verify_device_key(device_id, key)
+
+    def decode_uncached():
+        jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+
+    verify_device_key(device_id, key)
+    decode_jwt(token)
+    print(f"Micro-benchmarks ({args.iterations} iteraciones, mediana)")
+    print(f"  clave de dispositivo, digest en caché   {_time_us(lambda: verify_device_key(device_id, key), args.iterations):8.1f} µs")
+    print(f"  clave de dispositivo, sin caché         {_time_us(verify_cold, args.iterations):8.1f} µs")
+    print(f"  JWT decodificado siempre                {_time_us(decode_uncached, args.iterations):8.1f} µs")
+    print(f"  JWT desde la caché de claims            {_time_us(lambda: decode_jwt(token), args.iterations):8.1f} µs")
+    print(f"  caché de claims: {claims_cache.hits} aciertos, {claims_cache.misses} fallos")
+
+    client = TestClient(app)
+    body = {"id_sensor": sensor.id_sensor, "valor": 42.0}
+    headers = {"X-Device-Id": str(device_id), "X-Device-Key": key}
+    print(f"POST /api/v1/sensors/readings ({args.requests} peticiones, mediana)")
+    # Modos alternados dos veces: la tabla de lecturas crece durante la medida
+    for name, enabled in (("sin autenticación", False), ("con clave de dispositivo", True)) * 2:
+        settings.DEVICE_AUTH_ENABLED = enabled
+
+        def post():
+            response = client.post("/api/v1/sensors/readings", json=body, headers=headers)
+            assert response.status_code == 200, response.text
+
+        post()
+        print(f"  {name:<26} {_time_us(post, args.requests) / 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Latencia de inicio de sesión en ráfaga y su efecto sobre otros endpoints.
+
+Lanza `--logins` inicios de sesión concurrentes contra la API (ASGI en
+proceso, sin red) mientras un cliente consulta sin parar un endpoint de
+sensores, y compara dos modos:
+
+- threadpool: bcrypt en el threadpool de la API, sin límite de cola
+  (el comportamiento anterior);
+- pool: bcrypt en el pool de procesos con control de admisión.
+
+Reporta p50/p99 de los logins aceptados, cuántos se rechazaron con 503 y
+p50/p99 de las peticiones de sensores durante la ráfaga.
+
+Uso:
+    python -m benchmarks.bench_login [--logins 200] [--rounds 10] [--workers 2] [--max-pending 32]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, ".data")
+PASSWORD = "benchmark-password"
+
+
+def _percentile(values, fraction):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def _burst(app, logins, users, sensor_url):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login_ms, sensor_ms, statuses = [], [], {}
+        done = asyncio.Event()
+
+        async def login(i):
+            started = time.perf_counter()
+            response = await client.post("/api/v1/auth/login", json={
+                "usuario": f"usuario{i % users + 1}", "contrasena": PASSWORD
+            })
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                login_ms.append((time.perf_counter() - started) * 1000)
+
+        async def poll_sensors():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get(sensor_url)
+                sensor_ms.append((time.perf_counter() - started) * 1000)
+
+        poller = asyncio.create_task(poll_sensors())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await poller
+    return login_ms, sensor_ms, statuses, elapsed
+
+
+def main():
+    from benchmarks import seed as seeding
+
+    parser = argparse.ArgumentParser(description="Ráfaga de logins: threadpool frente a pool de procesos")
+    parser.add_argument("--db", default=os.path.join(DATA_DIR, "login.db"), help="Ruta de la base SQLite")
+    parser.add_argument("--logins", type=int, default=200, help="Logins concurrentes por ráfaga")
+    parser.add_argument("--rounds", type=int, default=10, help="Coste bcrypt de los hashes")
+    parser.add_argument("--workers", type=int, default=2, help="Procesos del pool de bcrypt")
+    parser.add_argument("--max-pending", type=int, default=32, help="Operaciones en cola antes de 503")
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.environ["DB_URL"] = f"sqlite:///{args.db}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret-de-al-menos-32-bytes")
+    os.environ.setdefault("READINGS_PARTITIONING", "none")
+
+    from sqlalchemy import func, select
+    from app.core.password_pool import password_pool
+    from app.core.security import hash_password
+    from app.infrastructure.database.db import engine
+    from app.infrastructure.database.migrations import upgrade
+    from app.infrastructure.database.models import Usuario
+    from app.main import app
+
+    params = {"readings": 2_000}
+    meta_path = f"{args.db}.json"
+    if not seeding.is_seeded(meta_path, params):
+        engine.dispose()
+        for path in (args.db, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        upgrade()
+        seeding.write_meta(meta_path, seeding.seed(engine, params))
+    upgrade()
+
+    # Todos los usuarios con la misma contraseña al coste pedido
+    with engine.begin() as conn:
+        conn.execute(Usuario.__table__.update().values(contrasena=hash_password(PASSWORD, args.rounds)))
+        users = conn.execute(select(func.count()).select_from(Usuario.__table__)).scalar()
+    sensor_url = "/api/v1/sensors/device/1"
+
+    modes = [
+        ("threadpool", 0, 10 ** 9),
+        ("pool", args.workers, args.max_pending),
+    ]
+    print(f"{args.logins} logins concurrentes, bcrypt coste {args.rounds}, CPUs: {os.cpu_count()}")
+    for name, workers, max_pending in modes:
+        password_pool.workers = workers
+        password_pool.max_pending = max_pending
+        password_pool.rounds = args.rounds
+        password_pool.start()
+
+        login_ms, sensor_ms, statuses, elapsed = asyncio.run(_burst(app, args.logins, users, sensor_url))
+        print(
+            f"{name:<11} ráfaga {elapsed:6.2f} s  "
+            f"login p50 {statistics.median(login_ms) if login_ms else float('nan'):8.1f} ms  "
+            f"p99 {_percentile(login_ms, 0.99):8.1f} ms  "
+            f"estados {dict(sorted(statuses.items()))}  |  "
+            f"sensores n={len(sensor_ms)} p50 {statistics.median(sensor_ms) if sensor_ms else float('nan'):7.1f} ms  "
+            f"p99 {_percentile(sensor_ms, 0.99):7.1f} ms"
+        )
+        password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
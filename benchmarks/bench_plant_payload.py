@@ -0,0 +1,83 @@
+"""
+Tamaño de respuesta y latencia de las listas de plantas con y sin imagen.
+
+Compara los endpoints de listas de plantas en modo ligero (por defecto: la
+imagen del catálogo se difiere en SQL y solo se devuelve `imagen_url`) con
+`include_image=true` (imagen base64 en línea, el comportamiento anterior),
+sobre el dataset sintético de benchmarks/seed.py. También mide el endpoint
+de imagen con y sin If-None-Match.
+
+Uso:
+    python -m benchmarks.bench_plant_payload [--repeat 20] [--readings 20000]
+"""
+import argparse
+import os
+import statistics
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, ".data")
+
+
+def _measure(client, url, repeat, headers=None):
+    timings = []
+    response = None
+    for _ in range(repeat + 1):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers or {})
+        timings.append((time.perf_counter() - started) * 1000)
+    timings = timings[1:]  # la primera vuelta es de calentamiento
+    return response, statistics.median(timings)
+
+
+def main():
+    from benchmarks import seed as seeding
+
+    parser = argparse.ArgumentParser(description="Payload de listas de plantas con y sin imagen")
+    parser.add_argument("--db", default=os.path.join(DATA_DIR, "payload.db"), help="Ruta de la base SQLite")
+    parser.add_argument("--readings", type=int, default=20_000, help="Lecturas a sembrar")
+    parser.add_argument("--repeat", type=int, default=20, help="Medidas por endpoint")
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.environ["DB_URL"] = f"sqlite:///{args.db}"
+    os.environ.setdefault("READINGS_PARTITIONING", "none")
+
+    from fastapi.testclient import TestClient
+    from app.infrastructure.database.db import engine
+    from app.infrastructure.database.migrations import upgrade
+
+    params = {"readings": args.readings}
+    meta_path = f"{args.db}.json"
+    if not seeding.is_seeded(meta_path, params):
+        engine.dispose()
+        for path in (args.db, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        upgrade()
+        seeding.write_meta(meta_path, seeding.seed(engine, params))
+    upgrade()
+
+    from app.main import app
+
+    endpoints = [
+        ("plants/user/1", "/api/v1/plants/user/1"),
+        ("plants/device/1", "/api/v1/plants/device/1"),
+        ("plants/user/1/device/1", "/api/v1/plants/user/1/device/1"),
+    ]
+    with TestClient(app) as client:
+        print(f"{'endpoint':28} {'modo':10} {'bytes':>12} {'mediana ms':>12}")
+        for name, url in endpoints:
+            for mode, query in (("imagen", "?include_image=true"), ("ligero", "")):
+                response, median_ms = _measure(client, url + query, args.repeat)
+                print(f"{name:28} {mode:10} {len(response.content):12,} {median_ms:12.2f}")
+
+        response, median_ms = _measure(client, "/api/v1/catalog/1/image", args.repeat)
+        print(f"{'catalog/1/image':28} {'200':10} {len(response.content):12,} {median_ms:12.2f}")
+        etag = response.headers.get("etag")
+        response, median_ms = _measure(client, "/api/v1/catalog/1/image", args.repeat, {"If-None-Match": etag})
+        print(f"{'catalog/1/image':28} {response.status_code:<10} {len(response.content):12,} {median_ms:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
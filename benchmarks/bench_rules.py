@@ -0,0 +1,68 @@
+"""
+Throughput del motor de reglas de cuidado.
+
+Compila un conjunto sintético de reglas (varias por especie y tipo de sensor)
+y evalúa lecturas aleatorias de plantas con y sin reglas aplicables, sin
+base de datos. Reporta lecturas evaluadas por segundo y alertas emitidas.
+
+Uso:
+    python -m benchmarks.bench_rules [--readings 1000000] [--catalog 200] [--plants 20000]
+"""
+import argparse
+import os
+import random
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("DB_URL", "sqlite://")
+
+KINDS = ["YL-69", "DHT22_TEMP", "DHT22_HUM", "BH1750", "HC-SR04"]
+
+
+def main():
+    from app.services.plant_cache import DevicePlant
+    from app.services.rule_engine import RuleEngine
+
+    parser = argparse.ArgumentParser(description="Throughput del motor de reglas")
+    parser.add_argument("--readings", type=int, default=1_000_000)
+    parser.add_argument("--catalog", type=int, default=200)
+    parser.add_argument("--plants", type=int, default=20_000)
+    parser.add_argument("--rules-per-kind", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rules = []
+    for catalog in range(1, args.catalog + 1):
+        for kind in KINDS[:3]:
+            for _ in range(args.rules_per_kind):
+                low = rng.uniform(10, 40)
+                rules.append(SimpleNamespace(
+                    id_regla=len(rules) + 1, id_catalogo=catalog, tipo_sensor=kind,
+                    valor_minimo=low, valor_maximo=low + 40, histeresis=2, nivel="advertencia"
+                ))
+
+    engine = RuleEngine()
+    started = time.perf_counter()
+    engine.compile(rules)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    plants = [DevicePlant(i, rng.randint(1, args.catalog)) for i in range(1, args.plants + 1)]
+    readings = [
+        ((rng.choice(plants),), rng.choice(KINDS), rng.uniform(0, 100))
+        for _ in range(args.readings)
+    ]
+
+    alerts = 0
+    started = time.perf_counter()
+    for device_plants, kind, valor in readings:
+        alerts += len(engine.evaluate(kind, device_plants, valor))
+    elapsed = time.perf_counter() - started
+
+    print(f"Reglas compiladas: {len(rules):,} en {compile_ms:.1f} ms")
+    print(f"Lecturas evaluadas: {args.readings:,} en {elapsed:.2f} s "
+          f"({args.readings / elapsed:,.0f} lecturas/s, {elapsed / args.readings * 1e6:.2f} µs/lectura)")
+    print(f"Reglas evaluadas: {engine.evaluations:,}  alertas emitidas: {alerts:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Suite de regresión de latencia y planes de consulta de los servicios.
+
+Siembra un dataset sintético grande en SQLite (ver benchmarks/seed.py),
+ejecuta cada función de servicio de sensores, plantas, catálogo y usuarios,
+y registra por caso la latencia (mediana y p95), el número de consultas SQL
+y el EXPLAIN QUERY PLAN de cada sentencia. El resultado se compara contra
+benchmarks/baseline.json y se marca como regresión:
+
+- latencia mediana por encima de la tolerancia (y del umbral mínimo en ms),
+- más consultas SQL que en la línea base,
+- tablas recorridas con un SCAN completo que antes no lo eran.
+
+Uso:
+    python -m benchmarks.regression                    # compara contra la línea base
+    python -m benchmarks.regression --update-baseline  # guarda la línea base
+    python -m benchmarks.regression --readings 200000 --repeat 3 --only sensor
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from collections import namedtuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, ".data")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+RESULTS_PATH = os.path.join(DATA_DIR, "latest.json")
+
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+# Diferencias de latencia menores a esto se consideran ruido
+MIN_REGRESSION_MS = 1.0
+
+Case = namedtuple("Case", ["name", "run", "setup"])
+
+
+def _configure_environment(db_path):
+    # Debe ejecutarse antes de importar app.*: la configuración se lee al importar
+    os.environ["DB_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("READINGS_PARTITIONING", "none")
+
+
+class QueryRecorder:
+    """Registra las sentencias SQL ejecutadas por el engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.engine = engine
+        self.statements = []
+        self.recording = False
+        event.listen(engine, "before_cursor_execute", self._before)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording:
+            self.statements.append((statement, parameters, executemany))
+
+    def start(self):
+        self.statements = []
+        self.recording = True
+
+    def stop(self):
+        self.recording = False
+        return self.statements
+
+
+def explain(engine, statements):
+    """EXPLAIN QUERY PLAN de cada sentencia distinta (sin INSERTs)"""
+    plans = {}
+    with engine.connect() as conn:
+        for statement, parameters, executemany in statements:
+            if executemany or statement in plans:
+                continue
+            if statement.lstrip().upper().startswith("INSERT"):
+                continue
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans[statement] = [row[-1] for row in rows]
+        conn.rollback()
+    return plans
+
+
+def full_scans(plans):
+    tables = set()
+    for details in plans.values():
+        for detail in details:
+            match = FULL_SCAN.match(detail.strip())
+            if match:
+                tables.add(match.group(1))
+    return sorted(tables)
+
+
+def build_cases():
+    """Casos de benchmark: uno o más por función de servicio"""
+    from datetime import datetime, timedelta
+    from app.domain.entities.sensor import ReadingCreateRequest
+    from app.domain.entities.plant import PlantCreateRequest
+    from app.domain.repositories.plant_repository import create_plant
+    from app.services import sensor_service, plant_service, catalog_service, user_service, alert_service
+    from app.domain.entities.alert import AlertMarkReadRequest
+
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    big_user = 1
+    big_device = 1
+    sensor = 1
+
+    def new_plant(db):
+        return create_plant(db, {
+            "id_catalogo": 1,
+            "id_usuario": big_user,
+            "id_dispositivo": big_device,
+            "nombre_personalizado": "Planta temporal",
+        }).id_planta
+
+    def first_plant(db):
+        from app.infrastructure.database.models import Planta
+        return db.query(Planta.id_planta).filter(
+            Planta.id_usuario == big_user, Planta.id_dispositivo == big_device
+        ).order_by(Planta.id_planta).first()[0]
+
+    return [
+        # Sensores
+        Case("sensor.get_device_sensors",
+             lambda db, _: sensor_service.get_device_sensors_service(db, big_device), None),
+        Case("sensor.get_sensor_detail",
+             lambda db, _: sensor_service.get_sensor_detail_service(db, sensor), None),
+        Case("sensor.get_sensor_readings",
+             lambda db, _: sensor_service.get_sensor_readings_service(db, sensor, 0, 100), None),
+        Case("sensor.get_sensor_readings_range",
+             lambda db, _: sensor_service.get_sensor_readings_service(db, sensor, 0, 100, week_ago, now), None),
+        Case("sensor.get_device_readings",
+             lambda db, _: sensor_service.get_device_readings_service(db, big_device, 0, 100), None),
+        Case("sensor.get_device_readings_range_type",
+             lambda db, _: sensor_service.get_device_readings_service(db, big_device, 0, 100, week_ago, now, "YL-69"), None),
+        Case("sensor.get_latest_readings",
+             lambda db, _: sensor_service.get_latest_readings_service(db, big_device), None),
+        Case("sensor.get_device_sensor_readings_by_type",
+             lambda db, _: sensor_service.get_device_sensor_readings_by_type_service(db, big_device, "DHT22", 0, 50, 168), None),
+        Case("sensor.create_reading",
+             lambda db, _: sensor_service.create_reading_service(db, ReadingCreateRequest(id_sensor=sensor, valor=42.0)), None),
+        # Plantas
+        Case("plant.get_user_plants",
+             lambda db, _: plant_service.get_user_plants_service(db, big_user), None),
+        Case("plant.get_device_plants",
+             lambda db, _: plant_service.get_device_plants_service(db, big_device), None),
+        Case("plant.get_user_device_plants",
+             lambda db, _: plant_service.get_user_device_plants_service(db, big_user, big_device), None),
+        Case("plant.get_user_plants_page2",
+             lambda db, cursor: plant_service.get_user_plants_service(db, big_user, True, False, 50, cursor),
+             lambda db: plant_service.get_user_plants_service(db, big_user, True, False, 50).next_cursor),
+        Case("plant.list_plants_catalog_sorted",
+             lambda db, _: plant_service.list_plants_service(
+                 db, user_id=big_user, catalog_id=1, sort="nombre", descending=False, limit=50
+             ), None),
+        Case("plant.get_plant_detail",
+             lambda db, plant_id: plant_service.get_plant_detail_service(db, plant_id), first_plant),
+        Case("plant.create_plant",
+             lambda db, _: plant_service.create_plant_service(db, PlantCreateRequest(
+                 id_catalogo=1, id_usuario=big_user, id_dispositivo=big_device,
+                 nombre_personalizado="Planta de benchmark"
+             )), None),
+        Case("plant.delete_plant_permanent",
+             lambda db, plant_id: plant_service.delete_plant_permanent_service(db, plant_id, big_user), new_plant),
+        # Catálogo
+        Case("catalog.get_all_catalog_plants",
+             lambda db, _: catalog_service.get_all_catalog_plants_service(db, 0, 50), None),
+        Case("catalog.get_all_catalog_plants_search",
+             lambda db, _: catalog_service.get_all_catalog_plants_service(db, 0, 50, "oré"), None),
+        Case("catalog.get_catalog_plant_by_id",
+             lambda db, _: catalog_service.get_catalog_plant_by_id_service(db, 1), None),
+        # Usuarios
+        Case("user.get_all_users",
+             lambda db, _: user_service.get_all_users_service(db, 0, 100), None),
+        Case("user.get_all_users_page2",
+             lambda db, cursor: user_service.get_all_users_service(db, 0, 100, cursor),
+             lambda db: user_service.get_all_users_service(db, 0, 100).next_cursor),
+        Case("user.get_all_users_search",
+             lambda db, _: user_service.get_all_users_service(db, 0, 20, None, "usuario1"), None),
+        Case("user.get_user_by_id",
+             lambda db, _: user_service.get_user_by_id_service(db, big_user), None),
+        # Alertas
+        Case("alert.get_user_alerts",
+             lambda db, _: alert_service.get_user_alerts_service(db, big_user, 50), None),
+        Case("alert.get_plant_alerts",
+             lambda db, plant_id: alert_service.get_plant_alerts_service(db, plant_id, 50, None, True), first_plant),
+        Case("alert.get_user_unread_count",
+             lambda db, _: alert_service.get_user_unread_count_service(db, big_user), None),
+        Case("alert.mark_alerts_read",
+             lambda db, plant_id: alert_service.mark_alerts_read_service(db, AlertMarkReadRequest(
+                 user_id=big_user, plant_id=plant_id
+             )), first_plant),
+    ]
+
+
+def run_case(case, session_factory, recorder, repeat):
+    """Ejecutar un caso: una vuelta de calentamiento y `repeat` medidas"""
+    timings = []
+    statements = []
+    for iteration in range(repeat + 1):
+        db = session_factory()
+        try:
+            state = case.setup(db) if case.setup else None
+            recorder.start()
+            started = time.perf_counter()
+            case.run(db, state)
+            elapsed = (time.perf_counter() - started) * 1000
+            captured = recorder.stop()
+        finally:
+            recorder.stop()
+            db.close()
+        if iteration:
+            timings.append(elapsed)
+            statements = captured
+
+    plans = explain(recorder.engine, statements)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "queries": len(statements),
+        "full_scans": full_scans(plans),
+        "plans": plans,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lista de regresiones respecto a la línea base"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base["median_ms"] * (1 + tolerance)
+        if result["median_ms"] > limit and result["median_ms"] - base["median_ms"] > MIN_REGRESSION_MS:
+            regressions.append(
+                f"{name}: latencia {result['median_ms']:.2f} ms > {base['median_ms']:.2f} ms (+{tolerance:.0%})"
+            )
+        if result["queries"] > base["queries"]:
+            regressions.append(f"{name}: {result['queries']} consultas > {base['queries']}")
+        new_scans = sorted(set(result["full_scans"]) - set(base["full_scans"]))
+        if new_scans:
+            regressions.append(f"{name}: nuevos SCAN completos en {', '.join(new_scans)}")
+    return regressions
+
+
+def main():
+    from benchmarks import seed as seeding
+
+    parser = argparse.ArgumentParser(description="Regresión de latencia y planes de consulta")
+    parser.add_argument("--db", default=os.path.join(DATA_DIR, "bench.db"), help="Ruta de la base SQLite")
+    parser.add_argument("--readings", type=int, default=seeding.DEFAULTS["readings"], help="Lecturas a sembrar")
+    parser.add_argument("--repeat", type=int, default=5, help="Medidas por caso")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Tolerancia de latencia (0.25 = 25%%)")
+    parser.add_argument("--only", default=None, help="Ejecutar solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--reseed", action="store_true", help="Regenerar el dataset")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Archivo de línea base")
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar los resultados como línea base")
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    _configure_environment(args.db)
+
+    from app.infrastructure.database.db import engine, SessionLocal
+    from app.infrastructure.database.migrations import upgrade
+
+    params = {"readings": args.readings}
+    meta_path = f"{args.db}.json"
+    if args.reseed or not seeding.is_seeded(meta_path, params):
+        engine.dispose()
+        for path in (args.db, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        upgrade()
+        started = time.perf_counter()
+        print(f"Sembrando {args.readings:,} lecturas en {args.db} ...")
+        seeding.write_meta(meta_path, seeding.seed(engine, params))
+        print(f"Dataset listo en {time.perf_counter() - started:.1f} s")
+    else:
+        upgrade()
+
+    recorder = QueryRecorder(engine)
+    results = {}
+    for case in build_cases():
+        if args.only and args.only not in case.name:
+            continue
+        results[case.name] = result = run_case(case, SessionLocal, recorder, args.repeat)
+        scans = ", ".join(result["full_scans"]) or "-"
+        print(f"{case.name:45} {result['median_ms']:10.2f} ms  p95 {result['p95_ms']:10.2f} ms  "
+              f"{result['queries']:4} consultas  scans: {scans}")
+
+    with open(RESULTS_PATH, "w") as handle:
+        json.dump(results, handle, indent=2, ensure_ascii=False)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+
+    if args.update_baseline or not baseline:
+        # Con --only solo se actualizan los casos ejecutados
+        baseline.update(results)
+        with open(args.baseline, "w") as handle:
+            json.dump(baseline, handle, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESIÓN {regression}")
+    if not regressions:
+        print("Sin regresiones respecto a la línea base")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Datos sintéticos para los benchmarks.
+
+Genera en SQLite un conjunto grande y reproducible: usuarios con un
+dispositivo de 6 sensores, catálogo con imágenes, plantas (el usuario 1 es
+una cuenta grande tipo invernadero comercial) y millones de lecturas
+repartidas en los últimos 120 días.
+"""
+import base64
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+SENSOR_KINDS = [
+    ("YL-69", "%", 0, 100),
+    ("DHT22", "°C", 5, 40),
+    ("DHT22", "%", 10, 100),
+    ("BH1750", "lux", 0, 40000),
+    ("HC-SR04", "cm", 2, 200),
+    ("YL-83", "boolean", 0, 1),
+]
+
+DEFAULTS = {
+    "users": 2000,
+    "catalog": 200,
+    "plants": 6000,
+    "big_account_plants": 400,
+    "readings": 2_000_000,
+    "days": 120,
+    "image_kb": 24,
+}
+
+BATCH = 50_000
+
+
+def _catalog_names(count):
+    bases = ["Albahaca", "Orégano", "Menta", "Romero", "Tomillo", "Cilantro", "Perejil",
+             "Lavanda", "Salvia", "Cebollín", "Hierbabuena", "Estragón", "Eneldo", "Ají"]
+    for i in range(count):
+        base = bases[i % len(bases)]
+        yield f"{base} {i // len(bases) + 1}", f"Species benchmarkia {i}"
+
+
+def seed(engine, params=None):
+    """Poblar la base de datos ligada a `engine` (el esquema ya debe existir)"""
+    from app.infrastructure.database.models import (
+        Usuario, Dispositivo, SensorDatos, LecturaDatos, CatalogoPlanta, Planta
+    )
+
+    params = {**DEFAULTS, **(params or {})}
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    image = "data:image/png;base64," + base64.b64encode(
+        os.urandom(params["image_kb"] * 1024)
+    ).decode()
+
+    with engine.begin() as conn:
+        conn.execute(Usuario.__table__.insert(), [
+            {
+                "id_usuario": i,
+                "nombre_completo": f"Usuario {i}",
+                "telefono": "5550000000",
+                "correo": f"usuario{i}@easygrow.test",
+                "usuario": f"usuario{i}",
+                "contrasena": "x",
+                "fecha_registro": now - timedelta(days=rng.randint(0, 365)),
+            }
+            for i in range(1, params["users"] + 1)
+        ])
+        conn.execute(Dispositivo.__table__.insert(), [
+            {
+                "id_dispositivo": i,
+                "mac_address": ":".join(f"{(i >> shift) & 0xFF:02X}" for shift in (40, 32, 24, 16, 8, 0)),
+                "nombre_dispositivo": f"Dispositivo {i}",
+                "fecha_asignacion": now,
+                "id_usuario": i,
+            }
+            for i in range(1, params["users"] + 1)
+        ])
+        sensors = []
+        for device in range(1, params["users"] + 1):
+            for kind, unit, _, _ in SENSOR_KINDS:
+                sensors.append({
+                    "id_sensor": len(sensors) + 1,
+                    "tipo_sensor": kind,
+                    "unidad_medida": unit,
+                    "id_dispositivo": device,
+                })
+        conn.execute(SensorDatos.__table__.insert(), sensors)
+        conn.execute(CatalogoPlanta.__table__.insert(), [
+            {
+                "id_catalogo": i,
+                "nombre_comun": common,
+                "nombre_cientifico": scientific,
+                "descripcion": "Planta aromática de prueba",
+                "altura_maxima_cm": 25,
+                "cuidados_especiales": "Riego moderado",
+                "imagen_referencia": image,
+                "fecha_creacion": now,
+                "activo": True,
+            }
+            for i, (common, scientific) in enumerate(_catalog_names(params["catalog"]), start=1)
+        ])
+
+        plants = []
+        for i in range(1, params["plants"] + 1):
+            user = 1 if i <= params["big_account_plants"] else rng.randint(2, params["users"])
+            plants.append({
+                "id_planta": i,
+                "id_catalogo": rng.randint(1, params["catalog"]),
+                "id_usuario": user,
+                "id_dispositivo": user if rng.random() < 0.8 else None,
+                "nombre_personalizado": f"Planta {i}",
+                "ubicacion": rng.choice(["Cocina", "Balcón", "Invernadero A", "Invernadero B"]),
+                "fecha_plantacion": (now - timedelta(days=rng.randint(0, 300))).date(),
+                "fecha_registro": now - timedelta(days=rng.randint(0, 300)),
+                "activa": rng.random() < 0.9,
+            })
+        conn.execute(Planta.__table__.insert(), plants)
+
+    # Lecturas en orden cronológico, como llegan en producción
+    span = params["days"] * 86400
+    start = now - timedelta(seconds=span)
+    step = span / params["readings"]
+    total_sensors = len(sensors)
+    table = LecturaDatos.__table__
+    for offset in range(0, params["readings"], BATCH):
+        rows = []
+        for n in range(offset, min(offset + BATCH, params["readings"])):
+            sensor = rng.randint(1, total_sensors)
+            _, _, low, high = SENSOR_KINDS[(sensor - 1) % len(SENSOR_KINDS)]
+            rows.append({
+                "id_lectura": n + 1,
+                "valor": rng.uniform(low, high),
+                "fecha_hora": start + timedelta(seconds=n * step),
+                "id_sensor": sensor,
+            })
+        with engine.begin() as conn:
+            conn.execute(table.insert(), rows)
+
+    return params
+
+
+def is_seeded(meta_path, params):
+    """El dataset existente se generó con los mismos parámetros"""
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path) as handle:
+        return json.load(handle) == {**DEFAULTS, **params}
+
+
+def write_meta(meta_path, params):
+    with open(meta_path, "w") as handle:
+        json.dump(params, handle, indent=2)